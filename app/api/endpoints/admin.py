@@ -2,11 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import inspect, text
 import logging
+from typing import Optional
+from datetime import date
 from app.db.session import engine
+from app.db import partitions, pool_metrics
 from app.db.models.base import Base
 from app.api.dependencies import get_db_session
 from app.services.data_extraction import extract_and_load_datasets
-from app.db.session import get_db
+from app.services import etl_queue, ingestion_history, daily_rollup, latest_stats
+from app.services.throttle import etl_throttle
+from app.core.cache import response_cache, dimension_cache
+from app.services.analytics_cube import analytics_cube, publish_data_version
+from app.db.locks import advisory_lock
+from app.db.session import IngestSessionLocal, get_ingest_db, replica_set
 
 # Configurer le logger
 logger = logging.getLogger(__name__)
@@ -36,7 +44,7 @@ def drop_tables():
         raise
 
 @router.post("/init-db", response_model=dict)
-async def initialize_database(
+def initialize_database(
     background_tasks: BackgroundTasks, 
     reset: bool = Query(False, description="Si true, réinitialise complètement la base de données"),
     db: Session = Depends(get_db_session)
@@ -53,6 +61,9 @@ async def initialize_database(
         # Création des tables dans la base de données
         logger.info("Création des tables...")
         Base.metadata.create_all(bind=engine)
+        response_cache.clear()
+        dimension_cache.clear()
+        analytics_cube.clear()
         logger.info("Tables créées avec succès")
         
         return {
@@ -68,44 +79,62 @@ async def initialize_database(
         )
 
 @router.get("/extract-data")
-async def extract_data():
+def extract_data():
     """
     Endpoint pour extraire les données des sources externes.
+    Synchrone : le chargement s'exécute dans le pool de threads, l'API reste servie
+    (et la contre-pression de l'ETL mesure sa latence).
     """
-    try:
-        db = next(get_db())
+    with advisory_lock() as acquired:
+        if not acquired:
+            raise HTTPException(status_code=409, detail="Un chargement ETL est déjà en cours")
         try:
-            result = extract_and_load_datasets(db)
-            return {"status": "success", "message": "Data extraction completed", "details": result}
-        finally:
-            db.close()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+            db = IngestSessionLocal()
+            try:
+                result = extract_and_load_datasets(db, trigger="extract-data")
+                return {"status": "success", "message": "Data extraction completed", "details": result}
+            finally:
+                db.close()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/run-etl", response_model=dict)
-async def run_etl(
+def run_etl(
     background_tasks: BackgroundTasks, 
     reset: bool = Query(False, description="Si true, supprime les données existantes avant d'en charger de nouvelles"),
-    db: Session = Depends(get_db_session)
+    incremental: bool = Query(False, description="Si true, ne recharge que les fichiers modifiés depuis le dernier chargement"),
+    db: Session = Depends(get_ingest_db)
 ):
     """
     Lance le processus ETL pour charger les données.
     Si reset=true, supprime les données existantes avant d'en charger de nouvelles.
+    Un seul chargement peut tourner à la fois dans le cluster (verrou consultatif).
+    Synchrone, comme extract-data : le chargement ne bloque pas la boucle d'événements.
     """
+    with advisory_lock() as acquired:
+        if not acquired:
+            raise HTTPException(status_code=409, detail="Un chargement ETL est déjà en cours")
+        return _run_etl_locked(db, reset, incremental)
+
+def _run_etl_locked(db: Session, reset: bool, incremental: bool) -> dict:
     try:
         # Suppression des données existantes si demandé
         if reset:
             logger.info("Suppression des données existantes...")
             from app.db.repositories import epidemic_repository
             # Supprimer toutes les épidémies existantes
-            epidemics = epidemic_repository.get_epidemics(db, skip=0, limit=1000)
-            for epidemic in epidemics:
-                epidemic_repository.delete_epidemic(db, epidemic_id=epidemic.id)
+            epidemics, cursor = epidemic_repository.get_epidemics_page(db, limit=1000)
+            while True:
+                for epidemic in epidemics:
+                    epidemic_repository.delete_epidemic(db, epidemic_id=epidemic.id)
+                if cursor is None:
+                    break
+                epidemics, cursor = epidemic_repository.get_epidemics_page(db, limit=1000, cursor=cursor)
             logger.info("Données existantes supprimées avec succès")
 
         # Extraire et charger les données depuis Kaggle
         logger.info("Extraction et chargement des données depuis Kaggle...")
-        result = extract_and_load_datasets(db)
+        result = extract_and_load_datasets(db, incremental=incremental and not reset, trigger="run-etl")
         logger.info("Données chargées avec succès")
 
         return {
@@ -120,3 +149,166 @@ async def run_etl(
             status_code=500,
             detail=f"Erreur lors du chargement des données: {str(e)}"
         )
+
+@router.post("/etl-queue", response_model=dict)
+def enqueue_etl(
+    workers: int = Query(0, ge=0, le=16, description="Nombre de workers à démarrer dans ce processus"),
+    db: Session = Depends(get_ingest_db)
+):
+    """
+    Crée un lot de tâches ETL (une par fichier CSV) consommable par plusieurs workers.
+    Les workers externes se lancent avec `python -m app.services.etl_queue worker`.
+    """
+    try:
+        batch = etl_queue.enqueue_datasets(db)
+        if workers:
+            etl_queue.start_local_workers(workers, batch_id=batch.id)
+        return {
+            "success": True,
+            "batch_id": batch.id,
+            "total_tasks": batch.total_tasks,
+            "local_workers": workers
+        }
+    except Exception as e:
+        logger.error(f"Erreur lors de la création du lot ETL: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la création du lot ETL: {str(e)}"
+        )
+
+@router.get("/etl-queue/{batch_id}", response_model=dict)
+def get_etl_batch(batch_id: int, db: Session = Depends(get_db_session)):
+    """
+    Retourne l'avancement d'un lot de tâches ETL.
+    """
+    status = etl_queue.get_batch_status(db, batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Lot ETL non trouvé")
+    return status
+
+@router.get("/ingestion-runs", response_model=list)
+def list_ingestion_runs(
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Historique des derniers chargements (durée, lignes, rejets, tentatives, pic mémoire).
+    """
+    return ingestion_history.get_recent_runs(db, limit=limit)
+
+@router.get("/ingestion-runs/trends", response_model=dict)
+def get_ingestion_trends(
+    dataset: Optional[str] = Query(None, description="Filtrer sur un dataset"),
+    file: Optional[str] = Query(None, description="Filtrer sur un fichier"),
+    limit: int = Query(20, ge=2, le=200, description="Nombre de chargements analysés"),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Évolution du débit (lignes/s) sur les derniers chargements, par chargement et par fichier.
+    """
+    return ingestion_history.get_throughput_trends(db, dataset=dataset, file_name=file, limit=limit)
+
+@router.get("/etl-throttle", response_model=dict)
+def get_etl_throttle():
+    """
+    État de la contre-pression de l'ETL : taille de lot, pause courante et mesures récentes.
+    """
+    return etl_throttle.state()
+
+@router.get("/db-pools", response_model=dict)
+def get_db_pools():
+    """
+    État des pools de connexions : connexions prises, débordement, invalidations et
+    histogramme du temps d'attente pour obtenir une connexion.
+    """
+    return pool_metrics.snapshot()
+
+@router.get("/db-replicas", response_model=dict)
+def get_db_replicas(check: bool = False):
+    """
+    État des répliques en lecture (vérifiées immédiatement si `check`).
+    """
+    if check:
+        replica_set.check_health()
+    return replica_set.stats()
+
+@router.post("/rebuild-rollup", response_model=dict)
+def rebuild_daily_rollup(db: Session = Depends(get_ingest_db)):
+    """
+    Reconstruit entièrement les tables daily_rollup et latest_stats (après une modification hors ETL).
+    """
+    try:
+        daily_rollup.rebuild(db)
+        latest_stats.rebuild(db)
+        response_cache.invalidate(db, warm=True)
+        return {"success": True}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erreur lors de la reconstruction de l'agrégat quotidien: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la reconstruction de l'agrégat quotidien: {str(e)}"
+        )
+
+@router.get("/response-cache", response_model=dict)
+def get_response_cache_stats():
+    """
+    État du cache des réponses agrégées (taille, version des données, succès/échecs).
+    """
+    return {**response_cache.stats(), "dimensions": dimension_cache.stats()}
+
+@router.get("/analytics-cube", response_model=dict)
+def get_analytics_cube_stats():
+    """
+    État du cube analytique en mémoire (version des données, dimensions, taille).
+    """
+    return analytics_cube.stats()
+
+@router.get("/daily-stats-partitions", response_model=dict)
+def get_daily_stats_partitions():
+    """
+    Partitions de daily_stats (MySQL, si DAILY_STATS_PARTITIONING est activé) et leur borne supérieure.
+    """
+    return {
+        "granularity": partitions.partition_granularity(),
+        "partitions": [
+            {"name": name, "less_than": upper.isoformat() if upper else "MAXVALUE"}
+            for name, upper in partitions.list_partitions(engine).items()
+        ]
+    }
+
+@router.post("/daily-stats-partitions/maintain", response_model=dict)
+def maintain_daily_stats_partitions():
+    """
+    Crée les partitions des périodes à venir (fait aussi au démarrage et avant chaque chargement).
+    """
+    try:
+        return {"created": partitions.maintain_partitions(engine)}
+    except Exception as e:
+        logger.error(f"Erreur lors de la maintenance des partitions: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors de la maintenance des partitions: {str(e)}")
+
+@router.delete("/daily-stats", response_model=dict)
+def clear_daily_stats_period(
+    date_from: date = Query(..., description="Premier jour supprimé"),
+    date_to: date = Query(..., description="Premier jour conservé (borne exclue)"),
+    db: Session = Depends(get_ingest_db)
+):
+    """
+    Supprime les statistiques d'une période avant son rechargement. Sur une table
+    partitionnée, les partitions entièrement couvertes sont vidées par TRUNCATE PARTITION.
+    """
+    if date_from >= date_to:
+        raise HTTPException(status_code=400, detail="date_from doit précéder date_to")
+    with advisory_lock(bind=db.get_bind()) as acquired:
+        if not acquired:
+            raise HTTPException(status_code=409, detail="Un chargement ETL est déjà en cours")
+        try:
+            result = partitions.clear_period(db, date_from, date_to)
+            latest_stats.rebuild(db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Erreur lors de la suppression de la période: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Erreur lors de la suppression de la période: {str(e)}")
+    publish_data_version(db)
+    return {"success": True, **result}
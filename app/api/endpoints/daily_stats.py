@@ -1,27 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_db, get_query_db
 from app.db.models.base import DailyStats
 from sqlalchemy import func, desc
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Optional
 import logging
 from app.api.schemas import DailyStatsUpdate
+from app.services import daily_rollup, latest_stats
+from app.services.daily_stats_export import (
+    MEDIA_TYPES,
+    columnar_export_available,
+    filter_daily_stats,
+    stream_columnar,
+    stream_daily_stats
+)
+from app.core.cache import response_cache
+from app.core.config.settings import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("")
 @router.get("/")
-def get_daily_stats(db: Session = Depends(get_db)):
-    """Get all daily statistics."""
+def get_daily_stats(
+    db: Session = Depends(get_query_db),
+    epidemic_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    source_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    format: str = Query("json", pattern="^(json|ndjson|csv)$")
+):
+    """
+    Get daily statistics, optionally filtered by epidemic, location, source and date range.
+
+    `format=ndjson` or `format=csv` streams the rows with a server-side cursor, in constant
+    memory whatever the number of rows; `json` returns a single list of at most
+    DAILY_STATS_JSON_MAX_ROWS rows (400 beyond, rather than loading the whole table).
+    """
+    filters = {
+        "epidemic_id": epidemic_id,
+        "location_id": location_id,
+        "source_id": source_id,
+        "date_from": date_from,
+        "date_to": date_to
+    }
+    if format != "json":
+        headers = {}
+        if format == "csv":
+            headers["Content-Disposition"] = 'attachment; filename="daily_stats.csv"'
+        return StreamingResponse(
+            stream_daily_stats(db.get_bind(), format, limit=limit, **filters),
+            media_type=MEDIA_TYPES[format],
+            headers=headers
+        )
+
+    max_rows = settings.DAILY_STATS_JSON_MAX_ROWS
+    too_many = HTTPException(
+        status_code=400,
+        detail=f"Plus de {max_rows} statistiques : préciser des filtres ou utiliser format=ndjson ou format=csv"
+    )
+    if limit is not None and limit > max_rows:
+        raise too_many
     try:
-        daily_stats = db.query(DailyStats).all()
-        if not daily_stats:
-            return []
-        return daily_stats
+        query = filter_daily_stats(db.query(DailyStats), **filters).order_by(DailyStats.id)
+        # Une ligne de plus que le maximum : détecte le dépassement sans charger la table
+        daily_stats = query.limit(limit if limit is not None else max_rows + 1).all()
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des statistiques quotidiennes: {str(e)}")
-        return []
+        raise HTTPException(
+            status_code=500,
+            detail="Erreur lors de la récupération des statistiques quotidiennes"
+        )
+    if len(daily_stats) > max_rows:
+        raise too_many
+    return daily_stats
+
+@router.get("/export")
+def export_daily_stats(
+    db: Session = Depends(get_query_db),
+    epidemic_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    source_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    format: str = Query("arrow", pattern="^(arrow|parquet)$")
+):
+    """
+    Export columnar of daily statistics joined with the epidemic name and the location
+    country/iso_code, for analytical clients (`pyarrow` / `pandas.read_parquet`).
+
+    `format=arrow` streams an Arrow IPC stream, `format=parquet` a Parquet file.
+    """
+    if not columnar_export_available():
+        raise HTTPException(status_code=501, detail="Export colonnaire indisponible (pyarrow n'est pas installé)")
+    headers = {}
+    if format == "parquet":
+        headers["Content-Disposition"] = 'attachment; filename="daily_stats.parquet"'
+    return StreamingResponse(
+        stream_columnar(
+            db.get_bind(), format, limit=limit,
+            epidemic_id=epidemic_id, location_id=location_id, source_id=source_id,
+            date_from=date_from, date_to=date_to
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers=headers
+    )
 
 @router.put("/{stats_id}")
 def update_daily_stats(stats_id: int, stats_update: DailyStatsUpdate, db: Session = Depends(get_db)):
@@ -50,11 +138,21 @@ def update_daily_stats(stats_id: int, stats_update: DailyStatsUpdate, db: Sessio
                     detail=f"Le champ {field} est requis"
                 )
 
+        previous_key = (db_stats.id_epidemic, db_stats.date)
+        previous_pair = (db_stats.id_epidemic, db_stats.id_loc)
         for field, value in update_data.items():
             setattr(db_stats, field, value)
 
         try:
+            db.flush()
+            daily_rollup.refresh_epidemic(db, previous_key[0], [previous_key[1]])
+            if (db_stats.id_epidemic, db_stats.date) != previous_key:
+                daily_rollup.refresh_epidemic(db, db_stats.id_epidemic, [db_stats.date])
+            latest_stats.refresh(db, previous_pair[0], [previous_pair[1]])
+            if (db_stats.id_epidemic, db_stats.id_loc) != previous_pair:
+                latest_stats.refresh(db, db_stats.id_epidemic, [db_stats.id_loc])
             db.commit()
+            response_cache.invalidate(db)
             db.refresh(db_stats)
             return db_stats
         except Exception as e:
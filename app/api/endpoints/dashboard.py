@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from app.db.session import get_db
+from app.db.session import ReadSession, get_read_db, run_read_in_threadpool
 from app.db.models.base import Epidemic, DailyStats
+from app.core.cache import response_cache
+from app.services.analytics_cube import analytics_cube
+from app.services import latest_stats
 from datetime import datetime
 import logging
 
@@ -10,37 +13,74 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.get("/overview")
-def get_dashboard_overview(db: Session = Depends(get_db)):
+def compute_overview(db: Session) -> dict:
     """
-    Récupère les données générales pour l'analyse détaillée.
+    Calcule les données générales de l'analyse détaillée.
     """
-    try:
-        # Statistiques des épidémies
-        total_pandemics = db.query(Epidemic).count()
-        active_pandemics = db.query(Epidemic).filter(Epidemic.end_date is None).count()
+    # Statistiques des épidémies
+    total_pandemics = db.query(Epidemic).count()
+    active_pandemics = db.query(Epidemic).filter(Epidemic.end_date is None).count()
 
-        # Calcul des taux moyens
-        latest_stats = db.query(
+    # Calcul des taux moyens (cube analytique si disponible)
+    cube = analytics_cube.get(db)
+    if cube is not None:
+        transmission_rate, mortality_rate = cube.average_rates()
+    else:
+        rates = db.query(
             func.avg(DailyStats.new_cases * 100.0 / func.nullif(DailyStats.cases, 0)).label('transmission_rate'),
             func.avg(DailyStats.deaths * 100.0 / func.nullif(DailyStats.cases, 0)).label('mortality_rate')
         ).first()
+        transmission_rate, mortality_rate = rates.transmission_rate, rates.mortality_rate
 
-        # Récupération des dernières statistiques
-        latest_data = db.query(DailyStats).order_by(DailyStats.date.desc()).first()
+    # Dernières valeurs cumulées de chaque épidémie et localisation
+    latest = latest_stats.get_totals(db)
 
-        return {
-            "totalPandemics": total_pandemics,
-            "activePandemics": active_pandemics,
-            "averageTransmissionRate": float(latest_stats.transmission_rate or 0),
-            "averageMortalityRate": float(latest_stats.mortality_rate or 0),
-            "latestStats": {
-                "cases": latest_data.cases if latest_data else 0,
-                "deaths": latest_data.deaths if latest_data else 0,
-                "recovered": latest_data.recovered if latest_data else 0,
-                "date": latest_data.date.isoformat() if latest_data else datetime.now().isoformat()
-            }
+    return {
+        "totalPandemics": total_pandemics,
+        "activePandemics": active_pandemics,
+        "averageTransmissionRate": float(transmission_rate or 0),
+        "averageMortalityRate": float(mortality_rate or 0),
+        "latestStats": {
+            "cases": latest["cases"],
+            "deaths": latest["deaths"],
+            "recovered": latest["recovered"],
+            "date": latest["date"].isoformat() if latest["date"] else datetime.now().isoformat()
         }
+    }
+
+def compute_trends(db: Session) -> dict:
+    """
+    Calcule les tendances de l'analyse détaillée.
+    """
+    # Récupération des statistiques des 7 derniers jours
+    recent_stats = db.query(DailyStats)\
+        .order_by(DailyStats.date.desc())\
+        .limit(7)\
+        .all()
+
+    return {
+        "dailyStats": [
+            {
+                "date": stat.date.isoformat(),
+                "cases": stat.cases,
+                "deaths": stat.deaths,
+                "recovered": stat.recovered
+            }
+            for stat in recent_stats
+        ]
+    }
+
+
+response_cache.register("dashboard.overview", compute_overview)
+response_cache.register("dashboard.trends", compute_trends)
+
+@router.get("/overview")
+async def get_dashboard_overview(db: ReadSession = Depends(get_read_db)):
+    """
+    Récupère les données générales pour l'analyse détaillée.
+    """
+    try:
+        return await run_read_in_threadpool(db, response_cache.get, "dashboard.overview")
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des données de l'analyse détaillée: {str(e)}")
         raise HTTPException(
@@ -49,28 +89,12 @@ def get_dashboard_overview(db: Session = Depends(get_db)):
         )
 
 @router.get("/trends")
-def get_dashboard_trends(db: Session = Depends(get_db)):
+async def get_dashboard_trends(db: ReadSession = Depends(get_read_db)):
     """
     Récupère les tendances pour l'analyse détaillée.
     """
     try:
-        # Récupération des statistiques des 7 derniers jours
-        recent_stats = db.query(DailyStats)\
-            .order_by(DailyStats.date.desc())\
-            .limit(7)\
-            .all()
-
-        return {
-            "dailyStats": [
-                {
-                    "date": stat.date.isoformat(),
-                    "cases": stat.cases,
-                    "deaths": stat.deaths,
-                    "recovered": stat.recovered
-                }
-                for stat in recent_stats
-            ]
-        }
+        return await run_read_in_threadpool(db, response_cache.get, "dashboard.trends")
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des tendances: {str(e)}")
         raise HTTPException(
@@ -1,18 +1,29 @@
 from fastapi import APIRouter, Depends
-from app.db.session import get_db
+from app.db.session import ReadSession, get_read_db, run_read
 from app.db.models.base import DataSource
+from app.core.cache import dimension_cache
 from sqlalchemy.orm import Session
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+def load_data_sources(db: Session):
+    """Sources de données sérialisées (mises en cache jusqu'au prochain changement des dimensions)."""
+    return [
+        {"id": source.id, "source_type": source.source_type, "reference": source.reference, "url": source.url}
+        for source in db.query(DataSource).order_by(DataSource.id).all()
+    ]
+
+
+dimension_cache.register("dimensions.data_sources", load_data_sources)
+
 @router.get("")
 @router.get("/")
-def get_data_sources(db: Session = Depends(get_db)):
+async def get_data_sources(db: ReadSession = Depends(get_read_db)):
     """Get all data sources."""
     try:
-        data_sources = db.query(DataSource).all()
+        data_sources = await run_read(db, dimension_cache.get, "dimensions.data_sources")
         if not data_sources:
             # Retourner au moins une source par défaut si aucune n'existe
             return [{
@@ -29,4 +40,4 @@ def get_data_sources(db: Session = Depends(get_db)):
             "source_type": "Manuel",
             "reference": "Données initiales",
             "url": "N/A"
-        }] 
\ No newline at end of file
+        }]
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
-from app.db.session import get_db
-from app.db.models.base import Epidemic, DailyStats
+from app.db import session as db_session
+from app.db.session import ReadSession, get_db, get_read_db, run_read, run_read_in_threadpool
+from app.db.models.base import Epidemic
+from app.db.pagination import InvalidCursor, keyset_page, order_by_key
+from app.db.search import search_epidemics
+from app.db.repositories import epidemic_repository
+from app.db.repositories.epidemic_repository import EPIDEMIC_SORT_COLUMNS, get_filter_options
+from app.services import epidemic_deletion, daily_rollup
+from app.core.cache import response_cache, dimension_cache
 from typing import Optional
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -48,6 +55,8 @@ def create_epidemic(epidemic: EpidemicCreate, db: Session = Depends(get_db)):
         )
         db.add(db_epidemic)
         db.commit()
+        response_cache.invalidate(db)
+        dimension_cache.invalidate(db)
         db.refresh(db_epidemic)
         return db_epidemic
     except Exception as e:
@@ -83,6 +92,8 @@ def update_epidemic(epidemic_id: int, epidemic: EpidemicUpdate, db: Session = De
             setattr(db_epidemic, field, value)
 
         db.commit()
+        response_cache.invalidate(db)
+        dimension_cache.invalidate(db)
         db.refresh(db_epidemic)
         return db_epidemic
     except HTTPException:
@@ -96,9 +107,17 @@ def update_epidemic(epidemic_id: int, epidemic: EpidemicUpdate, db: Session = De
         )
 
 @router.delete("/{epidemic_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_epidemic(epidemic_id: int, db: Session = Depends(get_db)):
+def delete_epidemic(
+    epidemic_id: int,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    db: Session = Depends(get_db)
+):
     """
     Supprime une épidémie.
+    L'épidémie disparaît immédiatement des lectures. Au-delà de EPIDEMIC_DELETE_SYNC_MAX_ROWS
+    statistiques, la suppression se poursuit en arrière-plan (202) et son avancement
+    est consultable sur GET /epidemics/{epidemic_id}/deletion.
     """
     try:
         db_epidemic = db.query(Epidemic).filter(Epidemic.id == epidemic_id).first()
@@ -108,9 +127,15 @@ def delete_epidemic(epidemic_id: int, db: Session = Depends(get_db)):
                 detail="Épidémie non trouvée"
             )
 
-        db.delete(db_epidemic)
-        db.commit()
-        return None
+        if not epidemic_deletion.is_large(db, epidemic_id):
+            epidemic_deletion.delete_epidemic(db, db_epidemic)
+            return None
+
+        job = epidemic_deletion.mark_for_deletion(db, db_epidemic)
+        # Suppression longue sur le pool d'ingestion, comme la reprise au démarrage
+        background_tasks.add_task(epidemic_deletion.run_deletion, db_session.ingest_engine, job.id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return epidemic_deletion.get_deletion_status(db, epidemic_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -121,67 +146,103 @@ def delete_epidemic(epidemic_id: int, db: Session = Depends(get_db)):
             detail="Erreur lors de la suppression de l'épidémie"
         )
 
+@router.get("/{epidemic_id}/deletion")
+async def get_epidemic_deletion(epidemic_id: int, db: ReadSession = Depends(get_read_db)):
+    """
+    Avancement de la suppression d'une épidémie.
+    """
+    deletion = await run_read(db, epidemic_deletion.get_deletion_status, epidemic_id)
+    if deletion is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Aucune suppression pour cette épidémie"
+        )
+    return deletion
+
+def list_epidemics(
+    db: Session,
+    skip: int,
+    limit: int,
+    search: Optional[str],
+    type: Optional[str],
+    country: Optional[str],
+    sort_by: Optional[str],
+    sort_desc: bool,
+    cursor: Optional[str]
+) -> dict:
+    by_relevance = sort_by == "relevance" and bool(search) and cursor is None
+    sort_by = sort_by if sort_by in EPIDEMIC_SORT_COLUMNS else "name"
+    sort_column = EPIDEMIC_SORT_COLUMNS[sort_by]
+
+    # Construire la requête de base
+    query = db.query(Epidemic)
+
+    # Appliquer les filtres (recherche sur l'index plein texte)
+    relevance = None
+    if search:
+        query, relevance = search_epidemics(query, search, db.get_bind())
+
+    if type and type != "all":
+        query = query.filter(Epidemic.type == type)
+
+    if country and country != "all":
+        query = query.filter(Epidemic.country == country)
+
+    if cursor is not None:
+        epidemics, next_cursor = keyset_page(query, sort_column, Epidemic.id, sort_by, limit, cursor, sort_desc)
+        return {
+            "items": epidemics,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }
+
+    # Calculer le nombre total d'éléments
+    total = query.count()
+
+    # Appliquer le tri et la pagination
+    if by_relevance and relevance is not None:
+        query = query.order_by(relevance, Epidemic.id)
+    else:
+        query = order_by_key(query, sort_column, Epidemic.id, sort_desc)
+    epidemics = query.offset(skip).limit(limit).all()
+
+    # Préparer la réponse
+    return {
+        "items": epidemics,
+        "total": total,
+        "page": skip // limit + 1,
+        "pages": (total + limit - 1) // limit
+    }
+
 @router.get("")
 @router.get("/")
-def get_epidemics(
-    db: Session = Depends(get_db),
+async def get_epidemics(
+    db: ReadSession = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
     type: Optional[str] = None,
     country: Optional[str] = None,
     sort_by: Optional[str] = "name",
-    sort_desc: bool = False
+    sort_desc: bool = False,
+    cursor: Optional[str] = None
 ):
     """
     Récupère la liste des épidémies avec pagination et filtrage.
+
+    Sans `cursor`, pagination par offset (`skip`). Avec `cursor` (vide pour la première
+    page), pagination par clé : la réponse contient `next_cursor` à renvoyer pour obtenir
+    la page suivante, et le total n'est pas recalculé.
+    `sort_by=relevance` trie les résultats d'une recherche par pertinence (pagination par offset).
     """
     try:
-        # Construire la requête de base
-        query = db.query(Epidemic)
-
-        # Appliquer les filtres
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                (Epidemic.name.ilike(search_term))
-                | (Epidemic.type.ilike(search_term))
-                | (Epidemic.country.ilike(search_term))
-            )
-        
-        if type and type != "all":
-            query = query.filter(Epidemic.type == type)
-            
-        if country and country != "all":
-            query = query.filter(Epidemic.country == country)
-
-        # Appliquer le tri
-        if sort_by:
-            sort_column = getattr(Epidemic, {
-                "name": "name",
-                "cases": "total_cases",
-                "deaths": "total_deaths",
-                "date": "start_date"
-            }.get(sort_by, "name"))
-            
-            if sort_desc:
-                query = query.order_by(desc(sort_column))
-            else:
-                query = query.order_by(sort_column)
-
-        # Calculer le nombre total d'éléments
-        total = query.count()
-
-        # Appliquer la pagination
-        epidemics = query.offset(skip).limit(limit).all()
-
-        # Préparer la réponse
-        return {
-            "items": epidemics,
-            "total": total,
-            "page": skip // limit + 1,
-            "pages": (total + limit - 1) // limit
-        }
+        return await run_read(
+            db, list_epidemics,
+            skip=skip, limit=limit, search=search, type=type, country=country,
+            sort_by=sort_by, sort_desc=sort_desc, cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des épidémies: {str(e)}")
         return {
@@ -191,160 +252,162 @@ def get_epidemics(
             "pages": 1
         }
 
+def _empty_dashboard_response() -> dict:
+    """Structure de retour par défaut pour données vides"""
+    return {
+        "global_stats": {
+            "total_cases": 0,
+            "total_deaths": 0,
+            "total_epidemics": 0,
+            "active_epidemics": 0,
+            "mortality_rate": 0
+        },
+        "type_distribution": [{
+            "type": "Non spécifié",
+            "cases": 0,
+            "deaths": 0
+        }],
+        "geographic_distribution": [{
+            "country": "Non spécifié",
+            "cases": 0,
+            "deaths": 0
+        }],
+        "daily_evolution": [{
+            "date": datetime.now().strftime("%Y-%m-%d"),
+            "new_cases": 0,
+            "new_deaths": 0,
+            "active_cases": 0
+        }],
+        "top_active_epidemics": []
+    }
+
+def compute_dashboard_stats(db: Session) -> dict:
+    """
+    Calcule les statistiques agrégées pour le tableau de bord (mises en cache par version des données).
+    """
+    # Vérifier si la table est vide
+    has_data = db.query(Epidemic).first() is not None
+    if not has_data:
+        return _empty_dashboard_response()
+
+    # Statistiques globales
+    total_stats = db.query(
+        func.sum(Epidemic.total_cases).label("total_cases"),
+        func.sum(Epidemic.total_deaths).label("total_deaths"),
+        func.count(Epidemic.id).label("total_epidemics")
+    ).first()
+
+    if not total_stats or total_stats.total_cases is None:
+        return _empty_dashboard_response()
+
+    # Compter les épidémies actives séparément
+    active_epidemics = db.query(func.count(Epidemic.id)).filter(
+        Epidemic.end_date.is_(None)
+    ).scalar() or 0
+
+    # Tendances par type
+    type_stats = db.query(
+        Epidemic.type,
+        func.sum(Epidemic.total_cases).label("cases"),
+        func.sum(Epidemic.total_deaths).label("deaths")
+    ).group_by(Epidemic.type).all()
+
+    # Tendances géographiques
+    geo_stats = db.query(
+        Epidemic.country,
+        func.sum(Epidemic.total_cases).label("cases"),
+        func.sum(Epidemic.total_deaths).label("deaths")
+    ).group_by(Epidemic.country).all()
+
+    # Évolution dans le temps (30 derniers jours de données, table daily_rollup)
+    daily_evolution = daily_rollup.get_daily_evolution(db, days=30)
+
+    # Top 5 des épidémies les plus actives
+    top_epidemics = db.query(
+        Epidemic
+    ).filter(
+        Epidemic.end_date.is_(None)
+    ).order_by(
+        desc(Epidemic.total_cases)
+    ).limit(5).all()
+
+    # Calcul du taux de mortalité avec vérification de division par zéro
+    total_cases = total_stats.total_cases or 0
+    total_deaths = total_stats.total_deaths or 0
+    mortality_rate = (total_deaths / total_cases * 100) if total_cases > 0 else 0
+
+    return {
+        "global_stats": {
+            "total_cases": total_cases,
+            "total_deaths": total_deaths,
+            "total_epidemics": total_stats.total_epidemics or 0,
+            "active_epidemics": active_epidemics,
+            "mortality_rate": round(mortality_rate, 2)
+        },
+        "type_distribution": [
+            {
+                "type": stat.type or "Non spécifié",
+                "cases": stat.cases or 0,
+                "deaths": stat.deaths or 0
+            } for stat in (type_stats if type_stats else [])
+        ] or [{"type": "Non spécifié", "cases": 0, "deaths": 0}],
+        "geographic_distribution": [
+            {
+                "country": stat.country or "Non spécifié",
+                "cases": stat.cases or 0,
+                "deaths": stat.deaths or 0
+            } for stat in (geo_stats if geo_stats else [])
+        ] or [{"country": "Non spécifié", "cases": 0, "deaths": 0}],
+        "daily_evolution": daily_evolution or [{
+            "date": datetime.now().strftime("%Y-%m-%d"),
+            "new_cases": 0,
+            "new_deaths": 0,
+            "active_cases": 0
+        }],
+        "top_active_epidemics": [
+            {
+                "id": epidemic.id,
+                "name": epidemic.name,
+                "type": epidemic.type or "Non spécifié",
+                "country": epidemic.country or "Non spécifié",
+                "total_cases": epidemic.total_cases or 0,
+                "total_deaths": epidemic.total_deaths or 0
+            } for epidemic in (top_epidemics if top_epidemics else [])
+        ]
+    }
+
+
+response_cache.register("epidemics.dashboard", compute_dashboard_stats)
+
 @router.get("/stats/dashboard")
-def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(db: ReadSession = Depends(get_read_db)):
     """
     Récupère les statistiques agrégées pour le tableau de bord.
     """
     try:
-        # Structure de retour par défaut pour données vides
-        empty_response = {
-            "global_stats": {
-                "total_cases": 0,
-                "total_deaths": 0,
-                "total_epidemics": 0,
-                "active_epidemics": 0,
-                "mortality_rate": 0
-            },
-            "type_distribution": [{
-                "type": "Non spécifié",
-                "cases": 0,
-                "deaths": 0
-            }],
-            "geographic_distribution": [{
-                "country": "Non spécifié",
-                "cases": 0,
-                "deaths": 0
-            }],
-            "daily_evolution": [{
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "new_cases": 0,
-                "new_deaths": 0,
-                "active_cases": 0
-            }],
-            "top_active_epidemics": []
-        }
-
-        # Vérifier si la table est vide
-        has_data = db.query(Epidemic).first() is not None
-        if not has_data:
-            return empty_response
-
-        # Statistiques globales
-        total_stats = db.query(
-            func.sum(Epidemic.total_cases).label("total_cases"),
-            func.sum(Epidemic.total_deaths).label("total_deaths"),
-            func.count(Epidemic.id).label("total_epidemics")
-        ).first()
-
-        if not total_stats or total_stats.total_cases is None:
-            return empty_response
-
-        # Compter les épidémies actives séparément
-        active_epidemics = db.query(func.count(Epidemic.id)).filter(
-            Epidemic.end_date.is_(None)
-        ).scalar() or 0
-
-        # Tendances par type
-        type_stats = db.query(
-            Epidemic.type,
-            func.sum(Epidemic.total_cases).label("cases"),
-            func.sum(Epidemic.total_deaths).label("deaths")
-        ).group_by(Epidemic.type).all()
-
-        # Tendances géographiques
-        geo_stats = db.query(
-            Epidemic.country,
-            func.sum(Epidemic.total_cases).label("cases"),
-            func.sum(Epidemic.total_deaths).label("deaths")
-        ).group_by(Epidemic.country).all()
-
-        # Évolution dans le temps (30 derniers jours)
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        daily_evolution = db.query(
-            DailyStats.date,
-            func.sum(DailyStats.new_cases).label("new_cases"),
-            func.sum(DailyStats.new_deaths).label("new_deaths"),
-            func.sum(DailyStats.active).label("active_cases")
-        ).filter(
-            DailyStats.date >= thirty_days_ago
-        ).group_by(
-            DailyStats.date
-        ).order_by(
-            DailyStats.date
-        ).all()
-
-        # Top 5 des épidémies les plus actives
-        top_epidemics = db.query(
-            Epidemic
-        ).filter(
-            Epidemic.end_date.is_(None)
-        ).order_by(
-            desc(Epidemic.total_cases)
-        ).limit(5).all()
-
-        # Calcul du taux de mortalité avec vérification de division par zéro
-        total_cases = total_stats.total_cases or 0
-        total_deaths = total_stats.total_deaths or 0
-        mortality_rate = (total_deaths / total_cases * 100) if total_cases > 0 else 0
-
-        return {
-            "global_stats": {
-                "total_cases": total_cases,
-                "total_deaths": total_deaths,
-                "total_epidemics": total_stats.total_epidemics or 0,
-                "active_epidemics": active_epidemics,
-                "mortality_rate": round(mortality_rate, 2)
-            },
-            "type_distribution": [
-                {
-                    "type": stat.type or "Non spécifié",
-                    "cases": stat.cases or 0,
-                    "deaths": stat.deaths or 0
-                } for stat in (type_stats if type_stats else [])
-            ] or [{"type": "Non spécifié", "cases": 0, "deaths": 0}],
-            "geographic_distribution": [
-                {
-                    "country": stat.country or "Non spécifié",
-                    "cases": stat.cases or 0,
-                    "deaths": stat.deaths or 0
-                } for stat in (geo_stats if geo_stats else [])
-            ] or [{"country": "Non spécifié", "cases": 0, "deaths": 0}],
-            "daily_evolution": [
-                {
-                    "date": stat.date.strftime("%Y-%m-%d"),
-                    "new_cases": stat.new_cases or 0,
-                    "new_deaths": stat.new_deaths or 0,
-                    "active_cases": stat.active_cases or 0
-                } for stat in (daily_evolution if daily_evolution else [])
-            ] or [{
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "new_cases": 0,
-                "new_deaths": 0,
-                "active_cases": 0
-            }],
-            "top_active_epidemics": [
-                {
-                    "id": epidemic.id,
-                    "name": epidemic.name,
-                    "type": epidemic.type or "Non spécifié",
-                    "country": epidemic.country or "Non spécifié",
-                    "total_cases": epidemic.total_cases or 0,
-                    "total_deaths": epidemic.total_deaths or 0
-                } for epidemic in (top_epidemics if top_epidemics else [])
-            ]
-        }
+        return await run_read_in_threadpool(db, response_cache.get, "epidemics.dashboard")
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des statistiques du tableau de bord: {str(e)}")
-        return empty_response
+        return _empty_dashboard_response()
+
+
+dimension_cache.register("dimensions.filters", get_filter_options)
+
+@router.get("/filters")
+async def get_epidemic_filters(db: ReadSession = Depends(get_read_db)):
+    """
+    Options de filtrage des épidémies (pays et types distincts), servies depuis le
+    cache des dimensions.
+    """
+    return await run_read(db, dimension_cache.get, "dimensions.filters")
 
 @router.get("/{epidemic_id}")
-def get_epidemic(epidemic_id: int, db: Session = Depends(get_db)):
+async def get_epidemic(epidemic_id: int, db: ReadSession = Depends(get_read_db)):
     """
     Récupère les détails d'une épidémie spécifique.
     """
     try:
-        epidemic = db.query(Epidemic).filter(Epidemic.id == epidemic_id).first()
+        epidemic = await run_read(db, epidemic_repository.get_epidemic, epidemic_id)
         if not epidemic:
             raise HTTPException(
                 status_code=404,
@@ -1,22 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response as HTTPResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.api.dependencies import get_db_session
+from app.db.session import ReadSession, get_read_db, run_read
 from app.api.schemas import Location, LocationCreate, LocationUpdate, Response
 from app.db.repositories import location_repository
+from app.db.pagination import InvalidCursor
+from app.core.cache import dimension_cache, response_cache
 
 router = APIRouter()
 
+def load_locations(db: Session, skip: int, limit: int):
+    return [
+        Location.model_validate(location).model_dump()
+        for location in location_repository.get_locations(db, skip=skip, limit=limit)
+    ]
+
+
+dimension_cache.register("dimensions.locations", load_locations)
+
 @router.get("/", response_model=List[Location])
-def read_locations(
+async def read_locations(
+    response: HTTPResponse,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db_session)
+    cursor: Optional[str] = None,
+    db: ReadSession = Depends(get_read_db)
 ):
     """
     Récupère la liste des localisations avec pagination optionnelle.
+
+    Avec `cursor` (vide pour la première page), pagination par clé : le curseur de la
+    page suivante est renvoyé dans l'en-tête X-Next-Cursor (absent sur la dernière page).
+    Sans curseur, la liste est servie depuis le cache des dimensions.
     """
-    return location_repository.get_locations(db, skip=skip, limit=limit)
+    if cursor is None:
+        return await run_read(db, dimension_cache.get, "dimensions.locations", skip=skip, limit=limit)
+    try:
+        locations, next_cursor = await run_read(db, location_repository.get_locations_page, limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return locations
 
 @router.post("/", response_model=Location)
 def create_location(
@@ -26,14 +52,17 @@ def create_location(
     """
     Crée une nouvelle localisation.
     """
-    return location_repository.create_location(db=db, location=location)
+    db_location = location_repository.create_location(db=db, location=location)
+    response_cache.invalidate(db)
+    dimension_cache.invalidate(db)
+    return db_location
 
 @router.get("/{location_id}", response_model=Location)
-def read_location(location_id: int, db: Session = Depends(get_db_session)):
+async def read_location(location_id: int, db: ReadSession = Depends(get_read_db)):
     """
     Récupère une localisation spécifique par son ID.
     """
-    db_location = location_repository.get_location(db, location_id=location_id)
+    db_location = await run_read(db, location_repository.get_location, location_id)
     if db_location is None:
         raise HTTPException(status_code=404, detail="Location not found")
     return db_location
@@ -52,6 +81,8 @@ def update_location(
     )
     if db_location is None:
         raise HTTPException(status_code=404, detail="Location not found")
+    response_cache.invalidate(db)
+    dimension_cache.invalidate(db)
     return db_location
 
 @router.delete("/{location_id}", response_model=Response)
@@ -59,7 +90,9 @@ def delete_location(location_id: int, db: Session = Depends(get_db_session)):
     """
     Supprime une localisation par son ID.
     """
-    success = location_repository.delete_location(db, location_id=location_id)
+    success = location_repository.delete_location(db, location_id)
     if not success:
         raise HTTPException(status_code=404, detail="Location not found")
+    response_cache.invalidate(db)
+    dimension_cache.invalidate(db)
     return {"status": "success", "message": "Location deleted successfully"} 
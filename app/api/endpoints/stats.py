@@ -1,24 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date
+from typing import List, Optional
+from app.db.session import ReadSession, get_read_db, run_read_in_threadpool
 from app.services.stats_service import StatsService
+from app.services.time_series import TimeSeriesService
+from app.core.cache import response_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+response_cache.register("stats.dashboard", lambda db: StatsService(db).get_dashboard_stats())
+response_cache.register("stats.timeseries", lambda db, **params: TimeSeriesService(db).get_series(**params))
+
 @router.get("/dashboard")
-def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(db: ReadSession = Depends(get_read_db)):
     """
     Récupère toutes les statistiques pour le tableau de bord
     """
     try:
-        stats_service = StatsService(db)
-        return stats_service.get_dashboard_stats()
+        return await run_read_in_threadpool(db, response_cache.get, "stats.dashboard")
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des statistiques du tableau de bord: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail="Erreur lors de la récupération des statistiques du tableau de bord"
-        ) 
\ No newline at end of file
+        )
+
+@router.get("/timeseries")
+async def get_time_series(
+    db: ReadSession = Depends(get_read_db),
+    epidemic_id: Optional[int] = None,
+    location_ids: List[int] = Query([]),
+    metrics: List[str] = Query(["new_cases"]),
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    rolling: Optional[int] = Query(None, ge=2, le=365),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """
+    Série temporelle agrégée côté serveur par jour, semaine ou mois, avec moyenne
+    glissante optionnelle sur `rolling` périodes
+    """
+    try:
+        return await run_read_in_threadpool(
+            db, response_cache.get, "stats.timeseries",
+            epidemic_id=epidemic_id,
+            location_ids=tuple(sorted(set(location_ids))),
+            metrics=tuple(metrics),
+            bucket=bucket,
+            rolling=rolling,
+            date_from=date_from,
+            date_to=date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur lors du calcul de la série temporelle: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Erreur lors du calcul de la série temporelle"
+        )
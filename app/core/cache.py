@@ -0,0 +1,193 @@
+# app/core/cache.py
+
+import time
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config.settings import settings
+from app.db.versions import DATA_VERSION, DIMENSIONS_VERSION, get_version, bump_version
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Cache LRU avec expiration des réponses agrégées, clé (endpoint, paramètres, version des données).
+
+    La version est lue en base au plus toutes les `version_check_seconds` : une écriture
+    faite par un autre processus invalide donc le cache de tous les workers. Les clés les
+    plus demandées sont recalculées dès qu'une nouvelle version est connue.
+
+    `version_name` désigne le compteur de version (table data_version) qui invalide le cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        version_check_seconds: Optional[float] = None,
+        warm_keys: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        version_name: str = DATA_VERSION
+    ):
+        self.max_entries = max_entries or settings.RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.RESPONSE_CACHE_TTL_SECONDS
+        self.version_check_seconds = (
+            settings.RESPONSE_CACHE_VERSION_CHECK_SECONDS if version_check_seconds is None else version_check_seconds
+        )
+        self.warm_keys = settings.RESPONSE_CACHE_WARM_KEYS if warm_keys is None else warm_keys
+        self.enabled = settings.RESPONSE_CACHE_ENABLED if enabled is None else enabled
+        self.version_name = version_name
+        self._loaders: Dict[str, Callable[..., Any]] = {}
+        self._entries: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+        self._usage: Counter = Counter()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, endpoint: str, loader: Callable[..., Any]) -> None:
+        """Déclare la fonction `loader(db, **params)` qui calcule la réponse d'un endpoint."""
+        self._loaders[endpoint] = loader
+
+    def _set_version(self, version: int) -> bool:
+        """Retourne True si la version a changé."""
+        with self._lock:
+            changed = self._version is not None and version != self._version
+            self._version = version
+            self._version_checked_at = time.monotonic()
+            if changed:
+                # Les entrées des versions précédentes ne seront plus jamais lues
+                for key in [key for key in self._entries if key[2] != version]:
+                    del self._entries[key]
+            return changed
+
+    def current_version(self, db: Session) -> int:
+        if self._version is not None and time.monotonic() - self._version_checked_at < self.version_check_seconds:
+            return self._version
+        from app.db.session import primary_bind
+        bind = primary_bind(db)
+        if bind is db.get_bind():
+            version = get_version(db, self.version_name)
+        else:
+            # Session sur une réplique : la version se lit sur la base principale, sinon
+            # le retard de réplication la ferait alterner entre deux valeurs
+            with Session(bind) as primary:
+                version = get_version(primary, self.version_name)
+        if self._set_version(version) and self.warm_keys:
+            # Nouvelle version publiée par un autre processus
+            if bind.dialect.is_async:
+                # Une connexion asynchrone n'est pas utilisable depuis un autre thread
+                from app.db.session import engine as bind
+            threading.Thread(
+                target=self._warm_in_background, args=(bind, version), name="cache-warm", daemon=True
+            ).start()
+        return version
+
+    def is_current(self, db: Session, version: int) -> bool:
+        """
+        Indique si `db` voit la version `version` : une réplique en retard ne doit pas
+        remplir le cache (ni le cube analytique) de la version publiée.
+        """
+        return db.info.get("replica") is None or get_version(db, self.version_name) >= version
+
+    def _store(self, key: tuple, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _lookup(self, key: tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def get(self, db: Session, endpoint: str, **params) -> Any:
+        """Retourne la réponse en cache, ou la calcule avec le loader enregistré."""
+        loader = self._loaders[endpoint]
+        if not self.enabled:
+            return loader(db, **params)
+
+        params_key = tuple(sorted(params.items()))
+        key = (endpoint, params_key, self.current_version(db))
+        with self._lock:
+            self._usage[(endpoint, params_key)] += 1
+        found, value = self._lookup(key)
+        if found:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = loader(db, **params)
+        if self.is_current(db, key[2]):
+            self._store(key, value)
+        return value
+
+    def warm(self, db: Session, version: Optional[int] = None) -> int:
+        """Recalcule les clés les plus demandées pour la version courante. Retourne le nombre de clés."""
+        if not self.enabled or not self.warm_keys:
+            return 0
+        version = self._version if version is None else version
+        with self._lock:
+            top = [key for key, _ in self._usage.most_common(self.warm_keys)]
+        warmed = 0
+        for endpoint, params_key in top:
+            try:
+                self._store((endpoint, params_key, version), self._loaders[endpoint](db, **dict(params_key)))
+                warmed += 1
+            except Exception as e:
+                logger.warning(f"Préchauffage du cache impossible pour {endpoint}: {e}")
+        if warmed:
+            logger.info(f"{warmed} réponse(s) préchauffée(s) pour la version {version} ({self.version_name})")
+        return warmed
+
+    def _warm_in_background(self, bind, version: int) -> None:
+        with Session(bind) as session:
+            self.warm(session, version)
+
+    def invalidate(self, db: Session, warm: bool = False) -> int:
+        """
+        Publie une nouvelle version des données (après validation de la transaction).
+        Avec `warm=True`, les clés les plus demandées sont recalculées immédiatement.
+        """
+        version = bump_version(db, self.version_name)
+        self._set_version(version)
+        if warm:
+            self.warm(db, version)
+        return version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._usage.clear()
+            self._version = None
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "version": self._version,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+response_cache = ResponseCache()
+# Dimensions (pays, types, sources, localisations) : invalidé seulement quand elles changent
+dimension_cache = ResponseCache(
+    ttl_seconds=settings.DIMENSION_CACHE_TTL_SECONDS,
+    warm_keys=0,
+    version_name=DIMENSIONS_VERSION
+)
@@ -30,6 +30,91 @@ class Settings(BaseSettings):
     ENABLE_DATAVIZ: bool = os.getenv("ENABLE_DATAVIZ", "false").lower() == "true"
     # ---------------------------------------
 
+    # File de travail ETL distribuée
+    ETL_TASK_LEASE_SECONDS: int = int(os.getenv("ETL_TASK_LEASE_SECONDS", "900"))
+    ETL_TASK_MAX_ATTEMPTS: int = int(os.getenv("ETL_TASK_MAX_ATTEMPTS", "3"))
+    ETL_WORKER_POLL_SECONDS: float = float(os.getenv("ETL_WORKER_POLL_SECONDS", "5"))
+    ETL_LOCK_TTL_SECONDS: int = int(os.getenv("ETL_LOCK_TTL_SECONDS", "21600"))
+
+    # Rafraîchissement incrémental planifié (heures locales, fenêtre hors pic)
+    ETL_SCHEDULER_ENABLED: bool = os.getenv("ETL_SCHEDULER_ENABLED", "false").lower() == "true"
+    ETL_SCHEDULER_INTERVAL_MINUTES: int = int(os.getenv("ETL_SCHEDULER_INTERVAL_MINUTES", "1440"))
+    ETL_SCHEDULER_WINDOW_START: int = int(os.getenv("ETL_SCHEDULER_WINDOW_START", "1"))
+    ETL_SCHEDULER_WINDOW_END: int = int(os.getenv("ETL_SCHEDULER_WINDOW_END", "5"))
+    ETL_SCHEDULER_POLL_SECONDS: int = int(os.getenv("ETL_SCHEDULER_POLL_SECONDS", "60"))
+
+    # Ingestion par dossier surveillé (dépôts CSV partenaires)
+    WATCH_FOLDER_ENABLED: bool = os.getenv("WATCH_FOLDER_ENABLED", "false").lower() == "true"
+    WATCH_FOLDER_PATH: str = os.getenv("WATCH_FOLDER_PATH", "data/incoming")
+    WATCH_FOLDER_POLL_SECONDS: float = float(os.getenv("WATCH_FOLDER_POLL_SECONDS", "2"))
+    WATCH_FOLDER_SETTLE_SECONDS: float = float(os.getenv("WATCH_FOLDER_SETTLE_SECONDS", "1"))
+
+    # Contre-pression de l'ETL : ralentit l'écriture quand l'API ou le pool saturent
+    ETL_THROTTLE_ENABLED: bool = os.getenv("ETL_THROTTLE_ENABLED", "true").lower() == "true"
+    ETL_THROTTLE_LATENCY_TARGET_MS: float = float(os.getenv("ETL_THROTTLE_LATENCY_TARGET_MS", "300"))
+    ETL_THROTTLE_POOL_WAIT_TARGET_MS: float = float(os.getenv("ETL_THROTTLE_POOL_WAIT_TARGET_MS", "50"))
+    ETL_THROTTLE_MAX_PAUSE_SECONDS: float = float(os.getenv("ETL_THROTTLE_MAX_PAUSE_SECONDS", "5"))
+    ETL_BATCH_SIZE_MIN: int = int(os.getenv("ETL_BATCH_SIZE_MIN", "50"))
+    ETL_BATCH_SIZE_MAX: int = int(os.getenv("ETL_BATCH_SIZE_MAX", "1000"))
+    METRICS_WINDOW_SECONDS: float = float(os.getenv("METRICS_WINDOW_SECONDS", "30"))
+
+    # Pools de connexions par charge de travail (requêtes API / chargements ETL)
+    DB_API_POOL_SIZE: int = int(os.getenv("DB_API_POOL_SIZE", "10"))
+    DB_API_MAX_OVERFLOW: int = int(os.getenv("DB_API_MAX_OVERFLOW", "10"))
+    DB_API_POOL_TIMEOUT: float = float(os.getenv("DB_API_POOL_TIMEOUT", "10"))
+    DB_API_ISOLATION_LEVEL: str = os.getenv("DB_API_ISOLATION_LEVEL", "READ COMMITTED")
+    DB_API_POOL_PREWARM: int = int(os.getenv("DB_API_POOL_PREWARM", "0"))
+    DB_INGEST_POOL_SIZE: int = int(os.getenv("DB_INGEST_POOL_SIZE", "4"))
+    DB_INGEST_MAX_OVERFLOW: int = int(os.getenv("DB_INGEST_MAX_OVERFLOW", "4"))
+    DB_INGEST_POOL_TIMEOUT: float = float(os.getenv("DB_INGEST_POOL_TIMEOUT", "60"))
+    DB_INGEST_ISOLATION_LEVEL: str = os.getenv("DB_INGEST_ISOLATION_LEVEL", "READ COMMITTED")
+    DB_INGEST_POOL_PREWARM: int = int(os.getenv("DB_INGEST_POOL_PREWARM", "0"))
+    # Vérification (pre-ping) et renouvellement périodique des connexions des pools
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "3600"))
+    # Lectures de l'API sur un moteur asynchrone (aiomysql / aiosqlite), pool DB_API_*
+    ASYNC_READS_ENABLED: bool = os.getenv("ASYNC_READS_ENABLED", "true").lower() == "true"
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    # Répliques en lecture (URLs séparées par des virgules), pool DB_API_*
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    REPLICA_READ_YOUR_WRITES_SECONDS: float = float(os.getenv("REPLICA_READ_YOUR_WRITES_SECONDS", "5"))
+    REPLICA_HEALTH_CHECK_SECONDS: float = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", "10"))
+
+    # Suppression des épidémies par lots (en arrière-plan au-delà du seuil)
+    EPIDEMIC_DELETE_CHUNK_SIZE: int = int(os.getenv("EPIDEMIC_DELETE_CHUNK_SIZE", "5000"))
+    EPIDEMIC_DELETE_SYNC_MAX_ROWS: int = int(os.getenv("EPIDEMIC_DELETE_SYNC_MAX_ROWS", "10000"))
+    EPIDEMIC_DELETE_PAUSE_SECONDS: float = float(os.getenv("EPIDEMIC_DELETE_PAUSE_SECONDS", "0.05"))
+
+    # Cache des réponses agrégées, invalidé par la version des données
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+    RESPONSE_CACHE_VERSION_CHECK_SECONDS: float = float(os.getenv("RESPONSE_CACHE_VERSION_CHECK_SECONDS", "1"))
+    RESPONSE_CACHE_WARM_KEYS: int = int(os.getenv("RESPONSE_CACHE_WARM_KEYS", "10"))
+    DIMENSION_CACHE_TTL_SECONDS: float = float(os.getenv("DIMENSION_CACHE_TTL_SECONDS", "3600"))
+    DASHBOARD_QUERY_WORKERS: int = int(os.getenv("DASHBOARD_QUERY_WORKERS", "4"))
+
+    # Export en flux des statistiques quotidiennes (lignes lues par lot côté serveur)
+    DAILY_STATS_STREAM_BATCH_SIZE: int = int(os.getenv("DAILY_STATS_STREAM_BATCH_SIZE", "2000"))
+    # Nombre maximal de lignes d'une réponse JSON (au-delà : filtres, ndjson ou csv)
+    DAILY_STATS_JSON_MAX_ROWS: int = int(os.getenv("DAILY_STATS_JSON_MAX_ROWS", "10000"))
+    EXPORT_SPOOL_MAX_BYTES: int = int(os.getenv("EXPORT_SPOOL_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    # Cube NumPy en mémoire pour les agrégats (épidémie x localisation x jour, une matrice par métrique)
+    ANALYTICS_CUBE_ENABLED: bool = os.getenv("ANALYTICS_CUBE_ENABLED", "false").lower() == "true"
+    ANALYTICS_CUBE_MAX_CELLS: int = int(os.getenv("ANALYTICS_CUBE_MAX_CELLS", "50000000"))
+    # Recherche plein texte des épidémies (innodb_ft_min_token_size sous MySQL)
+    SEARCH_MAX_WORDS: int = int(os.getenv("SEARCH_MAX_WORDS", "8"))
+    SEARCH_MIN_TOKEN_SIZE: int = int(os.getenv("SEARCH_MIN_TOKEN_SIZE", "3"))
+    # Instantané du cube sur disque local, projeté en mémoire par tous les workers
+    ANALYTICS_SNAPSHOT_ENABLED: bool = os.getenv("ANALYTICS_SNAPSHOT_ENABLED", "false").lower() == "true"
+    ANALYTICS_SNAPSHOT_DIR: str = os.getenv("ANALYTICS_SNAPSHOT_DIR", "data/snapshots")
+    ANALYTICS_SNAPSHOT_KEEP: int = int(os.getenv("ANALYTICS_SNAPSHOT_KEEP", "2"))
+    # Partitionnement RANGE de daily_stats par date sous MySQL ("year", "month" ou vide)
+    DAILY_STATS_PARTITIONING: str = os.getenv("DAILY_STATS_PARTITIONING", "")
+    DAILY_STATS_PARTITION_START: str = os.getenv("DAILY_STATS_PARTITION_START", "2019-01-01")
+    DAILY_STATS_PARTITIONS_AHEAD: int = int(os.getenv("DAILY_STATS_PARTITIONS_AHEAD", "2"))
+
     @property
     def SQLALCHEMY_DATABASE_URL(self) -> str:
         """Construit l'URL finale pour SQLAlchemy."""
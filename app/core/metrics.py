@@ -0,0 +1,93 @@
+# app/core/metrics.py
+
+import time
+import bisect
+import threading
+from collections import deque
+from typing import Optional, Tuple
+
+from app.core.config.settings import settings
+
+def _pick(values: list, p: float) -> float:
+    """Percentile `p` d'une liste déjà triée."""
+    return values[min(int(round(p / 100 * (len(values) - 1))), len(values) - 1)]
+
+class RollingWindow:
+    """
+    Fenêtre glissante de mesures (en millisecondes) sur les `max_age` dernières secondes.
+    """
+
+    def __init__(self, max_age: float = 30.0, max_samples: int = 10000):
+        self.max_age = max_age
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def add(self, value_ms: float) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), value_ms))
+
+    def _recent(self) -> list:
+        cutoff = time.monotonic() - self.max_age
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            return [value for _, value in self._samples]
+
+    def count(self) -> int:
+        return len(self._recent())
+
+    def percentile(self, p: float) -> Optional[float]:
+        values = sorted(self._recent())
+        return _pick(values, p) if values else None
+
+    def snapshot(self) -> dict:
+        values = sorted(self._recent())
+        if not values:
+            return {"count": 0, "p50_ms": None, "p95_ms": None, "max_ms": None}
+        return {
+            "count": len(values),
+            "p50_ms": round(_pick(values, 50), 2),
+            "p95_ms": round(_pick(values, 95), 2),
+            "max_ms": round(values[-1], 2)
+        }
+
+class Histogram:
+    """
+    Histogramme cumulatif (en millisecondes) depuis le démarrage : nombre de mesures
+    inférieures ou égales à chaque borne, à la manière des histogrammes Prometheus.
+    """
+
+    def __init__(self, bounds: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)):
+        self.bounds = tuple(sorted(bounds))
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, value_ms: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.bounds, value_ms)] += 1
+            self._sum += value_ms
+            self._max = max(self._max, value_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts, total, maximum = list(self._counts), self._sum, self._max
+        buckets, cumulated = {}, 0
+        for bound, count in zip(self.bounds, counts):
+            cumulated += count
+            buckets[f"le_{bound:g}ms"] = cumulated
+        buckets["le_inf"] = cumulated + counts[-1]
+        return {
+            "count": buckets["le_inf"],
+            "sum_ms": round(total, 2),
+            "max_ms": round(maximum, 2),
+            "buckets": buckets
+        }
+
+
+# Latence des requêtes API interactives (hors administration)
+api_latency = RollingWindow(settings.METRICS_WINDOW_SECONDS)
+
+# Temps d'attente pour obtenir une connexion du pool
+pool_wait = RollingWindow(settings.METRICS_WINDOW_SECONDS)
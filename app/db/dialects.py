@@ -0,0 +1,11 @@
+import sqlite3
+
+def supports_window_functions(bind) -> bool:
+    """Fonctions de fenêtrage : SQLite >= 3.25, MySQL >= 8.0, MariaDB >= 10.2."""
+    dialect = bind.dialect
+    if dialect.name == "sqlite":
+        return sqlite3.sqlite_version_info >= (3, 25, 0)
+    if dialect.name == "mysql":
+        version = dialect.server_version_info or (0,)
+        return version >= ((10, 2) if getattr(dialect, "is_mariadb", False) else (8, 0))
+    return True
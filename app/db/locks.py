@@ -0,0 +1,73 @@
+import os
+import socket
+import uuid
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+from sqlalchemy import text, insert, delete
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config.settings import settings
+from app.db import session as db_session
+from app.db.models.etl import AdvisoryLock
+
+logger = logging.getLogger(__name__)
+
+ETL_LOCK_NAME = "analyseit_etl"
+
+def _owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+@contextmanager
+def _mysql_lock(bind: Engine, name: str, timeout: int) -> Iterator[bool]:
+    # GET_LOCK est lié à la connexion : on la garde ouverte pendant toute la section critique
+    with bind.connect() as conn:
+        acquired = conn.execute(text("SELECT GET_LOCK(:name, :timeout)"), {"name": name, "timeout": timeout}).scalar() == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+
+@contextmanager
+def _row_lock(bind: Engine, name: str) -> Iterator[bool]:
+    owner = _owner_id()
+    now = datetime.utcnow()
+    with bind.begin() as conn:
+        # Un verrou expiré correspond à un détenteur arrêté sans libération
+        conn.execute(delete(AdvisoryLock).where(AdvisoryLock.name == name, AdvisoryLock.expires_at < now))
+    try:
+        with bind.begin() as conn:
+            conn.execute(insert(AdvisoryLock).values(
+                name=name,
+                owner=owner,
+                expires_at=now + timedelta(seconds=settings.ETL_LOCK_TTL_SECONDS)
+            ))
+        acquired = True
+    except IntegrityError:
+        acquired = False
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with bind.begin() as conn:
+                conn.execute(delete(AdvisoryLock).where(AdvisoryLock.name == name, AdvisoryLock.owner == owner))
+
+@contextmanager
+def advisory_lock(name: str = ETL_LOCK_NAME, bind: Optional[Engine] = None, timeout: int = 0) -> Iterator[bool]:
+    """
+    Verrou partagé par tous les workers et toutes les machines utilisant la même base.
+    Utilise GET_LOCK sur MySQL et une ligne de la table `advisory_lock` sur les autres moteurs.
+    Produit True si le verrou est obtenu, False sinon (sans attendre par défaut).
+    """
+    bind = bind or db_session.ingest_engine
+    if bind.dialect.name == "mysql":
+        with _mysql_lock(bind, name, timeout) as acquired:
+            yield acquired
+    else:
+        with _row_lock(bind, name) as acquired:
+            yield acquired
@@ -3,5 +3,15 @@
 from .base import Base
 from .user import User
 from .location import Location
+from .etl import EtlBatch, EtlTask, EtlFileState, EtlSchedule, AdvisoryLock
+from .ingestion import IngestionRun, IngestionFile
+from .deletion import EpidemicDeletion
+from .rollup import DailyRollup, LatestStats
+from .version import DataVersion
 
-__all__ = ["Base", "User", "Location"] 
\ No newline at end of file
+__all__ = [
+    "Base", "User", "Location",
+    "EtlBatch", "EtlTask", "EtlFileState", "EtlSchedule", "AdvisoryLock",
+    "IngestionRun", "IngestionFile", "EpidemicDeletion", "DailyRollup",
+    "LatestStats", "DataVersion"
+]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, Float, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Text, Date, Float, Boolean, ForeignKey, Index, false
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -19,9 +19,27 @@ class Epidemic(Base):
     mortality_rate = Column(Float, default=0.0)
     total_cases = Column(Integer, default=0)
     total_deaths = Column(Integer, default=0)
+    # Suppression en cours (masquée des lectures, voir app/services/epidemic_deletion.py)
+    deleting = Column(Boolean, nullable=False, default=False, server_default=false())
     
-    daily_stats = relationship("DailyStats", back_populates="epidemic")
-    overall_stats = relationship("OverallStats", back_populates="epidemic")
+    # lazy="raise" : les relations se chargent explicitement (selectinload, jointures),
+    # jamais ligne à ligne ; la suppression en cascade est laissée à la base
+    daily_stats = relationship("DailyStats", back_populates="epidemic", lazy="raise", passive_deletes=True)
+    overall_stats = relationship("OverallStats", back_populates="epidemic", lazy="raise", passive_deletes=True)
+
+    # Toutes les lectures ORM filtrent sur deleting (app/db/visibility.py) : il préfixe les
+    # index de tri (liste paginée, top des épidémies) et de regroupement par type et pays
+    # (ces derniers couvrent les sommes du tableau de bord)
+    __table_args__ = (
+        Index('idx_epidemic_name', deleting, name),
+        Index('idx_epidemic_cases', deleting, total_cases),
+        Index('idx_epidemic_deaths', deleting, total_deaths),
+        Index('idx_epidemic_start_date', deleting, start_date),
+        Index('idx_epidemic_type', deleting, type, total_cases, total_deaths),
+        Index('idx_epidemic_country', deleting, country, total_cases, total_deaths),
+        # Recherche plein texte (MySQL) ; SQLite utilise une table FTS5, voir app/db/search.py
+        Index('ft_epidemic_search', name, type, country, mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
 
 class Localisation(Base):
     __tablename__ = "localisation"
@@ -31,7 +49,9 @@ class Localisation(Base):
     region = Column(String(150))
     iso_code = Column(String(10), unique=True)
     
-    daily_stats = relationship("DailyStats", back_populates="location")
+    daily_stats = relationship("DailyStats", back_populates="location", lazy="raise", passive_deletes=True)
+
+    __table_args__ = (Index('idx_localisation_country', country),)
 
 class DataSource(Base):
     __tablename__ = "data_source"
@@ -41,7 +61,7 @@ class DataSource(Base):
     reference = Column(String(255))
     url = Column(String(500), nullable=False)
     
-    daily_stats = relationship("DailyStats", back_populates="source")
+    daily_stats = relationship("DailyStats", back_populates="source", lazy="raise", passive_deletes=True)
     
     __table_args__ = (Index('idx_source_type', source_type),)
 
@@ -61,15 +81,18 @@ class DailyStats(Base):
     new_deaths = Column(Integer, default=0)
     new_recovered = Column(Integer, default=0)
     
-    epidemic = relationship("Epidemic", back_populates="daily_stats")
-    source = relationship("DataSource", back_populates="daily_stats")
-    location = relationship("Localisation", back_populates="daily_stats")
+    epidemic = relationship("Epidemic", back_populates="daily_stats", lazy="raise")
+    source = relationship("DataSource", back_populates="daily_stats", lazy="raise")
+    location = relationship("Localisation", back_populates="daily_stats", lazy="raise")
     
     __table_args__ = (
         Index('idx_unique_daily', id_epidemic, id_loc, date, unique=True),
         Index('idx_daily_epidemic', id_epidemic),
         Index('idx_daily_loc', id_loc),
-        Index('idx_daily_date', date)
+        Index('idx_daily_date', date),
+        # Index couvrant des agrégats du tableau de bord (totaux par épidémie et localisation,
+        # taux moyens) : lus sans revenir à la table
+        Index('idx_daily_totals', id_epidemic, id_loc, cases, deaths, new_cases)
     )
 
 class OverallStats(Base):
@@ -81,7 +104,7 @@ class OverallStats(Base):
     total_deaths = Column(Integer, default=0)
     fatality_ratio = Column(Float, default=0.0)
     
-    epidemic = relationship("Epidemic", back_populates="overall_stats")
+    epidemic = relationship("Epidemic", back_populates="overall_stats", lazy="raise")
     
     __table_args__ = (Index('idx_overall_epidemic', id_epidemic),) 
     
\ No newline at end of file
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+
+from .base import Base
+
+class EpidemicDeletion(Base):
+    __tablename__ = "epidemic_deletion"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Pas de clé étrangère : la ligne survit à la suppression de l'épidémie
+    id_epidemic = Column(Integer, nullable=False)
+    epidemic_name = Column(String(255))
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, done, error
+    total_rows = Column(Integer, default=0)
+    deleted_rows = Column(Integer, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index('idx_epidemic_deletion_epidemic', id_epidemic),
+        Index('idx_epidemic_deletion_status', status)
+    )
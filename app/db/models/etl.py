@@ -0,0 +1,65 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+
+from .base import Base
+
+class EtlBatch(Base):
+    __tablename__ = "etl_batch"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    status = Column(String(20), nullable=False, default="running")  # running, finalizing, done, error
+    total_tasks = Column(Integer, default=0)
+    id_run = Column(Integer)  # ingestion_run associé
+    finalize_owner = Column(String(100))
+    finalize_expires_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+class EtlTask(Base):
+    __tablename__ = "etl_task"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    id_batch = Column(Integer, ForeignKey('etl_batch.id', ondelete='CASCADE', name='fk_etl_task_batch'), nullable=False)
+    dataset = Column(String(100), nullable=False)
+    file_path = Column(String(500), nullable=False)  # relatif à la racine du dataset
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, done, error
+    attempts = Column(Integer, default=0)
+    rows = Column(Integer, default=0)
+    lease_owner = Column(String(100))
+    lease_expires_at = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index('idx_etl_task_claim', status, lease_expires_at),
+        Index('idx_etl_task_batch', id_batch, status),
+    )
+
+class EtlFileState(Base):
+    __tablename__ = "etl_file_state"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    dataset = Column(String(100), nullable=False)
+    file_path = Column(String(500), nullable=False)  # relatif à la racine du dataset
+    fingerprint = Column(String(64), nullable=False)
+    rows = Column(Integer, default=0)
+    loaded_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index('idx_etl_file_state', dataset, file_path, unique=True),)
+
+class EtlSchedule(Base):
+    __tablename__ = "etl_schedule"
+
+    name = Column(String(100), primary_key=True)
+    last_run_at = Column(DateTime)
+    last_status = Column(String(20))
+    last_error = Column(Text)
+
+class AdvisoryLock(Base):
+    """Verrou applicatif pour les moteurs sans GET_LOCK (SQLite)."""
+    __tablename__ = "advisory_lock"
+
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(100), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,50 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Index
+from sqlalchemy.orm import relationship
+
+from .base import Base
+
+class IngestionRun(Base):
+    __tablename__ = "ingestion_run"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    trigger = Column(String(50), nullable=False)  # run-etl, extract-data, scheduler, watch-folder, etl-queue
+    status = Column(String(20), nullable=False, default="running")  # running, success, error
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+    duration_seconds = Column(Float)
+    daily_stats_rows_before = Column(Integer)
+    rows_read = Column(Integer, default=0)
+    rows_loaded = Column(Integer, default=0)
+    rows_rejected = Column(Integer, default=0)
+    retries = Column(Integer, default=0)
+    peak_memory_mb = Column(Float)
+    error = Column(Text)
+
+    files = relationship("IngestionFile", back_populates="run", passive_deletes=True)
+
+    __table_args__ = (Index('idx_ingestion_run_started', started_at),)
+
+class IngestionFile(Base):
+    __tablename__ = "ingestion_file"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    id_run = Column(Integer, ForeignKey('ingestion_run.id', ondelete='CASCADE', name='fk_ingestion_file_run'), nullable=False)
+    dataset = Column(String(100), nullable=False)
+    file_name = Column(String(255), nullable=False)
+    status = Column(String(20), nullable=False, default="running")
+    started_at = Column(DateTime, default=datetime.utcnow)
+    duration_seconds = Column(Float)
+    rows_read = Column(Integer, default=0)
+    rows_loaded = Column(Integer, default=0)
+    rows_rejected = Column(Integer, default=0)
+    retries = Column(Integer, default=0)
+    peak_memory_mb = Column(Float)
+    error = Column(Text)
+
+    run = relationship("IngestionRun", back_populates="files")
+
+    __table_args__ = (
+        Index('idx_ingestion_file_run', id_run),
+        Index('idx_ingestion_file_dataset', dataset, file_name, started_at),
+    )
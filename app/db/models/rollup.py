@@ -0,0 +1,55 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Date, DateTime, BigInteger, Index
+
+from .base import Base
+
+# id_epidemic de la ligne agrégée toutes épidémies confondues
+GLOBAL_ROLLUP = 0
+
+class DailyRollup(Base):
+    """
+    Agrégat quotidien de daily_stats, par épidémie et global (id_epidemic = 0).
+    Maintenu par l'ETL pour les dates chargées (voir app/services/daily_rollup.py).
+    """
+    __tablename__ = "daily_rollup"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Pas de clé étrangère : 0 désigne l'agrégat global
+    id_epidemic = Column(Integer, nullable=False)
+    date = Column(Date, nullable=False)
+    cases = Column(BigInteger, default=0)
+    deaths = Column(BigInteger, default=0)
+    recovered = Column(BigInteger, default=0)
+    active = Column(BigInteger, default=0)
+    new_cases = Column(BigInteger, default=0)
+    new_deaths = Column(BigInteger, default=0)
+    new_recovered = Column(BigInteger, default=0)
+    locations = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_daily_rollup_epidemic_date', id_epidemic, date, unique=True),
+    )
+
+class LatestStats(Base):
+    """
+    Dernières valeurs cumulées (date la plus récente de daily_stats) par épidémie et
+    localisation. Maintenu par l'ETL (voir app/services/latest_stats.py).
+    """
+    __tablename__ = "latest_stats"
+
+    # Pas de clé étrangère, comme daily_rollup
+    id_epidemic = Column(Integer, primary_key=True, autoincrement=False)
+    id_loc = Column(Integer, primary_key=True, autoincrement=False)
+    date = Column(Date, nullable=False)
+    cases = Column(BigInteger, default=0)
+    deaths = Column(BigInteger, default=0)
+    recovered = Column(BigInteger, default=0)
+    active = Column(BigInteger, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Index couvrants : distribution géographique et dernières valeurs du tableau de bord
+        Index('idx_latest_stats_loc', id_loc, cases, deaths),
+        Index('idx_latest_stats_date', date, cases, deaths, recovered),
+    )
@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+
+from .base import Base
+
+class DataVersion(Base):
+    """
+    Compteur incrémenté à chaque modification des données (chargement ETL, écriture API).
+    Sert de clé d'invalidation aux caches applicatifs.
+    """
+    __tablename__ = "data_version"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,83 @@
+import json
+import base64
+import binascii
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+class InvalidCursor(ValueError):
+    """Curseur de pagination illisible ou ne correspondant pas au tri demandé."""
+
+def encode_cursor(sort_key: str, value: Any, last_id: int) -> str:
+    """
+    Curseur opaque : clé de tri, valeur de tri et id de la dernière ligne renvoyée.
+    """
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    payload = json.dumps([sort_key, value, last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_key: str, column) -> Tuple[Any, int]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key, value, last_id = json.loads(payload)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor("Curseur de pagination invalide") from e
+    if key != sort_key or not isinstance(last_id, int):
+        raise InvalidCursor("Le curseur ne correspond pas au tri demandé")
+    if value is not None:
+        try:
+            python_type = column.type.python_type
+            if python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                value = python_type(value)
+        except (NotImplementedError, TypeError, ValueError) as e:
+            raise InvalidCursor("Valeur de curseur invalide") from e
+    return value, last_id
+
+def _after(column, id_column, value: Any, last_id: int, descending: bool):
+    """
+    Condition « strictement après (value, last_id) ». MySQL et SQLite placent les NULL
+    en tête d'un tri croissant et en fin d'un tri décroissant.
+    """
+    if descending:
+        if value is None:
+            return and_(column.is_(None), id_column < last_id)
+        return or_(column < value, and_(column == value, id_column < last_id), column.is_(None))
+    if value is None:
+        return or_(and_(column.is_(None), id_column > last_id), column.isnot(None))
+    return or_(column > value, and_(column == value, id_column > last_id))
+
+def order_by_key(query: Query, column, id_column, descending: bool = False) -> Query:
+    """Tri total (colonne puis id) partagé par la pagination par offset et par curseur."""
+    if descending:
+        return query.order_by(column.desc(), id_column.desc())
+    return query.order_by(column.asc(), id_column.asc())
+
+def keyset_page(
+    query: Query,
+    column,
+    id_column,
+    sort_key: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Page suivant le curseur (pagination par clé) : la base descend l'index jusqu'à la
+    position du curseur au lieu de lire et d'écarter toutes les lignes précédentes.
+    Retourne les lignes et le curseur de la page suivante (None en fin de liste).
+    Lève InvalidCursor si le curseur est invalide.
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_key, column)
+        query = query.filter(_after(column, id_column, value, last_id, descending))
+    rows = order_by_key(query, column, id_column, descending).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort_key, getattr(last, column.key), getattr(last, id_column.key))
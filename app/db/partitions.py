@@ -0,0 +1,180 @@
+"""
+Partitionnement RANGE de `daily_stats` par date sous MySQL (par année ou par mois).
+
+Activé par DAILY_STATS_PARTITIONING, il est appliqué à la création de la table :
+MySQL n'acceptant ni clé étrangère sur une table partitionnée ni clé unique sans la
+colonne de partitionnement, les clés étrangères sont retirées et la clé primaire
+devient (id, date). Les suppressions en cascade sont alors faites par l'application.
+
+Partitions : `p_before` (antérieur à DAILY_STATS_PARTITION_START), une par période
+(`p2021`, `p202103`) et `pmax` qui reçoit le reste. La maintenance découpe `pmax`
+pour créer les DAILY_STATS_PARTITIONS_AHEAD périodes à venir avant qu'elles ne
+reçoivent des données. Une période se vide par TRUNCATE PARTITION avant d'être
+rechargée par l'ETL.
+"""
+import logging
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, event, text
+from sqlalchemy.orm import Session
+
+from app.core.config.settings import settings
+from app.db.models.base import DailyStats
+from app.db.models.rollup import DailyRollup
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLE = "daily_stats"
+BEFORE_PARTITION = "p_before"
+CATCH_ALL_PARTITION = "pmax"
+GRANULARITIES = ("year", "month")
+FOREIGN_KEYS = ("fk_daily_stats_epidemic", "fk_daily_stats_source", "fk_daily_stats_loc")
+
+def period_start(day: date, granularity: str) -> date:
+    return date(day.year, 1, 1) if granularity == "year" else date(day.year, day.month, 1)
+
+def next_period(start: date, granularity: str) -> date:
+    if granularity == "year":
+        return date(start.year + 1, 1, 1)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+def partition_name(start: date, granularity: str) -> str:
+    return f"p{start.year}" if granularity == "year" else f"p{start.year}{start.month:02d}"
+
+def partition_bounds(first: date, last: date, granularity: str) -> List[Tuple[str, date]]:
+    """(nom, borne supérieure exclue) des partitions couvrant les périodes de `first` à `last`."""
+    bounds = []
+    start = period_start(first, granularity)
+    while start <= last:
+        upper = next_period(start, granularity)
+        bounds.append((partition_name(start, granularity), upper))
+        start = upper
+    return bounds
+
+def _definitions(bounds: List[Tuple[str, date]]) -> str:
+    return ", ".join(
+        [f"PARTITION {name} VALUES LESS THAN ('{upper.isoformat()}')" for name, upper in bounds]
+        + [f"PARTITION {CATCH_ALL_PARTITION} VALUES LESS THAN (MAXVALUE)"]
+    )
+
+def partition_granularity() -> Optional[str]:
+    """Granularité configurée ("year", "month"), None si le partitionnement est désactivé."""
+    granularity = settings.DAILY_STATS_PARTITIONING.lower()
+    return granularity if granularity in GRANULARITIES else None
+
+def _horizon(granularity: str, today: Optional[date] = None) -> date:
+    """Début de la dernière période à créer à l'avance."""
+    start = period_start(today or date.today(), granularity)
+    for _ in range(settings.DAILY_STATS_PARTITIONS_AHEAD):
+        start = next_period(start, granularity)
+    return start
+
+def partitioning_statements(granularity: str, today: Optional[date] = None) -> List[str]:
+    """Instructions convertissant la table daily_stats (vide) en table partitionnée."""
+    first = date.fromisoformat(settings.DAILY_STATS_PARTITION_START)
+    bounds = [(BEFORE_PARTITION, period_start(first, granularity))]
+    bounds += partition_bounds(first, _horizon(granularity, today), granularity)
+    return [
+        *(f"ALTER TABLE {PARTITIONED_TABLE} DROP FOREIGN KEY {name}" for name in FOREIGN_KEYS),
+        f"ALTER TABLE {PARTITIONED_TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id, date)",
+        f"ALTER TABLE {PARTITIONED_TABLE} PARTITION BY RANGE COLUMNS(date) ({_definitions(bounds)})"
+    ]
+
+@event.listens_for(DailyStats.__table__, "after_create")
+def _partition_daily_stats(target, connection, **kw):
+    granularity = partition_granularity()
+    if connection.dialect.name != "mysql" or granularity is None:
+        return
+    for statement in partitioning_statements(granularity):
+        connection.exec_driver_sql(statement)
+    logger.info(f"Table {PARTITIONED_TABLE} partitionnée par {granularity}")
+
+def list_partitions(bind) -> Dict[str, Optional[date]]:
+    """
+    Partitions de daily_stats et leur borne supérieure exclue (None pour pmax),
+    dans l'ordre. Vide si la table n'est pas partitionnée (ou hors MySQL).
+    """
+    if bind.dialect.name != "mysql":
+        return {}
+    with bind.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        ), {"table": PARTITIONED_TABLE}).all()
+    return {
+        name: None if description == "MAXVALUE" else date.fromisoformat(description.strip("'"))
+        for name, description in rows
+    }
+
+def maintain_partitions(bind, today: Optional[date] = None) -> List[str]:
+    """
+    Crée les partitions des périodes à venir en découpant pmax. Retourne leurs noms.
+    """
+    granularity = partition_granularity()
+    partitions = list_partitions(bind)
+    if granularity is None or CATCH_ALL_PARTITION not in partitions:
+        if granularity is not None and bind.dialect.name == "mysql":
+            logger.warning(f"{PARTITIONED_TABLE} n'est pas partitionnée : voir sql/migrations/004_daily_stats_partitioning.sql")
+        return []
+    last_upper = max(upper for upper in partitions.values() if upper is not None)
+    missing = [
+        (name, upper) for name, upper in partition_bounds(last_upper, _horizon(granularity, today), granularity)
+        if name not in partitions
+    ]
+    if not missing:
+        return []
+    with bind.begin() as conn:
+        conn.exec_driver_sql(
+            f"ALTER TABLE {PARTITIONED_TABLE} REORGANIZE PARTITION {CATCH_ALL_PARTITION} INTO ({_definitions(missing)})"
+        )
+    names = [name for name, _ in missing]
+    logger.info(f"Partitions créées: {', '.join(names)}")
+    return names
+
+def split_period(
+    partitions: Dict[str, Optional[date]],
+    date_from: date,
+    date_to: date
+) -> Tuple[List[str], List[Tuple[date, date]]]:
+    """
+    Découpe la période [date_from, date_to[ en partitions entièrement incluses (à vider
+    par TRUNCATE) et en intervalles restants (à supprimer par DELETE).
+    """
+    whole, ranges = [], []
+    lower = None
+    covered_until = date_from
+    for name, upper in partitions.items():
+        if upper is not None and lower is not None and date_from <= lower and upper <= date_to:
+            if covered_until < lower:
+                ranges.append((covered_until, lower))
+            whole.append(name)
+            covered_until = upper
+        lower = upper
+    if covered_until < date_to:
+        ranges.append((covered_until, date_to))
+    return whole, ranges
+
+def clear_period(db: Session, date_from: date, date_to: date) -> Dict[str, object]:
+    """
+    Supprime les statistiques (et l'agrégat quotidien) de [date_from, date_to[. Les
+    partitions entièrement couvertes sont vidées par TRUNCATE PARTITION, le reste
+    par DELETE. Valide la transaction ; la version des données reste à publier.
+    """
+    bind = db.get_bind()
+    whole, ranges = split_period(list_partitions(bind), date_from, date_to)
+    deleted = 0
+    for lower, upper in ranges:
+        result = db.execute(
+            delete(DailyStats).where(DailyStats.date >= lower, DailyStats.date < upper),
+            execution_options={"include_deleting": True}
+        )
+        deleted += result.rowcount or 0
+    db.execute(delete(DailyRollup).where(DailyRollup.date >= date_from, DailyRollup.date < date_to))
+    db.commit()
+    if whole:
+        db.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} TRUNCATE PARTITION {', '.join(whole)}"))
+        db.commit()
+    logger.info(f"Période {date_from} - {date_to} vidée ({len(whole)} partition(s), {deleted} ligne(s) supprimée(s))")
+    return {"truncated_partitions": whole, "deleted_rows": deleted}
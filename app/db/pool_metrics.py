@@ -0,0 +1,134 @@
+"""
+Instrumentation des pools de connexions (événements de pool SQLAlchemy).
+
+Pour chaque moteur instrumenté : connexions ouvertes, prises et rendues, invalidées
+(connexion perdue, pre-ping en échec), et histogramme du temps d'attente pour obtenir
+une connexion, mesuré par les pools TimedQueuePool. Les compteurs sont rattachés au
+moteur, ils survivent donc à la recréation du pool (engine.dispose()).
+"""
+import logging
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+from app.core.config.settings import settings
+from app.core.metrics import Histogram, RollingWindow
+
+logger = logging.getLogger(__name__)
+
+class PoolMetrics:
+    """Compteurs et temps d'attente d'un pool de connexions."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wait = Histogram()
+        self.recent_wait = RollingWindow(settings.METRICS_WINDOW_SECONDS)
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.last_invalidation: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def record_wait(self, elapsed_ms: float) -> None:
+        self.wait.add(elapsed_ms)
+        self.recent_wait.add(elapsed_ms)
+
+    def _increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _on_invalidate(self, soft: bool, exception: Optional[BaseException]) -> None:
+        self._increment("soft_invalidations" if soft else "invalidations")
+        self.last_invalidation = repr(exception) if exception is not None else "invalidée explicitement"
+
+    def snapshot(self, pool) -> dict:
+        status = {
+            # Absents des pools sans file d'attente (SQLite en mémoire)
+            "size": getattr(pool, "size", lambda: None)(),
+            "checked_out": getattr(pool, "checkedout", lambda: None)(),
+            "checked_in": getattr(pool, "checkedin", lambda: None)(),
+            "overflow": getattr(pool, "overflow", lambda: None)(),
+            "max_overflow": getattr(pool, "_max_overflow", None),
+            "timeout": getattr(pool, "_timeout", None)
+        }
+        with self._lock:
+            counters = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "last_invalidation": self.last_invalidation
+            }
+        return {
+            "pool": type(pool).__name__,
+            **status,
+            **counters,
+            "checkout_wait": self.wait.snapshot(),
+            "recent_checkout_wait": self.recent_wait.snapshot()
+        }
+
+
+# Mesures par nom de pool (nom de journalisation du pool, conservé par engine.dispose())
+_metrics: Dict[str, PoolMetrics] = {}
+_engines: Dict[str, object] = {}
+
+def instrument(engine, name: str) -> PoolMetrics:
+    """
+    Attache les compteurs aux événements du pool de `engine` (moteur synchrone ;
+    pour un moteur asynchrone, passer async_engine.sync_engine).
+    """
+    if _engines.get(name) is engine:
+        return _metrics[name]
+    metrics = _metrics[name] = PoolMetrics(name)
+    _engines[name] = engine
+    event.listen(engine, "connect", lambda *args: metrics._increment("connects"))
+    event.listen(engine, "checkout", lambda *args: metrics._increment("checkouts"))
+    event.listen(engine, "checkin", lambda *args: metrics._increment("checkins"))
+    event.listen(engine, "invalidate", lambda conn, record, exc: metrics._on_invalidate(False, exc))
+    event.listen(engine, "soft_invalidate", lambda conn, record, exc: metrics._on_invalidate(True, exc))
+    return metrics
+
+def record_wait(pool_name: Optional[str], elapsed_ms: float) -> None:
+    metrics = _metrics.get(pool_name)
+    if metrics is not None:
+        metrics.record_wait(elapsed_ms)
+
+def snapshot() -> Dict[str, dict]:
+    """État de chaque pool instrumenté (endpoint d'administration)."""
+    return {name: _metrics[name].snapshot(engine.pool) for name, engine in _engines.items()}
+
+def prewarm(engine, count: int) -> int:
+    """
+    Ouvre `count` connexions (au plus la taille du pool) puis les rend au pool, pour
+    que les premières requêtes n'attendent pas leur établissement. Retourne le nombre
+    de connexions ouvertes.
+    """
+    size = getattr(engine.pool, "size", lambda: count)()
+    connections = []
+    try:
+        for _ in range(min(count, size)):
+            connections.append(engine.connect())
+    except Exception as e:
+        logger.warning(f"Préchauffage du pool interrompu après {len(connections)} connexion(s): {str(e)}")
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+async def prewarm_async(async_engine, count: int) -> int:
+    """Équivalent de prewarm pour un moteur asynchrone."""
+    size = getattr(async_engine.sync_engine.pool, "size", lambda: count)()
+    connections = []
+    try:
+        for _ in range(min(count, size)):
+            connections.append(await async_engine.connect())
+    except Exception as e:
+        logger.warning(f"Préchauffage du pool interrompu après {len(connections)} connexion(s): {str(e)}")
+    finally:
+        for connection in connections:
+            await connection.close()
+    return len(connections)
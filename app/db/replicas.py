@@ -0,0 +1,145 @@
+"""
+Répliques en lecture de la base (DATABASE_REPLICA_URLS).
+
+Les endpoints de lecture (get_read_db) et les services qu'ils appellent, dont
+StatsService, lisent sur une réplique choisie à tour de rôle ; les écritures et
+l'ETL restent sur la base principale (get_db, get_ingest_db).
+
+Lecture de ses propres écritures : après une requête d'écriture réussie, le client
+reçoit un cookie qui le maintient sur la base principale pendant
+REPLICA_READ_YOUR_WRITES_SECONDS, le temps que les répliques rattrapent leur retard.
+
+La version des données, qui invalide le cache des réponses et le cube analytique,
+se lit sur la base principale ; une réplique en retard sur cette version ne remplit
+ni l'un ni l'autre.
+
+Bascule : une réplique en erreur est écartée (la lecture est rejouée sur la base
+principale) jusqu'à ce que la vérification périodique (SELECT 1) la réintègre.
+"""
+import math
+import time
+import logging
+import threading
+from itertools import count
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from sqlalchemy import text
+
+from app.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_COOKIE = "db_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+class Replica:
+    """Moteurs et fabriques de sessions d'une réplique, et son état de santé."""
+
+    def __init__(
+        self,
+        name: str,
+        engine,
+        session_factory: Callable[[], Any],
+        async_engine=None,
+        async_session_factory: Optional[Callable[[], Any]] = None
+    ):
+        self.name = name
+        self.engine = engine
+        self.session_factory = session_factory
+        self.async_engine = async_engine
+        self.async_session_factory = async_session_factory
+        self.healthy = True
+        self.last_error: Optional[str] = None
+        self.failed_at: Optional[float] = None
+
+class ReplicaSet:
+    """
+    Répliques disponibles : choix à tour de rôle parmi les répliques saines, mise à
+    l'écart sur erreur et vérification périodique en arrière-plan.
+    """
+
+    def __init__(self, replicas: List[Replica], check_seconds: Optional[float] = None):
+        self.replicas = replicas
+        self.check_seconds = check_seconds or settings.REPLICA_HEALTH_CHECK_SECONDS
+        self._turn = count()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def pick(self) -> Optional[Replica]:
+        """Réplique à utiliser pour une lecture, None pour la base principale."""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    def mark_failed(self, replica: Replica, error: BaseException) -> None:
+        with self._lock:
+            if replica.healthy:
+                logger.warning(f"Réplique {replica.name} écartée, lectures sur la base principale: {error}")
+            replica.healthy = False
+            replica.last_error = str(error)
+            replica.failed_at = time.time()
+
+    def check_health(self) -> Dict[str, bool]:
+        """Vérifie chaque réplique, écarte celles en erreur et réintègre les autres."""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            except Exception as e:
+                self.mark_failed(replica, e)
+                continue
+            with self._lock:
+                if not replica.healthy:
+                    logger.info(f"Réplique {replica.name} réintégrée")
+                replica.healthy = True
+                replica.last_error = None
+        return {replica.name: replica.healthy for replica in self.replicas}
+
+    def stats(self) -> dict:
+        return {
+            "read_your_writes_seconds": settings.REPLICA_READ_YOUR_WRITES_SECONDS,
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "last_error": replica.last_error,
+                    "failed_at": replica.failed_at
+                }
+                for replica in self.replicas
+            ]
+        }
+
+    def _run(self):
+        while not self._stopped.wait(self.check_seconds):
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.error(f"Erreur de la vérification des répliques: {e}")
+
+    def start(self):
+        if not self.replicas or (self._thread and self._thread.is_alive()):
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+        self._thread.start()
+        logger.info(f"{len(self.replicas)} réplique(s) en lecture, vérifiées toutes les {self.check_seconds} s")
+
+    def stop(self):
+        self._stopped.set()
+
+def pinned_to_primary(cookies: Mapping[str, str], now: Optional[float] = None) -> bool:
+    """Indique si le client a écrit récemment et doit lire sur la base principale."""
+    try:
+        return float(cookies.get(PRIMARY_COOKIE, 0)) > (now or time.time())
+    except ValueError:
+        return False
+
+def pin_to_primary(response) -> None:
+    """Maintient le client sur la base principale après une écriture."""
+    window = settings.REPLICA_READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        PRIMARY_COOKIE, f"{time.time() + window:.3f}",
+        max_age=max(1, math.ceil(window)), httponly=True, samesite="lax"
+    )
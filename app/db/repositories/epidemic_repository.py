@@ -1,9 +1,12 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from sqlalchemy import desc, func
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import desc, func, select, union_all
 import logging
 
-from app.db.models.base import Epidemic, DailyStats, Localisation, OverallStats
+from app.db.models.base import Epidemic, DailyStats, Localisation
+from app.db.pagination import keyset_page, order_by_key
+from app.db.dialects import supports_window_functions
+from app.services import epidemic_deletion
 from app.api.schemas import (
     EpidemicCreate,
     EpidemicUpdate
@@ -11,6 +14,17 @@ from app.api.schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Statistiques quotidiennes les plus récentes par épidémie dans les données détaillées
+DETAILED_DAILY_STATS = 30
+
+# Colonnes de tri acceptées par les listes d'épidémies (paramètre sort_by)
+EPIDEMIC_SORT_COLUMNS = {
+    "name": Epidemic.name,
+    "cases": Epidemic.total_cases,
+    "deaths": Epidemic.total_deaths,
+    "date": Epidemic.start_date
+}
+
 def create_epidemic(db: Session, epidemic: EpidemicCreate) -> Epidemic:
     db_epidemic = Epidemic(**epidemic.model_dump())
     db.add(db_epidemic)
@@ -25,28 +39,49 @@ def get_epidemic(db: Session, epidemic_id: int) -> Optional[Epidemic]:
         logger.error(f"Erreur lors de la récupération de l'épidémie {epidemic_id}: {str(e)}")
         raise
 
+def _filter_epidemics(query, filters: Optional[Dict[str, Any]]):
+    if filters:
+        for key, value in filters.items():
+            if hasattr(Epidemic, key) and value is not None:
+                query = query.filter(getattr(Epidemic, key) == value)
+    return query
+
 def get_epidemics(
     db: Session,
     skip: int = 0,
     limit: int = 100,
-    filters: Optional[Dict[str, Any]] = None
+    filters: Optional[Dict[str, Any]] = None,
+    sort_by: str = "name",
+    sort_desc: bool = False
 ) -> List[Epidemic]:
     """
     Récupère la liste des épidémies avec pagination et filtres optionnels.
+    Pagination par offset : préférer get_epidemics_page pour parcourir une longue liste.
     """
     try:
-        query = db.query(Epidemic)
-        
-        if filters:
-            for key, value in filters.items():
-                if hasattr(Epidemic, key) and value is not None:
-                    query = query.filter(getattr(Epidemic, key) == value)
-        
-        return query.offset(skip).limit(limit).all()
+        query = _filter_epidemics(db.query(Epidemic), filters)
+        sort_column = EPIDEMIC_SORT_COLUMNS.get(sort_by, Epidemic.name)
+        return order_by_key(query, sort_column, Epidemic.id, sort_desc).offset(skip).limit(limit).all()
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des épidémies: {str(e)}")
         raise
 
+def get_epidemics_page(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    sort_by: str = "name",
+    sort_desc: bool = False
+) -> Tuple[List[Epidemic], Optional[str]]:
+    """
+    Récupère une page d'épidémies par curseur. Retourne les épidémies et le curseur
+    de la page suivante (None sur la dernière page).
+    """
+    sort_by = sort_by if sort_by in EPIDEMIC_SORT_COLUMNS else "name"
+    query = _filter_epidemics(db.query(Epidemic), filters)
+    return keyset_page(query, EPIDEMIC_SORT_COLUMNS[sort_by], Epidemic.id, sort_by, limit, cursor, sort_desc)
+
 def update_epidemic(
     db: Session,
     epidemic_id: int,
@@ -69,8 +104,8 @@ def delete_epidemic(db: Session, epidemic_id: int) -> bool:
     try:
         db_epidemic = db.query(Epidemic).filter(Epidemic.id == epidemic_id).first()
         if db_epidemic:
-            db.delete(db_epidemic)
-            db.commit()
+            # Suppression par lots : évite de charger les statistiques via la relation ORM
+            epidemic_deletion.delete_epidemic(db, db_epidemic)
             return True
         return False
     except Exception as e:
@@ -131,37 +166,75 @@ def count_epidemics(db: Session) -> int:
     """
     return db.query(func.count(Epidemic.id)).scalar()
 
+def _latest_stats_by_epidemic(db: Session, epidemic_ids: List[int], per_epidemic: int) -> Dict[int, List[DailyStats]]:
+    """
+    Les `per_epidemic` statistiques les plus récentes de chaque épidémie, en une requête
+    (ROW_NUMBER() par épidémie ; UNION ALL de requêtes limitées sans fonctions de fenêtrage),
+    localisations chargées par lot.
+    """
+    order = (DailyStats.date.desc(), DailyStats.id.desc())
+    if supports_window_functions(db.get_bind()):
+        ranked = select(
+            DailyStats.id,
+            func.row_number().over(partition_by=DailyStats.id_epidemic, order_by=order).label("rank")
+        ).where(DailyStats.id_epidemic.in_(epidemic_ids)).subquery()
+        latest_ids = select(ranked.c.id).where(ranked.c.rank <= per_epidemic)
+    else:
+        latest_ids = union_all(*(
+            select(DailyStats.id).where(DailyStats.id_epidemic == epidemic_id)
+            .order_by(*order).limit(per_epidemic).subquery().select()
+            for epidemic_id in epidemic_ids
+        ))
+
+    stats = db.query(DailyStats)\
+        .options(selectinload(DailyStats.location))\
+        .filter(DailyStats.id.in_(latest_ids))\
+        .order_by(DailyStats.id_epidemic, *order)\
+        .all()
+    latest: Dict[int, List[DailyStats]] = {epidemic_id: [] for epidemic_id in epidemic_ids}
+    for stat in stats:
+        latest[stat.id_epidemic].append(stat)
+    return latest
+
 def get_detailed_epidemic_data(db: Session, skip: int = 0, limit: int = 20) -> List[Dict]:
     """
     Récupère des données détaillées sur les épidémies, incluant statistiques quotidiennes,
-    informations géographiques et sources de données
+    informations géographiques et sources de données.
+    Le nombre de requêtes est fixe quelle que soit la taille de la page.
     """
-    # Récupérer les épidémies de base
-    epidemics = db.query(Epidemic).offset(skip).limit(limit).all()
-    
+    # Récupérer les épidémies de base, avec leurs statistiques globales (une requête par lot)
+    epidemics = db.query(Epidemic)\
+        .options(selectinload(Epidemic.overall_stats))\
+        .order_by(Epidemic.id)\
+        .offset(skip)\
+        .limit(limit)\
+        .all()
+    if not epidemics:
+        return []
+    epidemic_ids = [epidemic.id for epidemic in epidemics]
+
+    # Statistiques quotidiennes les plus récentes de chaque épidémie
+    latest_stats_by_epidemic = _latest_stats_by_epidemic(db, epidemic_ids, DETAILED_DAILY_STATS)
+
+    # Locations affectées, pour toute la page
+    affected_by_epidemic: Dict[int, List[Localisation]] = {epidemic_id: [] for epidemic_id in epidemic_ids}
+    affected_rows = db.query(DailyStats.id_epidemic, Localisation)\
+        .join(Localisation, DailyStats.id_loc == Localisation.id)\
+        .filter(DailyStats.id_epidemic.in_(epidemic_ids))\
+        .distinct()\
+        .order_by(DailyStats.id_epidemic, Localisation.id)\
+        .all()
+    for epidemic_id, location in affected_rows:
+        affected_by_epidemic[epidemic_id].append(location)
+
     # Préparer le résultat
     result = []
-    
+
     for epidemic in epidemics:
-        # Récupérer les statistiques quotidiennes les plus récentes
-        latest_stats = db.query(DailyStats)\
-            .filter(DailyStats.id_epidemic == epidemic.id)\
-            .order_by(desc(DailyStats.date))\
-            .limit(30)\
-            .all()
-        
-        # Récupérer les statistiques globales
-        overall_stats = db.query(OverallStats)\
-            .filter(OverallStats.id_epidemic == epidemic.id)\
-            .first()
-        
-        # Récupérer toutes les locations affectées par cette épidémie
-        affected_locations = db.query(Localisation)\
-            .join(DailyStats, DailyStats.id_loc == Localisation.id)\
-            .filter(DailyStats.id_epidemic == epidemic.id)\
-            .distinct()\
-            .all()
-        
+        latest_stats = latest_stats_by_epidemic[epidemic.id]
+        overall_stats = epidemic.overall_stats[0] if epidemic.overall_stats else None
+        affected_locations = affected_by_epidemic[epidemic.id]
+
         # Construire l'objet de données détaillées
         epidemic_data = {
             "id": epidemic.id,
@@ -1,10 +1,20 @@
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from app.db.models.base import Localisation
+from typing import List, Optional, Dict, Any, Tuple
+from app.db.models.base import Localisation, DailyStats
+from app.db.pagination import keyset_page
+from app.services import daily_rollup, latest_stats
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _filter_localisations(query, filters: Optional[Dict[str, Any]]):
+    if filters:
+        for key, value in filters.items():
+            if hasattr(Localisation, key) and value is not None:
+                query = query.filter(getattr(Localisation, key) == value)
+    return query
+
 def get_localisations(
     db: Session,
     skip: int = 0,
@@ -15,18 +25,25 @@ def get_localisations(
     Récupère la liste des localisations avec pagination et filtres optionnels.
     """
     try:
-        query = db.query(Localisation)
-        
-        if filters:
-            for key, value in filters.items():
-                if hasattr(Localisation, key) and value is not None:
-                    query = query.filter(getattr(Localisation, key) == value)
-        
-        return query.offset(skip).limit(limit).all()
+        query = _filter_localisations(db.query(Localisation), filters)
+        return query.order_by(Localisation.id).offset(skip).limit(limit).all()
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des localisations: {str(e)}")
         raise
 
+def get_localisations_page(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Localisation], Optional[str]]:
+    """
+    Récupère une page de localisations par curseur (ordre des ids). Retourne les
+    localisations et le curseur de la page suivante (None sur la dernière page).
+    """
+    query = _filter_localisations(db.query(Localisation), filters)
+    return keyset_page(query, Localisation.id, Localisation.id, "id", limit, cursor)
+
 def get_localisation(db: Session, localisation_id: int) -> Optional[Localisation]:
     """
     Récupère une localisation par son ID.
@@ -79,13 +96,29 @@ def update_localisation(
 
 def delete_localisation(db: Session, localisation_id: int) -> bool:
     """
-    Supprime une localisation.
+    Supprime une localisation et ses statistiques, en recalculant l'agrégat quotidien
+    et les dernières valeurs. La version des données reste à publier par l'appelant.
     """
     try:
         localisation = get_localisation(db, localisation_id)
         if localisation is None:
             return False
-        
+
+        # Dates de l'agrégat quotidien à recalculer, par épidémie
+        affected: Dict[int, List[Any]] = {}
+        for epidemic_id, day in db.execute(
+            select(DailyStats.id_epidemic, DailyStats.date).where(DailyStats.id_loc == localisation_id).distinct()
+        ):
+            affected.setdefault(epidemic_id, []).append(day)
+
+        # Pas de cascade en base quand daily_stats est partitionnée (app/db/partitions.py)
+        db.execute(
+            delete(DailyStats).where(DailyStats.id_loc == localisation_id),
+            execution_options={"include_deleting": True}
+        )
+        for epidemic_id, dates in affected.items():
+            daily_rollup.refresh_epidemic(db, epidemic_id, dates)
+        latest_stats.remove_location(db, localisation_id)
         db.delete(localisation)
         db.commit()
         return True
@@ -96,6 +129,7 @@ def delete_localisation(db: Session, localisation_id: int) -> bool:
 
 # Alias pour compatibilité avec location.py
 get_locations = get_localisations
+get_locations_page = get_localisations_page
 get_location = get_localisation
 delete_location = delete_localisation
 
@@ -0,0 +1,141 @@
+"""
+Recherche plein texte sur les épidémies (nom, type, pays).
+
+MySQL : index FULLTEXT `ft_epidemic_search`, interrogé en mode booléen.
+SQLite : table virtuelle FTS5 `epidemic_fts` à contenu externe, tenue à jour par
+des triggers sur `epidemic` (création, modification, suppression, y compris en masse).
+
+Chaque mot saisi est recherché par préfixe et tous les mots doivent être présents ;
+le score de pertinence du moteur est disponible pour le tri.
+"""
+import re
+import logging
+import weakref
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import DDL, event, inspect, literal_column, select, text
+from sqlalchemy.dialects.mysql import match
+
+from app.core.config.settings import settings
+from app.db.models.base import Epidemic
+
+logger = logging.getLogger(__name__)
+
+FULLTEXT_INDEX = "ft_epidemic_search"
+FTS_TABLE = "epidemic_fts"
+
+_FTS_STATEMENTS = [
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, type, country,
+        content='epidemic', content_rowid='id',
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON epidemic BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, type, country) VALUES (new.id, new.name, new.type, new.country);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON epidemic BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, type, country)
+        VALUES ('delete', old.id, old.name, old.type, old.country);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, type, country ON epidemic BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, type, country)
+        VALUES ('delete', old.id, old.name, old.type, old.country);
+        INSERT INTO {FTS_TABLE}(rowid, name, type, country) VALUES (new.id, new.name, new.type, new.country);
+    END"""
+]
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Moteurs dont la table epidemic_fts existe (évite de la rechercher à chaque requête)
+_fts_engines: "weakref.WeakKeyDictionary[Any, bool]" = weakref.WeakKeyDictionary()
+
+def _sqlite_has_fts5(connection) -> bool:
+    options = {row[0] for row in connection.exec_driver_sql("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in options
+
+def _create_fts(connection, rebuild: bool = False) -> None:
+    for statement in _FTS_STATEMENTS:
+        connection.exec_driver_sql(statement)
+    if rebuild:
+        connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+@event.listens_for(Epidemic.__table__, "after_create")
+def _create_sqlite_fts(target, connection, **kw):
+    # L'index FULLTEXT MySQL est déclaré sur le modèle ; SQLite utilise FTS5
+    if connection.dialect.name == "sqlite" and _sqlite_has_fts5(connection):
+        _create_fts(connection)
+
+def ensure_search_index(engine) -> None:
+    """
+    Crée l'index de recherche d'une base existante (créée avant son introduction)
+    et l'alimente avec les épidémies déjà présentes.
+    """
+    inspector = inspect(engine)
+    if "epidemic" not in inspector.get_table_names():
+        return
+    if engine.dialect.name == "mysql":
+        if any(index["name"] == FULLTEXT_INDEX for index in inspector.get_indexes("epidemic")):
+            return
+        with engine.begin() as conn:
+            conn.execute(DDL(f"ALTER TABLE epidemic ADD FULLTEXT INDEX {FULLTEXT_INDEX} (name, type, country)"))
+        logger.info(f"Index FULLTEXT {FULLTEXT_INDEX} créé")
+    elif engine.dialect.name == "sqlite" and FTS_TABLE not in inspector.get_table_names():
+        with engine.begin() as conn:
+            if not _sqlite_has_fts5(conn):
+                logger.warning("SQLite compilé sans FTS5 : recherche par LIKE")
+                return
+            _create_fts(conn, rebuild=True)
+        logger.info(f"Table {FTS_TABLE} créée et alimentée")
+
+def _has_fts(bind) -> bool:
+    engine = bind.engine
+    if engine not in _fts_engines:
+        _fts_engines[engine] = FTS_TABLE in inspect(engine).get_table_names()
+    return _fts_engines[engine]
+
+def search_words(term: str) -> List[str]:
+    return _WORD.findall(term.lower())[:settings.SEARCH_MAX_WORDS]
+
+def search_epidemics(query, term: str, bind) -> Tuple[Any, Optional[Any]]:
+    """
+    Filtre `query` (sur Epidemic) par la recherche `term`. Retourne la requête et
+    l'expression de tri par pertinence décroissante (None sans index plein texte).
+    """
+    words = search_words(term)
+    if not words:
+        return query, None
+
+    if bind.dialect.name == "mysql":
+        # Mots plus courts que innodb_ft_min_token_size : absents de l'index
+        indexed = [word for word in words if len(word) >= settings.SEARCH_MIN_TOKEN_SIZE]
+        if indexed:
+            score = match(Epidemic.name, Epidemic.type, Epidemic.country,
+                          against=" ".join(f"+{word}*" for word in indexed)).in_boolean_mode()
+            query = query.filter(score)
+            for word in words:
+                if word not in indexed:
+                    query = query.filter(_like_prefix(word))
+            return query, score.desc()
+        return query.filter(*(_like_prefix(word) for word in words)), None
+
+    if bind.dialect.name == "sqlite" and _has_fts(bind):
+        matches = select(
+            literal_column("rowid").label("id"),
+            literal_column("rank").label("rank")
+        ).select_from(text(FTS_TABLE)).where(
+            literal_column(FTS_TABLE).op("MATCH")(" ".join(f'"{word}"*' for word in words))
+        ).subquery("search")
+        # rank FTS5 (bm25) : plus petit = plus pertinent
+        return query.join(matches, matches.c.id == Epidemic.id), matches.c.rank.asc()
+
+    search_term = f"%{term}%"
+    return query.filter(
+        (Epidemic.name.ilike(search_term))
+        | (Epidemic.type.ilike(search_term))
+        | (Epidemic.country.ilike(search_term))
+    ), None
+
+def _like_prefix(word: str):
+    pattern = f"{word}%"
+    return Epidemic.name.ilike(pattern) | Epidemic.type.ilike(pattern) | Epidemic.country.ilike(pattern)
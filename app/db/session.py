@@ -1,19 +1,102 @@
+import time
+import logging
+from typing import Any, Callable, List, Optional, Union
+
 import pymysql
 pymysql.install_as_MySQLdb()
 
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from app.core.config.settings import settings
+from app.core import metrics
+from app.db import pool_metrics, replicas
+from app.db.replicas import Replica, ReplicaSet
+from app.db import visibility  # noqa: F401  (masque les épidémies en cours de suppression)
+from app.db import search  # noqa: F401  (crée l'index FTS5 avec la table epidemic sous SQLite)
+from app.db import partitions  # noqa: F401  (partitionne daily_stats à sa création sous MySQL)
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=False
-)
+try:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+except ImportError:  # greenlet absent
+    AsyncSession = None
+
+logger = logging.getLogger(__name__)
+
+class _TimedCheckout:
+    """
+    Mesure le temps d'attente d'une connexion du pool (histogramme du pool, et mesure
+    suivie par la contre-pression de l'ETL pour les pools de l'API).
+    """
+    feeds_backpressure = True
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            pool_metrics.record_wait(self.logging_name, elapsed)
+            if self.feeds_backpressure:
+                metrics.pool_wait.add(elapsed)
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
 
-# Création de la session factory
+class TimedIngestQueuePool(_TimedCheckout, QueuePool):
+    feeds_backpressure = False
+
+
+def _engine_options(workload: str, url: Optional[str] = None, pool_name: Optional[str] = None) -> dict:
+    """
+    Options du moteur d'une charge de travail ("api" ou "ingest"), lues dans les
+    paramètres DB_<WORKLOAD>_*. SQLite garde son pool par défaut.
+    """
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        # Nom du pool, qui rattache ses temps d'attente à ses mesures (pool_metrics)
+        "pool_logging_name": pool_name or workload,
+        "echo": False
+    }
+    if (url or settings.SQLALCHEMY_DATABASE_URL).startswith("sqlite"):
+        return options
+
+    prefix = f"DB_{workload.upper()}_"
+    options.update(
+        # Seul le pool API alimente la mesure d'attente suivie par la contre-pression
+        poolclass=TimedQueuePool if workload == "api" else TimedIngestQueuePool,
+        pool_size=getattr(settings, prefix + "POOL_SIZE"),
+        max_overflow=getattr(settings, prefix + "MAX_OVERFLOW"),
+        pool_timeout=getattr(settings, prefix + "POOL_TIMEOUT")
+    )
+    isolation_level = getattr(settings, prefix + "ISOLATION_LEVEL")
+    if isolation_level:
+        options["isolation_level"] = isolation_level
+    return options
+
+
+# Un moteur (et donc un pool) par charge de travail : un ETL long ne peut pas
+# épuiser les connexions des requêtes API
+engines = {
+    workload: create_engine(settings.SQLALCHEMY_DATABASE_URL, **_engine_options(workload))
+    for workload in ("api", "ingest")
+}
+engine = engines["api"]
+ingest_engine = engines["ingest"]
+for workload, workload_engine in engines.items():
+    pool_metrics.instrument(workload_engine, workload)
+
+# Création des session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+IngestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=ingest_engine)
 
 def get_db():
     """
@@ -24,3 +107,184 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def async_database_url(url: str) -> Optional[str]:
+    """
+    URL du moteur asynchrone équivalent (aiomysql, aiosqlite), None si la base ne peut
+    pas être partagée (SQLite en mémoire) ou le pilote n'est pas connu.
+    """
+    url = make_url(url)
+    drivers = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+    if url.get_backend_name() not in drivers:
+        return None
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return None
+    return url.set(drivername=drivers[url.get_backend_name()]).render_as_string(hide_password=False)
+
+
+# Nom du pool du moteur asynchrone (mesures et préchauffage avec les paramètres DB_API_*)
+ASYNC_POOL = "api_async"
+
+def _create_async_engine(url: Optional[str], sync_url: str, pool_name: str):
+    if not settings.ASYNC_READS_ENABLED or AsyncSession is None or url is None:
+        return None
+    options = _engine_options("api", sync_url, pool_name)
+    if "poolclass" in options:
+        options["poolclass"] = TimedAsyncQueuePool
+    try:
+        async_engine = create_async_engine(url, **options)
+    except ImportError as e:
+        logger.warning(f"Pilote asynchrone indisponible ({e}) : lectures sur le moteur synchrone")
+        return None
+    pool_metrics.instrument(async_engine.sync_engine, pool_name)
+    return async_engine
+
+
+# Moteur asynchrone des lectures de l'API : les requêtes en attente de la base
+# n'occupent pas de thread, la concurrence n'est limitée que par le pool
+async_engine = _create_async_engine(
+    settings.ASYNC_DATABASE_URL or async_database_url(settings.SQLALCHEMY_DATABASE_URL),
+    settings.SQLALCHEMY_DATABASE_URL, ASYNC_POOL
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False) if async_engine is not None else None
+
+def create_replica_set(urls: List[str]) -> ReplicaSet:
+    """
+    Moteurs (synchrone et asynchrone, pool DB_API_*) des répliques en lecture.
+    """
+    members = []
+    for index, url in enumerate(urls, start=1):
+        name = f"replica{index}"
+        replica_engine = create_engine(url, **_engine_options("api", url, name))
+        pool_metrics.instrument(replica_engine, name)
+        replica_async_engine = _create_async_engine(async_database_url(url), url, f"{name}_async")
+        members.append(Replica(
+            name, replica_engine,
+            sessionmaker(autocommit=False, autoflush=False, bind=replica_engine),
+            replica_async_engine,
+            async_sessionmaker(replica_async_engine, expire_on_commit=False) if replica_async_engine is not None else None
+        ))
+    return ReplicaSet(members)
+
+
+# Répliques en lecture (vide : toutes les lectures sur la base principale)
+replica_set = create_replica_set([url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()])
+
+# Session reçue par les endpoints de lecture
+ReadSession = Union[AsyncSession, Session] if AsyncSession is not None else Session
+
+def _read_session(replica: Optional[Replica], synchronous: bool = False) -> ReadSession:
+    sync_factory = replica.session_factory if replica is not None else SessionLocal
+    if synchronous:
+        factory = sync_factory
+    elif replica is not None:
+        factory = replica.async_session_factory or sync_factory
+    else:
+        factory = AsyncSessionLocal or sync_factory
+    db = factory()
+    db.info["replica"] = replica
+    # Session synchrone sur la même base, pour run_read_in_threadpool
+    db.info["sync_session_factory"] = sync_factory
+    return db
+
+def _is_async(db: ReadSession) -> bool:
+    return AsyncSession is not None and isinstance(db, AsyncSession)
+
+def primary_bind(db: Session):
+    """
+    Moteur de la base principale, pour une lecture qui ne doit pas dépendre du retard
+    d'une réplique (version des données). Depuis une connexion asynchrone (run_sync),
+    le moteur asynchrone principal reste utilisable sans bloquer la boucle d'événements.
+    """
+    if db.info.get("replica") is None:
+        return db.get_bind()
+    if db.get_bind().dialect.is_async and AsyncSessionLocal is not None:
+        return AsyncSessionLocal.kw["bind"].sync_engine
+    return SessionLocal.kw["bind"]
+
+async def _close_read_session(db: ReadSession) -> None:
+    if _is_async(db):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
+
+async def get_read_db(request: Request):
+    """
+    Session des endpoints de lecture, sur une réplique si elles sont configurées et
+    que le client n'a pas écrit récemment, sinon sur la base principale :
+    AsyncSession sur le moteur asynchrone, ou Session synchrone si celui-ci est
+    indisponible. À utiliser avec run_read.
+    """
+    replica = None if replicas.pinned_to_primary(request.cookies) else replica_set.pick()
+    db = _read_session(replica)
+    try:
+        yield db
+    finally:
+        await _close_read_session(db)
+
+def get_query_db(request: Request):
+    """
+    Session synchrone sur une réplique (comme get_read_db), pour les endpoints de
+    lecture restés synchrones : export en flux des statistiques quotidiennes.
+    """
+    replica = None if replicas.pinned_to_primary(request.cookies) else replica_set.pick()
+    db = (replica.session_factory if replica is not None else SessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def _run_on(db: ReadSession, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    if _is_async(db):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+async def run_read(db: ReadSession, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Exécute `fn(session, *args, **kwargs)` (code ORM synchrone des services) : sur la
+    connexion asynchrone via run_sync, sans thread, ou dans le pool de threads pour
+    une Session synchrone. Si la session est sur une réplique en erreur, celle-ci est
+    écartée et la lecture rejouée sur la base principale.
+
+    Avec run_sync, `fn` s'exécute sur la boucle d'événements : elle doit se limiter à
+    des requêtes, sans calcul coûteux ni verrou de thread (voir run_read_in_threadpool).
+    """
+    try:
+        return await _run_on(db, fn, *args, **kwargs)
+    except OperationalError as e:
+        replica = db.info.get("replica")
+        if replica is None:
+            raise
+        replica_set.mark_failed(replica, e)
+    primary = _read_session(None, synchronous=not _is_async(db))
+    try:
+        return await _run_on(primary, fn, *args, **kwargs)
+    finally:
+        await _close_read_session(primary)
+
+async def run_read_in_threadpool(db: ReadSession, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Comme run_read, mais toujours dans le pool de threads, sur une Session synchrone
+    de la même base (réplique ou principale) : pour les lectures dont le calcul Python
+    domine (agrégats du tableau de bord, cube analytique, séries temporelles). Elles
+    n'occupent pas la boucle d'événements, et StatsService y exécute ses requêtes en
+    parallèle sur le pool synchrone.
+    """
+    if not _is_async(db):
+        return await run_read(db, fn, *args, **kwargs)
+    sync_db = db.info.get("sync_session_factory", SessionLocal)()
+    sync_db.info["replica"] = db.info.get("replica")
+    try:
+        return await run_read(sync_db, fn, *args, **kwargs)
+    finally:
+        await _close_read_session(sync_db)
+
+def get_ingest_db():
+    """
+    Session sur le pool d'ingestion, pour les endpoints qui lancent un chargement
+    """
+    db = IngestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
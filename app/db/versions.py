@@ -0,0 +1,34 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import select, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models.version import DataVersion
+
+logger = logging.getLogger(__name__)
+
+# Version de l'ensemble des données servies par l'API
+DATA_VERSION = "data"
+# Version des dimensions (épidémies, localisations, sources de données)
+DIMENSIONS_VERSION = "dimensions"
+
+def get_version(db: Session, name: str = DATA_VERSION) -> int:
+    return db.execute(select(DataVersion.version).where(DataVersion.name == name)).scalar() or 0
+
+def bump_version(db: Session, name: str = DATA_VERSION) -> int:
+    """
+    Incrémente la version dans sa propre transaction (à appeler après la validation des données).
+    """
+    values = {"version": DataVersion.version + 1, "updated_at": datetime.utcnow()}
+    result = db.execute(update(DataVersion).where(DataVersion.name == name).values(**values))
+    if result.rowcount == 0:
+        try:
+            db.execute(insert(DataVersion).values(name=name, version=1, updated_at=datetime.utcnow()))
+        except IntegrityError:
+            # Créée entre-temps par un autre processus
+            db.rollback()
+            db.execute(update(DataVersion).where(DataVersion.name == name).values(**values))
+    db.commit()
+    return get_version(db, name)
@@ -0,0 +1,30 @@
+"""
+Masque des lectures ORM les épidémies en cours de suppression et leurs statistiques.
+
+Le filtre s'applique à toutes les sessions. Le service de suppression le contourne
+avec l'option d'exécution `include_deleting=True`.
+"""
+from sqlalchemy import event, select, true, false
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from app.db.models.base import Epidemic, DailyStats, OverallStats
+
+def _deleting_epidemics():
+    # Sous-requête sur la table (et non l'entité) pour ne pas recevoir elle-même le filtre
+    epidemic = Epidemic.__table__
+    return select(epidemic.c.id).where(epidemic.c.deleting == true())
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_deleting_epidemics(execute_state):
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or execute_state.execution_options.get("include_deleting", False)
+    ):
+        return
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(Epidemic, Epidemic.deleting == false(), include_aliases=True),
+        with_loader_criteria(DailyStats, DailyStats.id_epidemic.not_in(_deleting_epidemics()), include_aliases=True),
+        with_loader_criteria(OverallStats, OverallStats.id_epidemic.not_in(_deleting_epidemics()), include_aliases=True)
+    )
@@ -1,11 +1,19 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+import time
 import logging
-from sqlalchemy import inspect
+import threading
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
 
 from .core.config.settings import settings
-from .db.session import engine
+from .core.metrics import api_latency
+from .db.session import engine, ingest_engine, async_engine, replica_set, IngestSessionLocal
 from .db.models.base import Base
+from .db import search, partitions, pool_metrics, replicas
+from .services.scheduler import scheduler
+from .services.watch_folder import watcher
+from .services import epidemic_deletion, daily_rollup, latest_stats
 from .api.endpoints import (
     stats_router, epidemics_router, dashboard_router, 
     daily_stats_router, location_router, data_sources_router, admin_router, auth_router
@@ -37,15 +45,104 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Latence des requêtes API, suivie par la contre-pression de l'ETL (administration exclue)
+@app.middleware("http")
+async def record_api_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    path = request.url.path
+    if path.startswith(settings.API_V1_STR) and not path.startswith(f"{settings.API_V1_STR}/admin"):
+        api_latency.add((time.perf_counter() - started) * 1000)
+    return response
+
+# Lecture de ses propres écritures : après une écriture, le client lit sur la base principale
+@app.middleware("http")
+async def pin_writers_to_primary(request: Request, call_next):
+    response = await call_next(request)
+    if replica_set.replicas and request.method not in replicas.SAFE_METHODS and response.status_code < 400:
+        replicas.pin_to_primary(response)
+    return response
+
+def add_missing_columns(inspector, existing_tables):
+    """
+    Ajoute aux tables existantes les colonnes ajoutées aux modèles depuis leur création
+    (uniquement celles qui acceptent NULL ou ont une valeur par défaut, voir sql/migrations/).
+    """
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable and column.server_default is None:
+                logger.warning(f"Colonne {table.name}.{column.name} manquante : migration manuelle requise")
+                continue
+            ddl = CreateColumn(column).compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+            logger.info(f"Colonne {table.name}.{column.name} ajoutée")
+
+def add_missing_indexes(inspector, existing_tables):
+    """
+    Crée sur les tables existantes les index ajoutés aux modèles depuis leur création
+    (voir sql/migrations/). L'index plein texte est géré par app/db/search.py.
+    """
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes or index.name == search.FULLTEXT_INDEX:
+                continue
+            try:
+                index.create(bind=engine)
+                logger.info(f"Index {table.name}.{index.name} créé")
+            except Exception as e:
+                logger.error(f"Création de l'index {table.name}.{index.name} impossible: {str(e)}")
+
+def rebuild_daily_rollup():
+    db = IngestSessionLocal()
+    try:
+        daily_rollup.rebuild(db)
+    except Exception as e:
+        logger.error(f"Erreur lors de la construction de l'agrégat quotidien: {str(e)}")
+    finally:
+        db.close()
+
+def rebuild_latest_stats():
+    db = IngestSessionLocal()
+    try:
+        latest_stats.rebuild(db)
+    except Exception as e:
+        logger.error(f"Erreur lors de la construction des dernières valeurs: {str(e)}")
+    finally:
+        db.close()
+
+async def prewarm_pools():
+    """
+    Ouvre à l'avance DB_API_POOL_PREWARM / DB_INGEST_POOL_PREWARM connexions par pool.
+    """
+    opened = {}
+    if settings.DB_API_POOL_PREWARM:
+        opened["api"] = pool_metrics.prewarm(engine, settings.DB_API_POOL_PREWARM)
+        if async_engine is not None:
+            opened["api_async"] = await pool_metrics.prewarm_async(async_engine, settings.DB_API_POOL_PREWARM)
+    if settings.DB_INGEST_POOL_PREWARM:
+        opened["ingest"] = pool_metrics.prewarm(ingest_engine, settings.DB_INGEST_POOL_PREWARM)
+    if opened:
+        logger.info(f"Pools préchauffés: {opened}")
+
 # --- Démarrage de l'application ---
 @app.on_event("startup")
 async def startup_db_client():
     try:
         inspector = inspect(engine)
         existing_tables = set(inspector.get_table_names())
-        required_tables = {"epidemic", "data_source", "localisation", "daily_stats", "overall_stats"}
+        required_tables = set(Base.metadata.tables)
 
         if not required_tables.issubset(existing_tables):
             missing_tables = required_tables - existing_tables
@@ -53,11 +150,35 @@ async def startup_db_client():
             logger.info("Initialisation des tables de la base de données...")
             Base.metadata.create_all(bind=engine)
             logger.info("Tables initialisées avec succès")
+            if "daily_rollup" in missing_tables and "daily_stats" in existing_tables:
+                threading.Thread(target=rebuild_daily_rollup, name="daily-rollup", daemon=True).start()
+            if "latest_stats" in missing_tables and "daily_stats" in existing_tables:
+                threading.Thread(target=rebuild_latest_stats, name="latest-stats", daemon=True).start()
         else:
             logger.info("Toutes les tables requises existent déjà dans la base de données")
+        add_missing_columns(inspector, existing_tables)
+        add_missing_indexes(inspector, existing_tables)
+        search.ensure_search_index(engine)
+        partitions.maintain_partitions(engine)
     except Exception as e:
         logger.error(f"Erreur lors de l'initialisation des tables: {str(e)}")
 
+    await prewarm_pools()
+    epidemic_deletion.resume_deletions(ingest_engine)
+
+    if settings.ETL_SCHEDULER_ENABLED:
+        scheduler.start()
+    if settings.WATCH_FOLDER_ENABLED:
+        watcher.start()
+    replica_set.start()
+
+@app.on_event("shutdown")
+def shutdown_background_jobs():
+    scheduler.stop()
+    watcher.stop()
+    replica_set.stop()
+
+
 # --- Routing en fonction de la configuration ---
 
 # Base API toujours incluse
@@ -0,0 +1,310 @@
+"""
+Moteur de lecture en mémoire : `daily_stats` chargée dans un cube NumPy dense
+indexé par (épidémie, localisation, jour), une matrice par métrique.
+
+Les données ne changent qu'au chargement : le cube est reconstruit quand la version
+des données change, puis remplacé d'un bloc (les requêtes en cours gardent l'ancien).
+Les agrégats du tableau de bord et des séries temporelles deviennent des réductions
+vectorisées au lieu de requêtes d'agrégation.
+
+Avec les instantanés (ANALYTICS_SNAPSHOT_ENABLED), le cube de chaque version est écrit
+sur disque une fois et projeté en mémoire par tous les workers (app/services/analytics_snapshot.py).
+"""
+import time
+import logging
+import threading
+from collections import namedtuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import response_cache, dimension_cache
+from app.core.config.settings import settings
+from app.db.models.base import DailyStats
+from app.services.analytics_snapshot import map_snapshot, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("cases", "active", "deaths", "recovered", "new_cases", "new_deaths", "new_recovered")
+
+# Même forme que les lignes de StatsService._scan_totals
+Totals = namedtuple("Totals", ["id_epidemic", "id_loc", "cases", "deaths"])
+
+class CubeTooLarge(ValueError):
+    """Le cube dense dépasserait ANALYTICS_CUBE_MAX_CELLS."""
+
+class AnalyticsCube:
+    def __init__(
+        self,
+        version: int,
+        epidemic_ids: np.ndarray,
+        location_ids: np.ndarray,
+        start: np.datetime64,
+        values: Dict[str, np.ndarray],
+        present: np.ndarray
+    ):
+        self.version = version
+        self.epidemic_ids = epidemic_ids
+        self.location_ids = location_ids
+        self.epidemic_index = {int(epidemic_id): i for i, epidemic_id in enumerate(epidemic_ids)}
+        self.location_index = {int(location_id): i for i, location_id in enumerate(location_ids)}
+        self.dates = start + np.arange(present.shape[2])
+        self.values = values
+        # Vrai si une ligne daily_stats existe pour (épidémie, localisation, jour)
+        self.present = present
+        self.built_at = time.time()
+
+    @classmethod
+    def load(cls, db: Session, version: int, max_cells: Optional[int] = None) -> "AnalyticsCube":
+        """Charge daily_stats par lots (curseur serveur) et remplit le cube."""
+        max_cells = max_cells or settings.ANALYTICS_CUBE_MAX_CELLS
+        stmt = select(
+            DailyStats.id_epidemic, DailyStats.id_loc, DailyStats.date,
+            *(getattr(DailyStats, metric) for metric in METRICS)
+        ).execution_options(yield_per=settings.DAILY_STATS_STREAM_BATCH_SIZE)
+
+        chunks: List[List[np.ndarray]] = []
+        result = db.execute(stmt)
+        try:
+            for rows in result.partitions():
+                columns = list(zip(*rows))
+                chunks.append(
+                    [np.array(columns[0], dtype=np.int64), np.array(columns[1], dtype=np.int64),
+                     np.array(columns[2], dtype="datetime64[D]")]
+                    + [np.fromiter((value or 0 for value in column), dtype=np.int64, count=len(column))
+                       for column in columns[3:]]
+                )
+        finally:
+            result.close()
+
+        if not chunks:
+            empty = np.zeros((0, 0, 0), dtype=np.int32)
+            return cls(version, np.array([], dtype=np.int64), np.array([], dtype=np.int64),
+                       np.datetime64("1970-01-01"), {metric: empty for metric in METRICS}, empty.astype(bool))
+
+        columns = [np.concatenate(parts) for parts in zip(*chunks)]
+        epidemic_ids, epidemic_positions = np.unique(columns[0], return_inverse=True)
+        location_ids, location_positions = np.unique(columns[1], return_inverse=True)
+        start = columns[2].min()
+        day_positions = (columns[2] - start).astype(np.int64)
+        shape = (len(epidemic_ids), len(location_ids), int(day_positions.max()) + 1)
+
+        cells = shape[0] * shape[1] * shape[2] * len(METRICS)
+        if cells > max_cells:
+            raise CubeTooLarge(f"Cube de {cells} cellules (limite {max_cells})")
+
+        present = np.zeros(shape, dtype=bool)
+        present[epidemic_positions, location_positions, day_positions] = True
+        values = {}
+        for metric, column in zip(METRICS, columns[3:]):
+            # int32 par cellule ; les réductions se font en int64
+            cube = np.zeros(shape, dtype=np.int32)
+            cube[epidemic_positions, location_positions, day_positions] = column
+            values[metric] = cube
+        return cls(version, epidemic_ids, location_ids, start, values, present)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "AnalyticsCube":
+        """Cube dont les matrices sont les projections en lecture seule d'un instantané."""
+        meta = snapshot["meta"]
+        return cls(
+            meta["version"],
+            np.array(meta["epidemic_ids"], dtype=np.int64),
+            np.array(meta["location_ids"], dtype=np.int64),
+            np.datetime64(meta["start_date"]),
+            snapshot["values"],
+            snapshot["present"]
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.present.nbytes + sum(cube.nbytes for cube in self.values.values())
+
+    def _select(self, epidemic_id: Optional[int], location_ids: Sequence[int]) -> Tuple[Any, Any]:
+        """Index (épidémies, localisations) correspondant aux filtres ; vide si inconnus."""
+        if epidemic_id is None:
+            epidemics = slice(None)
+        else:
+            epidemics = [self.epidemic_index[epidemic_id]] if epidemic_id in self.epidemic_index else []
+        if not location_ids:
+            locations = slice(None)
+        else:
+            locations = [self.location_index[i] for i in location_ids if i in self.location_index]
+        return epidemics, locations
+
+    def totals(self) -> List[Totals]:
+        """Somme de cas et décès par (épidémie, localisation) présente."""
+        cases = self.values["cases"].sum(axis=2, dtype=np.int64)
+        deaths = self.values["deaths"].sum(axis=2, dtype=np.int64)
+        epidemic_positions, location_positions = np.nonzero(self.present.any(axis=2))
+        return [
+            Totals(int(self.epidemic_ids[e]), int(self.location_ids[loc]), int(cases[e, loc]), int(deaths[e, loc]))
+            for e, loc in zip(epidemic_positions, location_positions)
+        ]
+
+    def daily(
+        self,
+        metrics: Sequence[str],
+        epidemic_id: Optional[int] = None,
+        location_ids: Sequence[int] = ()
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Séries quotidiennes sommées sur la sélection, limitées aux jours qui ont au
+        moins une ligne (comme un GROUP BY date). Retourne (dates, {métrique: valeurs}).
+        """
+        epidemics, locations = self._select(epidemic_id, location_ids)
+        present = self.present[epidemics][:, locations]
+        days = present.any(axis=(0, 1)) if present.size else np.zeros(self.dates.shape, dtype=bool)
+        series = {}
+        for metric in metrics:
+            selection = self.values[metric][epidemics][:, locations]
+            series[metric] = selection.sum(axis=(0, 1), dtype=np.int64)[days]
+        return self.dates[days], series
+
+    def daily_evolution(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Équivalent de daily_rollup.get_daily_evolution pour l'agrégat global."""
+        dates, series = self.daily(("new_cases", "new_deaths", "active"))
+        if not len(dates):
+            return []
+        window = dates > dates[-1] - np.timedelta64(days, "D")
+        return [
+            {
+                "date": str(day),
+                "new_cases": int(new_cases),
+                "new_deaths": int(new_deaths),
+                "active_cases": int(active)
+            }
+            for day, new_cases, new_deaths, active in zip(
+                dates[window], series["new_cases"][window], series["new_deaths"][window], series["active"][window]
+            )
+        ]
+
+    def average_rates(self) -> Tuple[float, float]:
+        """
+        Moyennes par ligne de new_cases/cases et deaths/cases (en %), lignes à cas nuls exclues.
+        """
+        cases = self.values["cases"]
+        rows = self.present & (cases != 0)
+        if not rows.any():
+            return 0.0, 0.0
+        denominators = cases[rows].astype(np.float64)
+        transmission = float(np.mean(self.values["new_cases"][rows] * 100.0 / denominators))
+        mortality = float(np.mean(self.values["deaths"][rows] * 100.0 / denominators))
+        return transmission, mortality
+
+class CubeEngine:
+    """
+    Cube courant, reconstruit à la première lecture qui voit une nouvelle version des données.
+    Désactivé (ANALYTICS_CUBE_ENABLED) ou trop volumineux : get() retourne None et les
+    appelants interrogent la base.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        max_cells: Optional[int] = None,
+        snapshots: Optional[bool] = None,
+        snapshot_dir: Optional[str] = None
+    ):
+        self.enabled = settings.ANALYTICS_CUBE_ENABLED if enabled is None else enabled
+        self.max_cells = max_cells or settings.ANALYTICS_CUBE_MAX_CELLS
+        self.snapshots = settings.ANALYTICS_SNAPSHOT_ENABLED if snapshots is None else snapshots
+        self.snapshot_dir = snapshot_dir or settings.ANALYTICS_SNAPSHOT_DIR
+        self.source: Optional[str] = None
+        self._cube: Optional[AnalyticsCube] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.last_error: Optional[str] = None
+
+    def get(self, db: Session) -> Optional[AnalyticsCube]:
+        if not self.enabled:
+            return None
+        version = response_cache.current_version(db)
+        cube = self._cube
+        if cube is not None and cube.version == version:
+            return cube
+        # Sur une connexion asynchrone (run_sync), l'appelant occupe la boucle d'événements :
+        # attendre le verrou bloquerait la construction en cours, qui attend elle-même la
+        # boucle. Pendant une construction, la lecture se fait alors en base.
+        if not self._lock.acquire(blocking=not db.get_bind().dialect.is_async):
+            return None
+        try:
+            if self._cube is None or self._cube.version != version:
+                if not response_cache.is_current(db, version):
+                    return None
+                started = time.perf_counter()
+                try:
+                    cube, self.source = self._load(db, version)
+                except CubeTooLarge as e:
+                    self.last_error = str(e)
+                    logger.warning(f"Cube analytique non construit: {e}")
+                    return None
+                self._cube = cube
+                self.builds += 1
+                self.last_error = None
+                logger.info(
+                    f"Cube analytique chargé ({self.source}) pour la version {version}: {cube.present.shape}, "
+                    f"{cube.nbytes / 1e6:.1f} Mo en {time.perf_counter() - started:.2f}s"
+                )
+            return self._cube
+        finally:
+            self._lock.release()
+
+    def _load(self, db: Session, version: int) -> Tuple[AnalyticsCube, str]:
+        """Projette l'instantané de la version s'il existe, sinon construit le cube (et l'écrit)."""
+        if self.snapshots:
+            snapshot = map_snapshot(version, self.snapshot_dir)
+            if snapshot is not None:
+                return AnalyticsCube.from_snapshot(snapshot), "snapshot"
+        cube = AnalyticsCube.load(db, version, self.max_cells)
+        if self.snapshots:
+            try:
+                write_snapshot(cube, self.snapshot_dir)
+                snapshot = map_snapshot(version, self.snapshot_dir)
+                if snapshot is not None:
+                    # La copie privée est libérée au profit de la projection partagée
+                    return AnalyticsCube.from_snapshot(snapshot), "snapshot"
+            except OSError as e:
+                logger.warning(f"Instantané analytique non écrit: {e}")
+        return cube, "database"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cube = None
+
+    def stats(self) -> Dict[str, Any]:
+        cube = self._cube
+        return {
+            "enabled": self.enabled,
+            "snapshots": self.snapshots,
+            "source": self.source if cube else None,
+            "version": cube.version if cube else None,
+            "shape": list(cube.present.shape) if cube else None,
+            "start_date": str(cube.dates[0]) if cube is not None and len(cube.dates) else None,
+            "megabytes": round(cube.nbytes / 1e6, 2) if cube else 0,
+            "builds": self.builds,
+            "last_error": self.last_error
+        }
+
+
+analytics_cube = CubeEngine()
+
+def publish_data_version(db: Session, warm: bool = True) -> int:
+    """
+    Fin d'un chargement : publie une nouvelle version des données, écrit l'instantané
+    analytique de cette version (si activé) pour que les workers le projettent au lieu
+    d'interroger la base, puis préchauffe le cache des réponses. Le chargement pouvant
+    créer des épidémies, localisations ou sources, le cache des dimensions est invalidé.
+    """
+    version = response_cache.invalidate(db)
+    dimension_cache.invalidate(db)
+    if analytics_cube.snapshots:
+        try:
+            write_snapshot(AnalyticsCube.load(db, version, analytics_cube.max_cells), analytics_cube.snapshot_dir)
+        except (CubeTooLarge, OSError) as e:
+            logger.warning(f"Instantané analytique non écrit pour la version {version}: {e}")
+    if warm:
+        response_cache.warm(db, version)
+    return version
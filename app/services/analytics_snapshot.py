@@ -0,0 +1,95 @@
+"""
+Instantané binaire du cube analytique sur disque local, partagé par les workers.
+
+Un répertoire par version des données (`v<version>/`) contient une matrice int32 par
+métrique et le masque de présence au format .npy, plus `meta.json` (dictionnaires
+des dimensions). Les workers les projettent en mémoire en lecture seule
+(`mmap_mode="r"`) : N workers partagent une seule copie dans le cache de pages.
+
+Le répertoire est écrit sous un nom temporaire puis renommé : un lecteur ne voit
+jamais un instantané incomplet.
+"""
+import os
+import json
+import shutil
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+def _directory(version: int, root: Optional[str] = None) -> str:
+    return os.path.join(root or settings.ANALYTICS_SNAPSHOT_DIR, f"v{version}")
+
+def write_snapshot(cube, root: Optional[str] = None, keep: Optional[int] = None) -> Optional[str]:
+    """
+    Écrit l'instantané de `cube` (AnalyticsCube). Retourne son répertoire, ou None s'il
+    existait déjà (écrit entre-temps par un autre worker).
+    """
+    root = root or settings.ANALYTICS_SNAPSHOT_DIR
+    target = _directory(cube.version, root)
+    if os.path.isdir(target):
+        return None
+    os.makedirs(root, exist_ok=True)
+    staging = os.path.join(root, f".v{cube.version}.{os.getpid()}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        for metric, values in cube.values.items():
+            np.save(os.path.join(staging, f"{metric}.npy"), np.ascontiguousarray(values, dtype=np.int32))
+        np.save(os.path.join(staging, "present.npy"), np.ascontiguousarray(cube.present))
+        meta = {
+            "format": FORMAT_VERSION,
+            "version": cube.version,
+            "metrics": list(cube.values),
+            "epidemic_ids": [int(i) for i in cube.epidemic_ids],
+            "location_ids": [int(i) for i in cube.location_ids],
+            "start_date": str(cube.dates[0]) if len(cube.dates) else "1970-01-01",
+            "shape": list(cube.present.shape)
+        }
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        os.rename(staging, target)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        if os.path.isdir(target):
+            return None
+        raise
+    logger.info(f"Instantané analytique écrit: {target}")
+    _prune(root, keep or settings.ANALYTICS_SNAPSHOT_KEEP)
+    return target
+
+def _prune(root: str, keep: int) -> None:
+    """Supprime les versions les plus anciennes (les projections ouvertes restent valides)."""
+    versions = sorted(
+        int(name[1:]) for name in os.listdir(root)
+        if name.startswith("v") and name[1:].isdigit()
+    )
+    for version in versions[:-keep]:
+        shutil.rmtree(_directory(version, root), ignore_errors=True)
+
+def map_snapshot(version: int, root: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Projette en lecture seule l'instantané de `version`. Retourne None s'il n'existe pas.
+    """
+    directory = _directory(version, root)
+    try:
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            return None
+        return {
+            "meta": meta,
+            "values": {
+                metric: np.load(os.path.join(directory, f"{metric}.npy"), mmap_mode="r")
+                for metric in meta["metrics"]
+            },
+            "present": np.load(os.path.join(directory, "present.npy"), mmap_mode="r")
+        }
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,119 @@
+"""
+Maintenance et lecture de la table `daily_rollup`.
+
+Les lignes par épidémie sont recalculées depuis daily_stats pour les seules dates
+chargées ; les lignes globales (id_epidemic = 0) sont recalculées à partir des
+lignes par épidémie, ce qui ne relit pas daily_stats.
+"""
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional
+
+from sqlalchemy import select, delete, insert, func, literal, false
+from sqlalchemy.orm import Session
+
+from app.db.models.base import Epidemic, DailyStats
+from app.db.models.rollup import DailyRollup, GLOBAL_ROLLUP
+
+logger = logging.getLogger(__name__)
+
+SUMMED_COLUMNS = ("cases", "deaths", "recovered", "active", "new_cases", "new_deaths", "new_recovered")
+INSERTED_COLUMNS = ("id_epidemic", "date") + SUMMED_COLUMNS + ("locations", "updated_at")
+
+# Taille maximale des listes IN sur les dates
+DATE_CHUNK_SIZE = 500
+
+def _date_chunks(dates: Optional[Iterable[date]]) -> List[Optional[List[date]]]:
+    if dates is None:
+        return [None]
+    dates = sorted(set(dates))
+    return [dates[i:i + DATE_CHUNK_SIZE] for i in range(0, len(dates), DATE_CHUNK_SIZE)]
+
+def _refresh_global(db: Session, dates: Optional[List[date]]) -> None:
+    delete_stmt = delete(DailyRollup).where(DailyRollup.id_epidemic == GLOBAL_ROLLUP)
+    per_epidemic = select(
+        literal(GLOBAL_ROLLUP),
+        DailyRollup.date,
+        *(func.sum(getattr(DailyRollup, column)) for column in SUMMED_COLUMNS),
+        func.sum(DailyRollup.locations),
+        literal(datetime.utcnow())
+    ).join(
+        Epidemic, Epidemic.id == DailyRollup.id_epidemic
+    ).where(
+        DailyRollup.id_epidemic != GLOBAL_ROLLUP,
+        Epidemic.deleting == false()
+    ).group_by(DailyRollup.date)
+    if dates is not None:
+        delete_stmt = delete_stmt.where(DailyRollup.date.in_(dates))
+        per_epidemic = per_epidemic.where(DailyRollup.date.in_(dates))
+    db.execute(delete_stmt)
+    db.execute(insert(DailyRollup).from_select(INSERTED_COLUMNS, per_epidemic))
+
+def refresh_epidemic(db: Session, epidemic_id: int, dates: Optional[Iterable[date]] = None) -> None:
+    """
+    Recalcule les lignes de l'épidémie (toutes ses dates si `dates` est None) et
+    les lignes globales correspondantes. Ne valide pas la transaction.
+    """
+    for chunk in _date_chunks(dates):
+        delete_stmt = delete(DailyRollup).where(DailyRollup.id_epidemic == epidemic_id)
+        aggregated = select(
+            DailyStats.id_epidemic,
+            DailyStats.date,
+            *(func.coalesce(func.sum(getattr(DailyStats, column)), 0) for column in SUMMED_COLUMNS),
+            func.count(DailyStats.id),
+            literal(datetime.utcnow())
+        ).where(DailyStats.id_epidemic == epidemic_id).group_by(DailyStats.id_epidemic, DailyStats.date)
+        if chunk is not None:
+            delete_stmt = delete_stmt.where(DailyRollup.date.in_(chunk))
+            aggregated = aggregated.where(DailyStats.date.in_(chunk))
+        db.execute(delete_stmt)
+        db.execute(insert(DailyRollup).from_select(INSERTED_COLUMNS, aggregated))
+
+    if dates is None:
+        dates = db.execute(
+            select(DailyRollup.date).where(DailyRollup.id_epidemic == epidemic_id)
+        ).scalars().all()
+    for chunk in _date_chunks(dates):
+        _refresh_global(db, chunk)
+
+def remove_epidemic(db: Session, epidemic_id: int) -> None:
+    """Retire une épidémie de l'agrégat (global compris). Ne valide pas la transaction."""
+    dates = db.execute(
+        select(DailyRollup.date).where(DailyRollup.id_epidemic == epidemic_id)
+    ).scalars().all()
+    db.execute(delete(DailyRollup).where(DailyRollup.id_epidemic == epidemic_id))
+    for chunk in _date_chunks(dates):
+        _refresh_global(db, chunk)
+
+def rebuild(db: Session) -> None:
+    """Reconstruction complète (table nouvellement créée, ou données modifiées hors ETL)."""
+    epidemic_ids = db.execute(select(DailyStats.id_epidemic).distinct()).scalars().all()
+    db.execute(delete(DailyRollup))
+    for epidemic_id in epidemic_ids:
+        refresh_epidemic(db, epidemic_id)
+    db.commit()
+    logger.info(f"Agrégat quotidien reconstruit pour {len(epidemic_ids)} épidémie(s)")
+
+def get_daily_evolution(db: Session, days: int = 30, epidemic_id: int = GLOBAL_ROLLUP) -> List[Dict[str, Any]]:
+    """
+    Évolution quotidienne sur les `days` derniers jours de données disponibles
+    (la fenêtre se termine à la dernière date chargée, pas à aujourd'hui).
+    """
+    latest = db.query(func.max(DailyRollup.date)).filter(DailyRollup.id_epidemic == epidemic_id).scalar()
+    if latest is None:
+        return []
+
+    rows = db.query(DailyRollup).filter(
+        DailyRollup.id_epidemic == epidemic_id,
+        DailyRollup.date > latest - timedelta(days=days)
+    ).order_by(DailyRollup.date.asc()).all()
+
+    return [
+        {
+            "date": row.date.isoformat(),
+            "new_cases": int(row.new_cases or 0),
+            "new_deaths": int(row.new_deaths or 0),
+            "active_cases": int(row.active or 0)
+        }
+        for row in rows
+    ]
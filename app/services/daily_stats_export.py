@@ -0,0 +1,226 @@
+# app/services/daily_stats_export.py
+
+import csv
+import io
+import json
+import logging
+import tempfile
+from datetime import date
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config.settings import settings
+from app.db.models.base import DailyStats, Epidemic, Localisation
+
+# --- optionnel : export colonnaire (Arrow IPC / Parquet) ---
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+# Colonnes exportées, dans l'ordre des fichiers CSV
+EXPORT_COLUMNS = [
+    DailyStats.id,
+    DailyStats.id_epidemic,
+    DailyStats.id_source,
+    DailyStats.id_loc,
+    DailyStats.date,
+    DailyStats.cases,
+    DailyStats.active,
+    DailyStats.deaths,
+    DailyStats.recovered,
+    DailyStats.new_cases,
+    DailyStats.new_deaths,
+    DailyStats.new_recovered
+]
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+# Export colonnaire : statistiques jointes au pays et au nom de l'épidémie
+COLUMNAR_COLUMNS = [
+    DailyStats.id_epidemic,
+    Epidemic.name.label("epidemic_name"),
+    DailyStats.id_loc,
+    Localisation.country,
+    Localisation.iso_code,
+    DailyStats.date,
+    DailyStats.cases,
+    DailyStats.active,
+    DailyStats.deaths,
+    DailyStats.recovered,
+    DailyStats.new_cases,
+    DailyStats.new_deaths,
+    DailyStats.new_recovered
+]
+
+def columnar_export_available() -> bool:
+    return pa is not None
+
+def columnar_schema():
+    return pa.schema([
+        ("id_epidemic", pa.int32()),
+        ("epidemic_name", pa.string()),
+        ("id_loc", pa.int32()),
+        ("country", pa.string()),
+        ("iso_code", pa.string()),
+        ("date", pa.date32()),
+        ("cases", pa.int64()),
+        ("active", pa.int64()),
+        ("deaths", pa.int64()),
+        ("recovered", pa.int64()),
+        ("new_cases", pa.int64()),
+        ("new_deaths", pa.int64()),
+        ("new_recovered", pa.int64())
+    ])
+
+def filter_daily_stats(
+    query,
+    epidemic_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    source_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """
+    Applique les filtres de l'API (bornes de dates incluses) à une requête ORM ou à un select.
+    """
+    conditions = []
+    if epidemic_id is not None:
+        conditions.append(DailyStats.id_epidemic == epidemic_id)
+    if location_id is not None:
+        conditions.append(DailyStats.id_loc == location_id)
+    if source_id is not None:
+        conditions.append(DailyStats.id_source == source_id)
+    if date_from is not None:
+        conditions.append(DailyStats.date >= date_from)
+    if date_to is not None:
+        conditions.append(DailyStats.date <= date_to)
+    return query.where(*conditions) if conditions else query
+
+def _ndjson_chunk(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, row)), default=date.isoformat, separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+def stream_daily_stats(
+    bind,
+    fmt: str = "ndjson",
+    limit: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    **filters
+) -> Iterator[str]:
+    """
+    Génère l'export texte (NDJSON ou CSV) des statistiques quotidiennes filtrées.
+
+    Les lignes sont lues par un curseur côté serveur (`yield_per`), un lot à la fois :
+    la mémoire utilisée ne dépend pas du nombre de lignes exportées. Le générateur ouvre
+    sa propre session, la réponse étant envoyée après la fermeture de celle de la requête.
+    """
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"Format d'export inconnu: {fmt}")
+    encode = _csv_chunk if fmt == "csv" else _ndjson_chunk
+    if fmt == "csv":
+        yield ",".join(EXPORT_FIELDS) + "\n"
+
+    stmt = filter_daily_stats(select(*EXPORT_COLUMNS), **filters).order_by(DailyStats.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    stmt = stmt.execution_options(yield_per=batch_size or settings.DAILY_STATS_STREAM_BATCH_SIZE)
+
+    exported = 0
+    with Session(bind) as session:
+        result = session.execute(stmt)
+        try:
+            for rows in result.partitions():
+                exported += len(rows)
+                yield encode(rows)
+        finally:
+            result.close()
+    logger.info(f"Export {fmt} de daily_stats terminé: {exported} ligne(s)")
+
+def _record_batches(bind, limit: Optional[int], batch_size: Optional[int], filters: dict):
+    """
+    Lots Arrow construits colonne par colonne à partir des lots du curseur serveur :
+    aucun objet ORM ni dictionnaire par ligne.
+    """
+    schema = columnar_schema()
+    stmt = (
+        filter_daily_stats(select(*COLUMNAR_COLUMNS), **filters)
+        .join(Epidemic, Epidemic.id == DailyStats.id_epidemic)
+        .join(Localisation, Localisation.id == DailyStats.id_loc)
+        .order_by(DailyStats.id)
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    stmt = stmt.execution_options(yield_per=batch_size or settings.DAILY_STATS_STREAM_BATCH_SIZE)
+
+    with Session(bind) as session:
+        result = session.execute(stmt)
+        try:
+            for rows in result.partitions():
+                columns = zip(*rows)
+                yield pa.RecordBatch.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema
+                )
+        finally:
+            result.close()
+
+def stream_columnar(
+    bind,
+    fmt: str = "arrow",
+    limit: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    **filters
+) -> Iterator[bytes]:
+    """
+    Génère l'export colonnaire des statistiques filtrées.
+
+    `arrow` : flux IPC Arrow, envoyé lot par lot au fil de la lecture.
+    `parquet` : un groupe de lignes par lot, écrit dans un fichier temporaire (le pied
+    de page Parquet n'est connu qu'à la fin) puis envoyé par blocs.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow n'est pas installé : export colonnaire indisponible")
+    schema = columnar_schema()
+
+    if fmt == "arrow":
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for batch in _record_batches(bind, limit, batch_size, filters):
+                writer.write_batch(batch)
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+        yield sink.getvalue()
+        return
+
+    if fmt != "parquet":
+        raise ValueError(f"Format d'export inconnu: {fmt}")
+    with tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_MAX_BYTES) as spool:
+        with pq.ParquetWriter(spool, schema, compression="zstd") as writer:
+            for batch in _record_batches(bind, limit, batch_size, filters):
+                writer.write_batch(batch)
+        spool.seek(0)
+        while True:
+            chunk = spool.read(1024 * 1024)
+            if not chunk:
+                break
+            yield chunk
@@ -1,4 +1,5 @@
 import os
+import hashlib
 import pandas as pd
 import logging
 import glob
@@ -8,10 +9,16 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from kagglehub import dataset_download
 from sqlalchemy.exc import SQLAlchemyError, OperationalError
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional
+from datetime import datetime
 
 from app.db.models.base import Epidemic, DailyStats, Localisation, DataSource, OverallStats
+from app.db.models.etl import EtlFileState
 from app.utils.data_cleaning import clean_dataset
+from app.services import ingestion_history, daily_rollup, latest_stats
+from app.services.throttle import AdaptiveThrottle, etl_throttle
+from app.services.analytics_cube import publish_data_version
+from app.db.partitions import maintain_partitions
 
 logger = logging.getLogger(__name__)
 
@@ -101,13 +108,34 @@ def insert_or_update_single_stat(db: Session, stats: dict) -> bool:
         logger.error(f"Erreur lors de l'insertion/update d'une stat: {e}")
         return False
 
-@backoff.on_exception(backoff.expo, (SQLAlchemyError, OperationalError), max_tries=5)
-def insert_or_update_stats(db: Session, daily_stats: list) -> int:
-    processed = 0
-    for stats in daily_stats:
-        if not validate_stats_fields(stats):
-            continue
+def upsert_stats_batch(db: Session, batch: list) -> int:
+    """
+    Insère ou met à jour un lot de statistiques en une seule transaction.
+    Les lignes existantes du lot sont lues en une requête.
+    """
+    existing = {
+        (stat.id_epidemic, stat.id_loc, stat.date): stat
+        for stat in db.query(DailyStats).filter(
+            DailyStats.id_epidemic.in_({stats['id_epidemic'] for stats in batch}),
+            DailyStats.id_loc.in_({stats['id_loc'] for stats in batch}),
+            DailyStats.date.in_({stats['date'] for stats in batch})
+        )
+    }
+    for stats in batch:
+        key = (stats['id_epidemic'], stats['id_loc'], stats['date'])
+        stat = existing.get(key)
+        if stat:
+            for field, value in stats.items():
+                setattr(stat, field, value)
+        else:
+            existing[key] = DailyStats(**stats)
+            db.add(existing[key])
+    db.commit()
+    return len(batch)
 
+def upsert_stats_one_by_one(db: Session, batch: list) -> int:
+    processed = 0
+    for stats in batch:
         max_retries = 3
         retry_count = 0
 
@@ -118,10 +146,34 @@ def insert_or_update_stats(db: Session, daily_stats: list) -> int:
                 break
             else:
                 retry_count += 1
+                ingestion_history.add_retry()
                 if retry_count == max_retries:
                     logger.error(f"Échec après {max_retries} tentatives pour: {stats}")
                 sleep(2 ** retry_count)
+    return processed
 
+@backoff.on_exception(backoff.expo, (SQLAlchemyError, OperationalError), max_tries=5)
+def insert_or_update_stats(db: Session, daily_stats: list, throttle: Optional[AdaptiveThrottle] = None) -> int:
+    """
+    Écrit les statistiques par lots. La taille des lots et la pause entre lots sont
+    ajustées par la contre-pression (`etl_throttle`) selon la charge de l'API.
+    """
+    throttle = throttle or etl_throttle
+    valid_stats = [stats for stats in daily_stats if validate_stats_fields(stats)]
+    processed = 0
+    position = 0
+    while position < len(valid_stats):
+        batch = valid_stats[position:position + throttle.batch_size]
+        position += len(batch)
+        try:
+            processed += upsert_stats_batch(db, batch)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Échec du lot de {len(batch)} statistiques, reprise ligne par ligne: {e}")
+            processed += upsert_stats_one_by_one(db, batch)
+        throttle.after_batch()
+
+    ingestion_history.add_rows_loaded(processed)
     return processed
 
 @backoff.on_exception(backoff.expo, Exception, max_tries=5)
@@ -165,7 +217,7 @@ def process_generic_data(db: Session, data: pd.DataFrame, source_id: int, epidem
                     'id_epidemic': epidemic_id,
                     'id_source': source_id,
                     'id_loc': location_id,
-                    'date': row['date'],
+                    'date': datetime.strptime(row['date'], '%Y-%m-%d').date(),
                     'cases': row.get('cases', 0) if hasattr(row, 'get') else 0,
                     'deaths': row.get('deaths', 0) if hasattr(row, 'get') else 0,
                     'recovered': row.get('recovered', 0) if hasattr(row, 'get') else 0,
@@ -183,6 +235,12 @@ def process_generic_data(db: Session, data: pd.DataFrame, source_id: int, epidem
         if daily_stats:
             processed = insert_or_update_stats(db, daily_stats)
             logger.info(f"Nombre d'enregistrements traités: {processed}")
+            # Après une remise à zéro, toutes les dates de l'épidémie ont pu changer
+            daily_rollup.refresh_epidemic(
+                db, epidemic_id, None if reset else {stats['date'] for stats in daily_stats}
+            )
+            latest_stats.refresh(db, epidemic_id, None if reset else {stats['id_loc'] for stats in daily_stats})
+            db.commit()
         else:
             logger.warning("Aucune donnée à traiter")
 
@@ -191,9 +249,15 @@ def process_generic_data(db: Session, data: pd.DataFrame, source_id: int, epidem
         raise
 
 @backoff.on_exception(backoff.expo, (SQLAlchemyError, OperationalError), max_tries=5)
-def calculate_overall_stats(db: Session):
+def calculate_overall_stats(db: Session, epidemic_ids: Optional[Iterable[int]] = None):
+    """
+    Recalcule les statistiques globales, pour toutes les épidémies ou seulement celles indiquées.
+    """
     try:
-        epidemics = db.query(Epidemic).all()
+        query = db.query(Epidemic)
+        if epidemic_ids is not None:
+            query = query.filter(Epidemic.id.in_(list(epidemic_ids)))
+        epidemics = query.all()
         for epidemic in epidemics:
             stats = db.query(
                 func.sum(DailyStats.cases).label('total_cases'),
@@ -219,9 +283,117 @@ def calculate_overall_stats(db: Session):
         db.rollback()
         raise
 
-def extract_and_load_datasets(db: Session):
+def get_or_create_data_source(db: Session, name: str, path: str, url: Optional[str] = None) -> DataSource:
+    """
+    Récupère (ou crée) la source de données associée à un dataset (Kaggle par défaut).
+    """
+    data_source = db.query(DataSource).filter_by(source_type=name).first()
+    if not data_source:
+        logger.info(f"Création d'une nouvelle source de données pour {name}")
+        data_source = DataSource(
+            source_type=name,
+            reference=path,
+            url=url or f"https://www.kaggle.com/datasets/{path}"
+        )
+        db.add(data_source)
+        db.commit()
+        db.refresh(data_source)
+        logger.info(f"Source de données créée avec l'ID {data_source.id}")
+    else:
+        logger.info(f"Source de données existante trouvée pour {name} (ID: {data_source.id})")
+    return data_source
+
+def load_csv_file(db: Session, dataset_name: str, source_id: int, file: str) -> int:
+    """
+    Lit, nettoie et charge un fichier CSV. Retourne le nombre de lignes traitées.
+    """
+    logger.info(f"Traitement du fichier {file}")
+    df = pd.read_csv(file)
+    logger.info(f"Fichier {file} lu avec succès, {len(df)} lignes")
+    ingestion_history.start_attempt(len(df))
+
+    df = clean_dataset(df, dataset_type=dataset_name, file_name=os.path.basename(file))
+    logger.info(f"Données nettoyées pour {file}")
+
+    process_generic_data(db, df, source_id, dataset_name, reset=False)
+    logger.info(f"Traitement terminé pour {file}: {len(df)} lignes traitées")
+    return len(df)
+
+def file_fingerprint(file: str) -> str:
+    """
+    Empreinte du contenu d'un fichier (taille + MD5), utilisée pour détecter les changements.
+    """
+    digest = hashlib.md5()
+    with open(file, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return f"{os.path.getsize(file)}-{digest.hexdigest()}"
+
+def file_has_changed(db: Session, dataset_name: str, file_key: str, fingerprint: str) -> bool:
+    state = db.query(EtlFileState).filter_by(dataset=dataset_name, file_path=file_key).first()
+    return state is None or state.fingerprint != fingerprint
+
+def record_file_loaded(db: Session, dataset_name: str, file_key: str, fingerprint: str, rows: int) -> None:
+    """
+    Mémorise l'empreinte du dernier contenu chargé pour un fichier.
+    """
+    state = db.query(EtlFileState).filter_by(dataset=dataset_name, file_path=file_key).first()
+    if state is None:
+        state = EtlFileState(dataset=dataset_name, file_path=file_key)
+        db.add(state)
+    state.fingerprint = fingerprint
+    state.rows = rows
+    state.loaded_at = datetime.utcnow()
+    db.commit()
+
+def load_file_with_retries(
+    db: Session,
+    dataset_name: str,
+    source_id: int,
+    file: str,
+    file_key: str,
+    fingerprint: str,
+    max_retries: int = 3
+) -> Dict[str, Any]:
+    """
+    Charge un fichier en réessayant avec un délai exponentiel, et retourne le résultat du chargement.
+    """
+    file_retry_count = 0
+    while True:
+        try:
+            rows = load_csv_file(db, dataset_name, source_id, file)
+            record_file_loaded(db, dataset_name, file_key, fingerprint, rows)
+            return {"dataset": dataset_name, "file": os.path.basename(file), "rows": rows, "status": "success"}
+        except Exception as e:
+            file_retry_count += 1
+            if file_retry_count == max_retries:
+                logger.error(f"Erreur fichier {file} après {max_retries} tentatives: {e}")
+                return {"dataset": dataset_name, "file": os.path.basename(file), "error": str(e), "status": "error"}
+            logger.warning(f"Tentative {file_retry_count}/{max_retries} échouée pour {file}: {e}")
+            ingestion_history.add_retry()
+            sleep(2 ** file_retry_count)
+
+def extract_and_load_datasets(db: Session, incremental: bool = False, trigger: str = "manual"):
+    """
+    Télécharge et charge tous les datasets Kaggle.
+    En mode incrémental, les fichiers dont le contenu n'a pas changé depuis le dernier
+    chargement sont ignorés, et les statistiques globales ne sont recalculées que si
+    au moins un fichier a été chargé.
+    Le chargement est enregistré dans l'historique (`ingestion_run`) avec le déclencheur indiqué.
+    """
+    # Partitions des périodes à venir créées avant d'y écrire (si daily_stats est partitionnée)
+    maintain_partitions(db.get_bind())
+    with ingestion_history.ingestion_run(db.get_bind(), trigger) as run_id:
+        results = _extract_and_load(db, incremental, run_id)
+    if any(result.get("status") == "success" for result in results):
+        # Nouvelle version des données : les réponses en cache sont recalculées
+        publish_data_version(db)
+    return results
+
+def _extract_and_load(db: Session, incremental: bool, run_id: Optional[int]):
     results = []
     max_retries = 3
+    loaded_files = 0
 
     for name, path in KAGGLE_DATASETS.items():
         retry_count = 0
@@ -231,20 +403,7 @@ def extract_and_load_datasets(db: Session):
                 dataset_path = dataset_download(path)
                 logger.info(f"Téléchargement terminé pour {name} -> {dataset_path}")
 
-                data_source = db.query(DataSource).filter_by(source_type=name).first()
-                if not data_source:
-                    logger.info(f"Création d'une nouvelle source de données pour {name}")
-                    data_source = DataSource(
-                        source_type=name,
-                        reference=path,
-                        url=f"https://www.kaggle.com/datasets/{path}"
-                    )
-                    db.add(data_source)
-                    db.commit()
-                    db.refresh(data_source)
-                    logger.info(f"Source de données créée avec l'ID {data_source.id}")
-                else:
-                    logger.info(f"Source de données existante trouvée pour {name} (ID: {data_source.id})")
+                data_source = get_or_create_data_source(db, name, path)
 
                 csv_files = get_csv_files_from_directory(dataset_path)
                 logger.info(f"{len(csv_files)} CSV trouvés pour {name}")
@@ -255,29 +414,19 @@ def extract_and_load_datasets(db: Session):
                     break
 
                 for file in csv_files:
-                    file_retry_count = 0
-                    while file_retry_count < max_retries:
-                        try:
-                            logger.info(f"Traitement du fichier {file}")
-                            df = pd.read_csv(file)
-                            logger.info(f"Fichier {file} lu avec succès, {len(df)} lignes")
-
-                            df = clean_dataset(df, dataset_type=name, file_name=os.path.basename(file))
-                            logger.info(f"Données nettoyées pour {file}")
-
-                            process_generic_data(db, df, data_source.id, name, reset=False)
-                            logger.info(f"Traitement terminé pour {file}: {len(df)} lignes traitées")
-
-                            results.append({"dataset": name, "file": os.path.basename(file), "rows": len(df), "status": "success"})
-                            break
-                        except Exception as e:
-                            file_retry_count += 1
-                            if file_retry_count == max_retries:
-                                logger.error(f"Erreur fichier {file} après {max_retries} tentatives: {e}")
-                                results.append({"dataset": name, "file": os.path.basename(file), "error": str(e), "status": "error"})
-                            else:
-                                logger.warning(f"Tentative {file_retry_count}/{max_retries} échouée pour {file}: {e}")
-                                sleep(2 ** file_retry_count)
+                    file_key = os.path.relpath(file, dataset_path)
+                    fingerprint = file_fingerprint(file)
+                    if incremental and not file_has_changed(db, name, file_key, fingerprint):
+                        results.append({"dataset": name, "file": os.path.basename(file), "status": "unchanged"})
+                        continue
+
+                    with ingestion_history.record_file(db.get_bind(), run_id, name, file_key) as record:
+                        result = load_file_with_retries(db, name, data_source.id, file, file_key, fingerprint, max_retries)
+                        if result["status"] == "error":
+                            record.fail(result["error"])
+                    if result["status"] == "success":
+                        loaded_files += 1
+                    results.append(result)
                 break
             except Exception as e:
                 retry_count += 1
@@ -288,6 +437,10 @@ def extract_and_load_datasets(db: Session):
                     logger.warning(f"Tentative {retry_count}/{max_retries} échouée pour {name}: {e}")
                     sleep(2 ** retry_count)
 
+    if incremental and loaded_files == 0:
+        logger.info("Aucun fichier modifié, statistiques globales inchangées")
+        return results
+
     try:
         logger.info("Calcul des statistiques globales")
         calculate_overall_stats(db)
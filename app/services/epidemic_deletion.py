@@ -0,0 +1,183 @@
+"""
+Suppression d'une épidémie par lots bornés de clés primaires.
+
+L'épidémie est d'abord marquée `deleting` (elle disparaît aussitôt des lectures, voir
+`app/db/visibility.py`), puis ses `daily_stats` sont supprimées par tranches de
+`EPIDEMIC_DELETE_CHUNK_SIZE` identifiants, chaque tranche dans sa propre transaction.
+L'avancement est enregistré dans `epidemic_deletion` ; une suppression interrompue
+reprend au démarrage suivant.
+"""
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import delete, select, func, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config.settings import settings
+from app.core.cache import response_cache, dimension_cache
+from app.db.locks import advisory_lock
+from app.db.models.base import Epidemic, DailyStats, OverallStats
+from app.db.models.deletion import EpidemicDeletion
+from app.db.models.etl import EtlFileState
+from app.services import daily_rollup, latest_stats
+
+logger = logging.getLogger(__name__)
+
+def _lock_name(job_id: int) -> str:
+    return f"epidemic_deletion_{job_id}"
+
+def _count_stats(db: Session, epidemic_id: int, limit: Optional[int] = None) -> int:
+    """Nombre de statistiques de l'épidémie, borné par `limit` pour rester rapide sur les gros volumes."""
+    ids = select(DailyStats.id).where(DailyStats.id_epidemic == epidemic_id)
+    if limit is not None:
+        ids = ids.limit(limit)
+    return db.execute(
+        select(func.count()).select_from(ids.subquery()),
+        execution_options={"include_deleting": True}
+    ).scalar()
+
+def is_large(db: Session, epidemic_id: int) -> bool:
+    threshold = settings.EPIDEMIC_DELETE_SYNC_MAX_ROWS
+    return _count_stats(db, epidemic_id, limit=threshold + 1) > threshold
+
+def mark_for_deletion(db: Session, epidemic: Epidemic) -> EpidemicDeletion:
+    """
+    Masque l'épidémie et crée la tâche de suppression associée.
+    """
+    epidemic.deleting = True
+    daily_rollup.remove_epidemic(db, epidemic.id)
+    latest_stats.remove_epidemic(db, epidemic.id)
+    job = EpidemicDeletion(
+        id_epidemic=epidemic.id,
+        epidemic_name=epidemic.name,
+        status="pending",
+        total_rows=_count_stats(db, epidemic.id)
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    response_cache.invalidate(db)
+    dimension_cache.invalidate(db)
+    logger.info(f"Épidémie {epidemic.id} marquée pour suppression ({job.total_rows} statistiques)")
+    return job
+
+def _delete_chunk(session: Session, epidemic_id: int, after_id: int, chunk_size: int) -> List[int]:
+    """Supprime les `chunk_size` statistiques suivantes (par id croissant) et retourne leurs ids."""
+    ids = session.execute(
+        select(DailyStats.id)
+        .where(DailyStats.id_epidemic == epidemic_id, DailyStats.id > after_id)
+        .order_by(DailyStats.id)
+        .limit(chunk_size),
+        execution_options={"include_deleting": True}
+    ).scalars().all()
+    if ids:
+        session.execute(delete(DailyStats).where(DailyStats.id.in_(ids)))
+    return ids
+
+def _finish(session: Session, job: EpidemicDeletion) -> None:
+    session.execute(delete(OverallStats).where(OverallStats.id_epidemic == job.id_epidemic))
+    if job.epidemic_name:
+        # Les fichiers de ce dataset devront être rechargés par le prochain chargement incrémental
+        session.execute(delete(EtlFileState).where(EtlFileState.dataset == job.epidemic_name))
+    session.execute(delete(Epidemic).where(Epidemic.id == job.id_epidemic))
+    job.status = "done"
+    job.finished_at = job.updated_at = datetime.utcnow()
+    session.commit()
+    response_cache.invalidate(session)
+
+def run_deletion(bind: Engine, job_id: int, chunk_size: Optional[int] = None, pause: Optional[float] = None) -> Optional[str]:
+    """
+    Supprime les statistiques de la tâche par lots, puis l'épidémie elle-même.
+    Retourne le statut final de la tâche, ou None si un autre worker la traite déjà.
+    """
+    chunk_size = chunk_size or settings.EPIDEMIC_DELETE_CHUNK_SIZE
+    pause = settings.EPIDEMIC_DELETE_PAUSE_SECONDS if pause is None else pause
+
+    with advisory_lock(_lock_name(job_id), bind=bind) as acquired:
+        if not acquired:
+            logger.info(f"Suppression {job_id} déjà prise en charge par un autre worker")
+            return None
+
+        with Session(bind) as session:
+            job = session.get(EpidemicDeletion, job_id)
+            if job is None or job.status == "done":
+                return job.status if job else None
+            job.status = "running"
+            job.error = None
+            session.commit()
+
+            try:
+                last_id = 0
+                while True:
+                    ids = _delete_chunk(session, job.id_epidemic, last_id, chunk_size)
+                    if ids:
+                        last_id = ids[-1]
+                        job.deleted_rows = (job.deleted_rows or 0) + len(ids)
+                        job.updated_at = datetime.utcnow()
+                    session.commit()
+                    if len(ids) < chunk_size:
+                        break
+                    if pause:
+                        time.sleep(pause)
+                _finish(session, job)
+                logger.info(f"Épidémie {job.id_epidemic} supprimée ({job.deleted_rows} statistiques)")
+                return "done"
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Échec de la suppression de l'épidémie {job.id_epidemic}: {e}")
+                session.execute(
+                    update(EpidemicDeletion)
+                    .where(EpidemicDeletion.id == job_id)
+                    .values(status="error", error=str(e), updated_at=datetime.utcnow())
+                )
+                session.commit()
+                return "error"
+
+def delete_epidemic(db: Session, epidemic: Epidemic) -> EpidemicDeletion:
+    """Suppression synchrone, par lots, dans la requête courante."""
+    job = mark_for_deletion(db, epidemic)
+    status = run_deletion(db.get_bind(), job.id)
+    db.expire_all()
+    if status == "error":
+        raise RuntimeError(f"Échec de la suppression de l'épidémie {epidemic.id}: {job.error}")
+    return job
+
+def get_deletion_status(db: Session, epidemic_id: int) -> Optional[Dict[str, Any]]:
+    job = db.query(EpidemicDeletion).populate_existing().filter(
+        EpidemicDeletion.id_epidemic == epidemic_id
+    ).order_by(EpidemicDeletion.id.desc()).first()
+    if job is None:
+        return None
+    return {
+        "job_id": job.id,
+        "epidemic_id": job.id_epidemic,
+        "epidemic_name": job.epidemic_name,
+        "status": job.status,
+        "total_rows": job.total_rows,
+        "deleted_rows": job.deleted_rows,
+        "progress_pct": round(job.deleted_rows / job.total_rows * 100, 2) if job.total_rows else 100.0,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "error": job.error
+    }
+
+def unfinished_jobs(bind: Engine) -> List[int]:
+    with Session(bind) as session:
+        return session.execute(
+            select(EpidemicDeletion.id).where(EpidemicDeletion.status != "done").order_by(EpidemicDeletion.id)
+        ).scalars().all()
+
+def resume_deletions(bind: Engine) -> None:
+    """Reprend en arrière-plan les suppressions interrompues (redémarrage, erreur)."""
+    def _resume():
+        try:
+            for job_id in unfinished_jobs(bind):
+                run_deletion(bind, job_id)
+        except Exception as e:
+            logger.error(f"Erreur lors de la reprise des suppressions: {e}")
+
+    threading.Thread(target=_resume, name="epidemic-deletion", daemon=True).start()
@@ -0,0 +1,424 @@
+"""
+File de travail ETL distribuée.
+
+Chaque fichier CSV d'un dataset devient une tâche (dataset, fichier) que les workers
+réclament avec un bail (lease). N'importe quel nombre de processus ou de machines peut
+consommer la file : sur MySQL la réservation utilise `SELECT ... FOR UPDATE SKIP LOCKED`,
+sur les autres moteurs (SQLite) un compare-and-set sur la ligne de la tâche.
+Les baux expirés sont repris automatiquement et `calculate_overall_stats` est exécuté
+une seule fois, par le worker qui termine la dernière tâche du lot.
+"""
+import os
+import socket
+import uuid
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta
+from time import sleep
+from typing import Callable, Dict, Any, List, Optional
+
+from kagglehub import dataset_download
+from sqlalchemy import select, update, exists, and_, or_, case, func
+from sqlalchemy.orm import Session
+
+from app.core.config.settings import settings
+from app.db.session import IngestSessionLocal
+from app.db.models.base import DataSource
+from app.db.models.etl import EtlBatch, EtlTask
+from app.services import ingestion_history
+from app.services.analytics_cube import publish_data_version
+from app.services.data_extraction import (
+    KAGGLE_DATASETS,
+    get_csv_files_from_directory,
+    get_or_create_data_source,
+    load_csv_file,
+    calculate_overall_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+UNFINISHED_STATUSES = ("pending", "running")
+
+def default_worker_id() -> str:
+    """Identifiant unique d'un worker (machine, processus, suffixe aléatoire)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def _lease_deadline() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=settings.ETL_TASK_LEASE_SECONDS)
+
+def _supports_skip_locked(db: Session) -> bool:
+    return db.get_bind().dialect.name == "mysql"
+
+def enqueue_datasets(db: Session, datasets: Optional[Dict[str, str]] = None) -> EtlBatch:
+    """
+    Télécharge les datasets et crée un lot contenant une tâche par fichier CSV.
+    """
+    datasets = datasets or KAGGLE_DATASETS
+    files_by_dataset = {}
+    for name, path in datasets.items():
+        dataset_path = dataset_download(path)
+        get_or_create_data_source(db, name, path)
+        csv_files = get_csv_files_from_directory(dataset_path)
+        logger.info(f"{len(csv_files)} CSV trouvés pour {name}")
+        files_by_dataset[name] = [os.path.relpath(file, dataset_path) for file in csv_files]
+
+    return create_batch(db, files_by_dataset)
+
+def create_batch(db: Session, files_by_dataset: Dict[str, List[str]]) -> EtlBatch:
+    """
+    Crée un lot et ses tâches dans une seule transaction.
+    """
+    batch = EtlBatch(status="running", id_run=ingestion_history.start_run(db.get_bind(), "etl-queue"))
+    db.add(batch)
+    db.flush()
+
+    total = 0
+    for name, files in files_by_dataset.items():
+        for file_path in files:
+            db.add(EtlTask(id_batch=batch.id, dataset=name, file_path=file_path, status="pending"))
+            total += 1
+
+    batch.total_tasks = total
+    if total == 0:
+        batch.status = "done"
+        batch.finished_at = datetime.utcnow()
+    db.commit()
+    db.refresh(batch)
+    if total == 0:
+        ingestion_history.finish_run(db.get_bind(), batch.id_run)
+    logger.info(f"Lot ETL {batch.id} créé avec {total} tâches")
+    return batch
+
+def claim_task(db: Session, worker_id: str, batch_id: Optional[int] = None) -> Optional[EtlTask]:
+    """
+    Réserve la prochaine tâche disponible (en attente ou dont le bail a expiré).
+    """
+    now = datetime.utcnow()
+    claimable = and_(
+        EtlTask.attempts < settings.ETL_TASK_MAX_ATTEMPTS,
+        or_(
+            EtlTask.status == "pending",
+            and_(EtlTask.status == "running", EtlTask.lease_expires_at < now)
+        )
+    )
+    query = select(EtlTask.id).where(claimable)
+    if batch_id is not None:
+        query = query.where(EtlTask.id_batch == batch_id)
+    query = query.order_by(EtlTask.id).limit(1)
+
+    values = dict(
+        status="running",
+        lease_owner=worker_id,
+        lease_expires_at=_lease_deadline(),
+        attempts=EtlTask.attempts + 1,
+    )
+
+    if _supports_skip_locked(db):
+        task_id = db.execute(query.with_for_update(skip_locked=True)).scalar()
+        if task_id is None:
+            db.rollback()
+            return None
+        db.execute(
+            update(EtlTask)
+            .where(EtlTask.id == task_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return db.get(EtlTask, task_id)
+
+    # Repli sans SKIP LOCKED : compare-and-set, on réessaie si un autre worker a gagné
+    for _ in range(10):
+        task_id = db.execute(query).scalar()
+        if task_id is None:
+            db.rollback()
+            return None
+        result = db.execute(
+            update(EtlTask)
+            .where(EtlTask.id == task_id, claimable)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if result.rowcount == 1:
+            return db.get(EtlTask, task_id)
+    return None
+
+def renew_lease(db: Session, task_id: int, worker_id: str) -> bool:
+    """Prolonge le bail d'une tâche tant que le worker en est propriétaire."""
+    result = db.execute(
+        update(EtlTask)
+        .where(EtlTask.id == task_id, EtlTask.lease_owner == worker_id, EtlTask.status == "running")
+        .values(lease_expires_at=_lease_deadline())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+def complete_task(db: Session, task_id: int, worker_id: str, rows: int) -> bool:
+    result = db.execute(
+        update(EtlTask)
+        .where(EtlTask.id == task_id, EtlTask.lease_owner == worker_id, EtlTask.status == "running")
+        .values(status="done", rows=rows, finished_at=datetime.utcnow(), lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if result.rowcount != 1:
+        logger.warning(f"Bail perdu pour la tâche {task_id}, résultat ignoré")
+        return False
+    return True
+
+def fail_task(db: Session, task_id: int, worker_id: str, error: str) -> None:
+    """
+    Remet la tâche en attente, ou la passe en erreur si le nombre maximal de tentatives est atteint.
+    """
+    db.execute(
+        update(EtlTask)
+        .where(EtlTask.id == task_id, EtlTask.lease_owner == worker_id, EtlTask.status == "running")
+        .values(
+            status=case((EtlTask.attempts >= settings.ETL_TASK_MAX_ATTEMPTS, "error"), else_="pending"),
+            last_error=error[:2000],
+            lease_owner=None,
+            lease_expires_at=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def fail_exhausted_leases(db: Session) -> List[int]:
+    """
+    Passe en erreur les tâches dont le bail a expiré après la dernière tentative autorisée.
+    Retourne les lots concernés.
+    """
+    now = datetime.utcnow()
+    exhausted = and_(
+        EtlTask.status == "running",
+        EtlTask.lease_expires_at < now,
+        EtlTask.attempts >= settings.ETL_TASK_MAX_ATTEMPTS
+    )
+    batch_ids = [row[0] for row in db.execute(select(EtlTask.id_batch).where(exhausted).distinct())]
+    if batch_ids:
+        db.execute(
+            update(EtlTask)
+            .where(exhausted)
+            .values(status="error", last_error="Bail expiré après la dernière tentative", lease_owner=None)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return batch_ids
+
+def try_finalize_batch(db: Session, batch_id: int, worker_id: str) -> bool:
+    """
+    Calcule les statistiques globales si toutes les tâches du lot sont terminées.
+    La transition conditionnelle `running -> finalizing` garantit qu'un seul worker s'en charge.
+    """
+    now = datetime.utcnow()
+    unfinished = exists(
+        select(EtlTask.id).where(EtlTask.id_batch == batch_id, EtlTask.status.in_(UNFINISHED_STATUSES))
+    )
+    result = db.execute(
+        update(EtlBatch)
+        .where(
+            EtlBatch.id == batch_id,
+            or_(
+                EtlBatch.status == "running",
+                and_(EtlBatch.status == "finalizing", EtlBatch.finalize_expires_at < now)
+            ),
+            ~unfinished
+        )
+        .values(status="finalizing", finalize_owner=worker_id, finalize_expires_at=_lease_deadline())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if result.rowcount != 1:
+        return False
+
+    logger.info(f"Dernière tâche du lot {batch_id} terminée, calcul des statistiques globales")
+    calculate_overall_stats(db)
+    # Tâches abandonnées (tentatives épuisées ou bail expiré) : chargement en erreur
+    failed = db.execute(
+        select(EtlTask.file_path, EtlTask.last_error)
+        .where(EtlTask.id_batch == batch_id, EtlTask.status == "error")
+        .order_by(EtlTask.id)
+    ).all()
+    status, error = "done", None
+    if failed:
+        status = "error"
+        error = f"{len(failed)} fichier(s) en erreur: " + "; ".join(
+            f"{file_path}: {last_error}" for file_path, last_error in failed[:5]
+        )
+        logger.warning(f"Lot {batch_id} terminé avec {error}")
+    ingestion_history.finish_run(
+        db.get_bind(), db.get(EtlBatch, batch_id).id_run,
+        status="error" if failed else "success", error=error[:2000] if error else None
+    )
+    db.execute(
+        update(EtlBatch)
+        .where(EtlBatch.id == batch_id, EtlBatch.finalize_owner == worker_id)
+        .values(status=status, finished_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    publish_data_version(db)
+    return True
+
+def finalize_pending_batches(db: Session, worker_id: str) -> List[int]:
+    """Finalise les lots complets restés en suspens (ex. worker finaliseur arrêté)."""
+    candidates = db.execute(
+        select(EtlBatch.id).where(EtlBatch.status.in_(("running", "finalizing")))
+    ).scalars().all()
+    return [batch_id for batch_id in candidates if try_finalize_batch(db, batch_id, worker_id)]
+
+def get_batch_status(db: Session, batch_id: int) -> Optional[Dict[str, Any]]:
+    batch = db.get(EtlBatch, batch_id, populate_existing=True)
+    if batch is None:
+        return None
+    counts = dict(
+        db.query(EtlTask.status, func.count(EtlTask.id))
+        .filter(EtlTask.id_batch == batch_id)
+        .group_by(EtlTask.status)
+        .all()
+    )
+    return {
+        "batch_id": batch.id,
+        "status": batch.status,
+        "total_tasks": batch.total_tasks,
+        "tasks": {status: counts.get(status, 0) for status in ("pending", "running", "done", "error")},
+        "created_at": batch.created_at.isoformat() if batch.created_at else None,
+        "finished_at": batch.finished_at.isoformat() if batch.finished_at else None,
+    }
+
+class _LeaseHeartbeat(threading.Thread):
+    """Renouvelle le bail d'une tâche pendant son traitement."""
+
+    def __init__(self, session_factory: Callable[[], Session], task_id: int, worker_id: str):
+        super().__init__(daemon=True)
+        self.session_factory = session_factory
+        self.task_id = task_id
+        self.worker_id = worker_id
+        self.stopped = threading.Event()
+
+    def run(self):
+        interval = max(settings.ETL_TASK_LEASE_SECONDS / 3, 1)
+        while not self.stopped.wait(interval):
+            db = self.session_factory()
+            try:
+                if not renew_lease(db, self.task_id, self.worker_id):
+                    logger.warning(f"Impossible de renouveler le bail de la tâche {self.task_id}")
+                    return
+            except Exception as e:
+                logger.warning(f"Erreur lors du renouvellement du bail {self.task_id}: {e}")
+            finally:
+                db.close()
+
+    def stop(self):
+        self.stopped.set()
+
+class EtlWorker:
+    """
+    Consomme la file de tâches ETL jusqu'à épuisement (ou indéfiniment).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = IngestSessionLocal,
+        worker_id: Optional[str] = None,
+        batch_id: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.worker_id = worker_id or default_worker_id()
+        self.batch_id = batch_id
+        self._dataset_paths: Dict[str, str] = {}
+
+    def _resolve_file(self, db: Session, task: EtlTask) -> tuple:
+        data_source = db.query(DataSource).filter_by(source_type=task.dataset).first()
+        if data_source is None:
+            raise ValueError(f"Source de données inconnue: {task.dataset}")
+        if task.dataset not in self._dataset_paths:
+            # kagglehub réutilise son cache local si le dataset est déjà présent sur ce nœud
+            self._dataset_paths[task.dataset] = dataset_download(data_source.reference)
+        return data_source.id, os.path.join(self._dataset_paths[task.dataset], task.file_path)
+
+    def process_task(self, db: Session, task: EtlTask) -> int:
+        source_id, file = self._resolve_file(db, task)
+        return load_csv_file(db, task.dataset, source_id, file)
+
+    def run_once(self, db: Session) -> bool:
+        """Traite une tâche. Retourne False si la file est vide."""
+        for batch_id in fail_exhausted_leases(db):
+            try_finalize_batch(db, batch_id, self.worker_id)
+
+        task = claim_task(db, self.worker_id, self.batch_id)
+        if task is None:
+            finalize_pending_batches(db, self.worker_id)
+            return False
+
+        task_id, batch_id = task.id, task.id_batch
+        logger.info(f"[{self.worker_id}] Tâche {task_id} réservée: {task.dataset}/{task.file_path}")
+        heartbeat = _LeaseHeartbeat(self.session_factory, task_id, self.worker_id)
+        heartbeat.start()
+        run_id = db.get(EtlBatch, batch_id).id_run
+        try:
+            with ingestion_history.record_file(
+                db.get_bind(), run_id, task.dataset, task.file_path, retries=task.attempts - 1
+            ):
+                rows = self.process_task(db, task)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"[{self.worker_id}] Échec de la tâche {task_id}: {e}")
+            fail_task(db, task_id, self.worker_id, str(e))
+            try_finalize_batch(db, batch_id, self.worker_id)
+            return True
+        finally:
+            heartbeat.stop()
+
+        if complete_task(db, task_id, self.worker_id, rows):
+            try_finalize_batch(db, batch_id, self.worker_id)
+        return True
+
+    def run(self, stop_when_idle: bool = True) -> int:
+        """Boucle principale du worker. Retourne le nombre de tâches traitées."""
+        processed = 0
+        db = self.session_factory()
+        try:
+            while True:
+                if self.run_once(db):
+                    processed += 1
+                    continue
+                if stop_when_idle:
+                    break
+                sleep(settings.ETL_WORKER_POLL_SECONDS)
+        finally:
+            db.close()
+        logger.info(f"[{self.worker_id}] Arrêt du worker après {processed} tâches")
+        return processed
+
+def start_local_workers(count: int, batch_id: Optional[int] = None) -> List[threading.Thread]:
+    """Démarre des workers dans des threads du processus courant."""
+    threads = []
+    for _ in range(count):
+        worker = EtlWorker(batch_id=batch_id)
+        thread = threading.Thread(target=worker.run, name=f"etl-worker-{worker.worker_id}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="File de travail ETL distribuée")
+    parser.add_argument("command", choices=["enqueue", "worker"])
+    parser.add_argument("--batch", type=int, default=None, help="Limiter le worker à un lot")
+    parser.add_argument("--forever", action="store_true", help="Continuer à attendre de nouvelles tâches")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "enqueue":
+        session = IngestSessionLocal()
+        try:
+            created = enqueue_datasets(session)
+            print(f"Lot {created.id} créé avec {created.total_tasks} tâches")
+        finally:
+            session.close()
+    else:
+        EtlWorker(batch_id=args.batch).run(stop_when_idle=not args.forever)
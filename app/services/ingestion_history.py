@@ -0,0 +1,282 @@
+"""
+Historique persistant des chargements (table `ingestion_run` et fichiers `ingestion_file`).
+
+Les lignes d'historique sont écrites avec leur propre session, pour survivre aux rollbacks
+de l'ETL, et une erreur d'écriture de l'historique n'interrompt jamais un chargement.
+Le fichier en cours est porté par une ContextVar : les fonctions de chargement y ajoutent
+leurs compteurs (lignes lues, chargées, tentatives) sans changer de signature.
+"""
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.models.base import DailyStats
+from app.db.models.ingestion import IngestionRun, IngestionFile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+class FileRecord:
+    """Compteurs du fichier en cours de chargement."""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_loaded = 0
+        self.retries = 0
+        self.status = "success"
+        self.error: Optional[str] = None
+
+    def fail(self, error: str):
+        self.status = "error"
+        self.error = error
+
+
+_current_file: ContextVar[Optional[FileRecord]] = ContextVar("ingestion_current_file", default=None)
+
+def start_attempt(rows_read: int) -> None:
+    """Début d'une tentative de chargement : les lignes chargées repartent de zéro."""
+    record = _current_file.get()
+    if record is not None:
+        record.rows_read = rows_read
+        record.rows_loaded = 0
+
+def add_rows_loaded(count: int) -> None:
+    record = _current_file.get()
+    if record is not None:
+        record.rows_loaded += count
+
+def add_retry() -> None:
+    record = _current_file.get()
+    if record is not None:
+        record.retries += 1
+
+def _current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return None
+        # ru_maxrss est en Ko sous Linux : c'est le pic du processus, pas celui du fichier
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class _MemorySampler(threading.Thread):
+    """Échantillonne la mémoire résidente pour en garder le pic pendant un chargement."""
+
+    def __init__(self, interval: float = 0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_mb = _current_rss_mb()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            current = _current_rss_mb()
+            if current is not None and (self.peak_mb is None or current > self.peak_mb):
+                self.peak_mb = current
+
+    def stop(self) -> Optional[float]:
+        self._stopped.set()
+        current = _current_rss_mb()
+        if current is not None and (self.peak_mb is None or current > self.peak_mb):
+            self.peak_mb = current
+        return self.peak_mb
+
+def _daily_stats_rows(session: Session) -> Optional[int]:
+    """Taille de daily_stats ; estimation de l'optimiseur sur MySQL pour éviter un COUNT(*) complet."""
+    if session.get_bind().dialect.name == "mysql":
+        return session.execute(text(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'daily_stats'"
+        )).scalar()
+    return session.query(func.count(DailyStats.id)).scalar()
+
+def start_run(bind: Engine, trigger: str) -> Optional[int]:
+    try:
+        with Session(bind) as session:
+            run = IngestionRun(trigger=trigger, status="running", daily_stats_rows_before=_daily_stats_rows(session))
+            session.add(run)
+            session.commit()
+            return run.id
+    except Exception as e:
+        logger.warning(f"Impossible d'enregistrer le début du chargement: {e}")
+        return None
+
+def finish_run(bind: Engine, run_id: Optional[int], status: str = "success", error: Optional[str] = None) -> None:
+    """Clôture un chargement en agrégeant les compteurs de ses fichiers."""
+    if run_id is None:
+        return
+    try:
+        with Session(bind) as session:
+            run = session.get(IngestionRun, run_id)
+            totals = session.query(
+                func.sum(IngestionFile.rows_read),
+                func.sum(IngestionFile.rows_loaded),
+                func.sum(IngestionFile.rows_rejected),
+                func.sum(IngestionFile.retries),
+                func.max(IngestionFile.peak_memory_mb)
+            ).filter(IngestionFile.id_run == run_id).one()
+            run.rows_read, run.rows_loaded, run.rows_rejected, run.retries = (int(value or 0) for value in totals[:4])
+            run.peak_memory_mb = totals[4]
+            run.finished_at = datetime.utcnow()
+            run.duration_seconds = (run.finished_at - run.started_at).total_seconds()
+            run.status = status
+            run.error = error
+            session.commit()
+    except Exception as e:
+        logger.warning(f"Impossible d'enregistrer la fin du chargement {run_id}: {e}")
+
+@contextmanager
+def ingestion_run(bind: Engine, trigger: str) -> Iterator[Optional[int]]:
+    run_id = start_run(bind, trigger)
+    try:
+        yield run_id
+    except Exception as e:
+        finish_run(bind, run_id, "error", str(e))
+        raise
+    finish_run(bind, run_id)
+
+@contextmanager
+def record_file(bind: Engine, run_id: Optional[int], dataset: str, file_name: str, retries: int = 0) -> Iterator[FileRecord]:
+    """
+    Mesure le chargement d'un fichier (durée, pic mémoire, compteurs) et l'enregistre à la sortie.
+    """
+    record = FileRecord()
+    record.retries = retries
+    token = _current_file.set(record)
+    sampler = _MemorySampler()
+    sampler.start()
+    started_at = datetime.utcnow()
+    started = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record.fail(str(e))
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        peak_mb = sampler.stop()
+        _current_file.reset(token)
+        if run_id is not None:
+            _save_file(bind, run_id, dataset, file_name, record, started_at, duration, peak_mb)
+
+def _save_file(bind, run_id, dataset, file_name, record, started_at, duration, peak_mb) -> None:
+    try:
+        with Session(bind) as session:
+            session.add(IngestionFile(
+                id_run=run_id,
+                dataset=dataset,
+                file_name=file_name,
+                status=record.status,
+                started_at=started_at,
+                duration_seconds=duration,
+                rows_read=record.rows_read,
+                rows_loaded=record.rows_loaded,
+                rows_rejected=max(record.rows_read - record.rows_loaded, 0),
+                retries=record.retries,
+                peak_memory_mb=peak_mb,
+                error=record.error
+            ))
+            session.commit()
+    except Exception as e:
+        logger.warning(f"Impossible d'enregistrer l'historique du fichier {file_name}: {e}")
+
+def _rows_per_second(rows: Optional[int], duration: Optional[float]) -> Optional[float]:
+    if not duration:
+        return None
+    return round((rows or 0) / duration, 2)
+
+def _change_pct(points: List[Dict[str, Any]]) -> Optional[float]:
+    """Évolution du débit entre le premier et le dernier point (en %)."""
+    rates = [point["rows_per_second"] for point in points if point["rows_per_second"]]
+    if len(rates) < 2:
+        return None
+    return round((rates[-1] - rates[0]) / rates[0] * 100, 2)
+
+def get_recent_runs(db: Session, limit: int = 20, finished_only: bool = False) -> List[Dict[str, Any]]:
+    query = db.query(IngestionRun)
+    if finished_only:
+        query = query.filter(IngestionRun.status != "running")
+    runs = query.order_by(IngestionRun.id.desc()).limit(limit).all()
+    return [
+        {
+            "id": run.id,
+            "trigger": run.trigger,
+            "status": run.status,
+            "started_at": run.started_at.isoformat() if run.started_at else None,
+            "duration_seconds": run.duration_seconds,
+            "daily_stats_rows_before": run.daily_stats_rows_before,
+            "rows_read": run.rows_read,
+            "rows_loaded": run.rows_loaded,
+            "rows_rejected": run.rows_rejected,
+            "retries": run.retries,
+            "peak_memory_mb": run.peak_memory_mb,
+            "rows_per_second": _rows_per_second(run.rows_loaded, run.duration_seconds),
+            "error": run.error
+        }
+        for run in runs
+    ]
+
+def get_throughput_trends(
+    db: Session,
+    dataset: Optional[str] = None,
+    file_name: Optional[str] = None,
+    limit: int = 20
+) -> Dict[str, Any]:
+    """
+    Débit (lignes/s) des derniers chargements, globalement et par (dataset, fichier),
+    du plus ancien au plus récent.
+    """
+    runs = list(reversed(get_recent_runs(db, limit, finished_only=True)))
+    run_ids = [run["id"] for run in runs]
+
+    files_query = db.query(IngestionFile, IngestionRun.daily_stats_rows_before).join(
+        IngestionRun, IngestionRun.id == IngestionFile.id_run
+    ).filter(IngestionFile.id_run.in_(run_ids))
+    if dataset:
+        files_query = files_query.filter(IngestionFile.dataset == dataset)
+    if file_name:
+        files_query = files_query.filter(IngestionFile.file_name == file_name)
+
+    series: Dict[tuple, List[Dict[str, Any]]] = {}
+    for file, table_rows in files_query.order_by(IngestionFile.id_run, IngestionFile.id).all():
+        series.setdefault((file.dataset, file.file_name), []).append({
+            "run_id": file.id_run,
+            "started_at": file.started_at.isoformat() if file.started_at else None,
+            "status": file.status,
+            "rows_loaded": file.rows_loaded,
+            "rows_rejected": file.rows_rejected,
+            "retries": file.retries,
+            "duration_seconds": file.duration_seconds,
+            "peak_memory_mb": file.peak_memory_mb,
+            "daily_stats_rows_before": table_rows,
+            "rows_per_second": _rows_per_second(file.rows_loaded, file.duration_seconds)
+        })
+
+    return {
+        "runs": [
+            {key: run[key] for key in (
+                "id", "trigger", "started_at", "rows_loaded", "duration_seconds",
+                "daily_stats_rows_before", "rows_per_second"
+            )}
+            for run in runs
+        ],
+        "runs_change_pct": _change_pct(runs),
+        "files": [
+            {"dataset": key[0], "file": key[1], "change_pct": _change_pct(points), "points": points}
+            for key, points in sorted(series.items())
+        ]
+    }
@@ -0,0 +1,106 @@
+"""
+Maintenance et lecture de la table `latest_stats`.
+
+Chaque ligne reprend les valeurs cumulées de la date la plus récente de daily_stats
+pour une épidémie et une localisation : les totaux actuels se lisent sans additionner
+les valeurs cumulées de toutes les dates. Les lignes sont recalculées par l'ETL pour
+les seules localisations chargées (dernière date trouvée par l'index idx_unique_daily).
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, delete, false, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.db.models.base import DailyStats, Epidemic
+from app.db.models.rollup import LatestStats
+
+logger = logging.getLogger(__name__)
+
+COPIED_COLUMNS = ("cases", "deaths", "recovered", "active")
+INSERTED_COLUMNS = ("id_epidemic", "id_loc", "date") + COPIED_COLUMNS + ("updated_at",)
+
+# Taille maximale des listes IN sur les localisations
+LOCATION_CHUNK_SIZE = 500
+
+def _location_chunks(location_ids: Optional[Iterable[int]]) -> List[Optional[List[int]]]:
+    if location_ids is None:
+        return [None]
+    location_ids = sorted(set(location_ids))
+    return [location_ids[i:i + LOCATION_CHUNK_SIZE] for i in range(0, len(location_ids), LOCATION_CHUNK_SIZE)]
+
+def refresh(db: Session, epidemic_id: Optional[int] = None, location_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Recalcule les lignes de l'épidémie (toutes si `epidemic_id` est None), limitées aux
+    localisations `location_ids` si elles sont indiquées. Ne valide pas la transaction.
+    """
+    for chunk in _location_chunks(location_ids):
+        delete_stmt = delete(LatestStats)
+        latest = select(
+            DailyStats.id_epidemic,
+            DailyStats.id_loc,
+            func.max(DailyStats.date).label("date")
+        ).join(
+            # INSERT ... SELECT n'est pas filtré par app/db/visibility.py
+            Epidemic, Epidemic.id == DailyStats.id_epidemic
+        ).where(
+            Epidemic.deleting == false()
+        ).group_by(DailyStats.id_epidemic, DailyStats.id_loc)
+        if epidemic_id is not None:
+            delete_stmt = delete_stmt.where(LatestStats.id_epidemic == epidemic_id)
+            latest = latest.where(DailyStats.id_epidemic == epidemic_id)
+        if chunk is not None:
+            delete_stmt = delete_stmt.where(LatestStats.id_loc.in_(chunk))
+            latest = latest.where(DailyStats.id_loc.in_(chunk))
+        latest = latest.subquery()
+        rows = select(
+            DailyStats.id_epidemic,
+            DailyStats.id_loc,
+            DailyStats.date,
+            *(func.coalesce(getattr(DailyStats, column), 0) for column in COPIED_COLUMNS),
+            literal(datetime.utcnow())
+        ).join(latest, and_(
+            DailyStats.id_epidemic == latest.c.id_epidemic,
+            DailyStats.id_loc == latest.c.id_loc,
+            DailyStats.date == latest.c.date
+        ))
+        db.execute(delete_stmt)
+        db.execute(insert(LatestStats).from_select(INSERTED_COLUMNS, rows))
+
+def remove_epidemic(db: Session, epidemic_id: int) -> None:
+    """Retire une épidémie (suppression en cours). Ne valide pas la transaction."""
+    db.execute(delete(LatestStats).where(LatestStats.id_epidemic == epidemic_id))
+
+def remove_location(db: Session, location_id: int) -> None:
+    """Retire une localisation. Ne valide pas la transaction."""
+    db.execute(delete(LatestStats).where(LatestStats.id_loc == location_id))
+
+def rebuild(db: Session) -> None:
+    """Reconstruction complète (table nouvellement créée, ou données modifiées hors ETL)."""
+    refresh(db)
+    db.commit()
+    logger.info("Dernières valeurs par épidémie et localisation reconstruites")
+
+def get_totals(db: Session) -> Dict[str, Any]:
+    """Totaux actuels (somme des dernières valeurs) et date la plus récente."""
+    row = db.execute(select(
+        func.sum(LatestStats.cases).label("cases"),
+        func.sum(LatestStats.deaths).label("deaths"),
+        func.sum(LatestStats.recovered).label("recovered"),
+        func.max(LatestStats.date).label("date")
+    )).one()
+    return {
+        "cases": int(row.cases or 0),
+        "deaths": int(row.deaths or 0),
+        "recovered": int(row.recovered or 0),
+        "date": row.date
+    }
+
+def get_location_totals(db: Session) -> List[Any]:
+    """Cas et décès actuels par localisation (lecture de l'index idx_latest_stats_loc)."""
+    return db.execute(select(
+        LatestStats.id_loc,
+        func.sum(LatestStats.cases).label("cases"),
+        func.sum(LatestStats.deaths).label("deaths")
+    ).group_by(LatestStats.id_loc)).all()
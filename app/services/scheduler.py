@@ -0,0 +1,121 @@
+"""
+Planificateur du rafraîchissement incrémental des données.
+
+Chaque worker uvicorn démarre son propre planificateur, mais le rafraîchissement
+s'exécute sous le verrou consultatif ETL : un seul rafraîchissement tourne à la fois
+dans tout le cluster, et la date du dernier passage est partagée via `etl_schedule`.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config.settings import settings
+from app.db.session import IngestSessionLocal
+from app.db.locks import advisory_lock
+from app.db.models.etl import EtlSchedule
+from app.services.data_extraction import extract_and_load_datasets
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_NAME = "incremental_refresh"
+
+def in_window(hour: int, start: int, end: int) -> bool:
+    """Indique si l'heure est dans la fenêtre [start, end[, qui peut passer minuit."""
+    if start == end:
+        return True
+    if start < end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+class RefreshScheduler:
+    """
+    Lance `extract_and_load_datasets(incremental=True)` à intervalle régulier, hors heures de pointe.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = IngestSessionLocal,
+        interval_minutes: Optional[int] = None,
+        window_start: Optional[int] = None,
+        window_end: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.interval = timedelta(minutes=interval_minutes or settings.ETL_SCHEDULER_INTERVAL_MINUTES)
+        self.window_start = settings.ETL_SCHEDULER_WINDOW_START if window_start is None else window_start
+        self.window_end = settings.ETL_SCHEDULER_WINDOW_END if window_end is None else window_end
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_due(self, db: Session, now: datetime) -> bool:
+        state = db.get(EtlSchedule, SCHEDULE_NAME)
+        return state is None or state.last_run_at is None or state.last_run_at + self.interval <= now
+
+    def _record_run(self, db: Session, now: datetime, status: str, error: Optional[str] = None) -> None:
+        state = db.get(EtlSchedule, SCHEDULE_NAME)
+        if state is None:
+            state = EtlSchedule(name=SCHEDULE_NAME)
+            db.add(state)
+        state.last_run_at = now
+        state.last_status = status
+        state.last_error = error
+        db.commit()
+
+    def tick(self, now: Optional[datetime] = None) -> bool:
+        """
+        Exécute un rafraîchissement si l'on est dans la fenêtre, qu'il est dû et que le verrou est libre.
+        Retourne True si un rafraîchissement a été lancé.
+        """
+        now = now or datetime.now()
+        if not in_window(now.hour, self.window_start, self.window_end):
+            return False
+
+        db = self.session_factory()
+        try:
+            with advisory_lock(bind=db.get_bind()) as acquired:
+                if not acquired:
+                    logger.info("Rafraîchissement déjà en cours sur un autre worker")
+                    return False
+                if not self.is_due(db, now):
+                    return False
+
+                logger.info("Début du rafraîchissement incrémental planifié")
+                try:
+                    results = extract_and_load_datasets(db, incremental=True, trigger="scheduler")
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Échec du rafraîchissement planifié: {e}")
+                    self._record_run(db, now, "error", str(e))
+                    return True
+                loaded = sum(1 for result in results if result.get("status") == "success")
+                logger.info(f"Rafraîchissement planifié terminé: {loaded} fichiers chargés")
+                self._record_run(db, now, "success")
+                return True
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stopped.wait(settings.ETL_SCHEDULER_POLL_SECONDS):
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Erreur du planificateur ETL: {e}")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="etl-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Planificateur ETL démarré (intervalle {self.interval}, "
+            f"fenêtre {self.window_start}h-{self.window_end}h)"
+        )
+
+    def stop(self):
+        self._stopped.set()
+
+
+scheduler = RefreshScheduler()
@@ -1,9 +1,15 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, distinct, desc
-from typing import List, Dict, Any
+from sqlalchemy import func
+from sqlalchemy.pool import StaticPool, SingletonThreadPool
+from typing import Callable, List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config.settings import settings
 from app.db.models.base import Epidemic, DailyStats, Localisation
-from datetime import datetime, timedelta
-import logging
+from app.services import daily_rollup, latest_stats
+from app.services.analytics_cube import analytics_cube
+
+# Exécuteur partagé des requêtes indépendantes du tableau de bord
+_executor = ThreadPoolExecutor(max_workers=settings.DASHBOARD_QUERY_WORKERS, thread_name_prefix="dashboard")
 
 class StatsService:
     def __init__(self, db: Session):
@@ -11,32 +17,81 @@ class StatsService:
 
     def get_dashboard_stats(self) -> Dict[str, Any]:
         """
-        Récupère toutes les statistiques pour le tableau de bord
+        Récupère toutes les statistiques pour le tableau de bord.
+
+        daily_stats n'est parcourue qu'une fois (totaux par épidémie et localisation) ;
+        les distributions, totaux et classements en sont dérivés. Les requêtes restantes,
+        indépendantes, s'exécutent en parallèle sur des connexions distinctes du pool.
+        Avec le cube analytique, totaux et évolution sont calculés en mémoire. La
+        distribution géographique porte sur les dernières valeurs cumulées (latest_stats).
         """
+        cube = analytics_cube.get(self.db)
+        if cube is not None:
+            epidemics, countries, latest = self._run_concurrently(
+                self._get_epidemics,
+                self._get_location_countries,
+                latest_stats.get_location_totals
+            )
+            totals, evolution = cube.totals(), cube.daily_evolution(days=30)
+        else:
+            totals, evolution, epidemics, countries, latest = self._run_concurrently(
+                self._scan_totals,
+                self._get_daily_evolution,
+                self._get_epidemics,
+                self._get_location_countries,
+                latest_stats.get_location_totals
+            )
         return {
-            "global_stats": self._get_global_stats(),
-            "type_distribution": self._get_type_distribution(),
-            "geographic_distribution": self._get_geographic_distribution(),
-            "daily_evolution": self._get_daily_evolution(),
-            "top_active_epidemics": self._get_top_active_epidemics()
+            "global_stats": self._get_global_stats(totals),
+            "type_distribution": self._get_type_distribution(totals, epidemics),
+            "geographic_distribution": self._get_geographic_distribution(latest, countries),
+            "daily_evolution": evolution,
+            "top_active_epidemics": self._get_top_active_epidemics(totals, epidemics)
         }
 
-    def _get_global_stats(self) -> Dict[str, Any]:
+    def _run_concurrently(self, *queries: Callable[[Session], Any]) -> List[Any]:
+        """
+        Exécute chaque requête sur sa propre session. Avec un pool à connexion unique
+        (SQLite en mémoire) ou sur le moteur asynchrone (session liée à la boucle
+        d'événements), les requêtes sont exécutées l'une après l'autre.
+        """
+        bind = self.db.get_bind()
+        if bind.dialect.is_async or isinstance(bind.pool, (StaticPool, SingletonThreadPool)):
+            return [query(self.db) for query in queries]
+
+        def run(query):
+            with Session(bind) as session:
+                return query(session)
+
+        return [future.result() for future in [_executor.submit(run, query) for query in queries]]
+
+    def _scan_totals(self, db: Session) -> List[Any]:
+        """
+        Unique parcours de daily_stats : cas et décès par (épidémie, localisation)
+        """
+        return db.query(
+            DailyStats.id_epidemic,
+            DailyStats.id_loc,
+            func.sum(DailyStats.cases).label('cases'),
+            func.sum(DailyStats.deaths).label('deaths')
+        ).group_by(DailyStats.id_epidemic, DailyStats.id_loc).all()
+
+    def _get_epidemics(self, db: Session) -> Dict[int, Any]:
+        rows = db.query(Epidemic.id, Epidemic.name, Epidemic.type, Epidemic.country).all()
+        return {row.id: row for row in rows}
+
+    def _get_location_countries(self, db: Session) -> Dict[int, str]:
+        return dict(db.query(Localisation.id, Localisation.country).all())
+
+    def _get_global_stats(self, totals: List[Any]) -> Dict[str, Any]:
         """
         Calcule les statistiques globales
         """
-        # Récupérer les dernières statistiques quotidiennes
-        latest_stats = self.db.query(
-            func.sum(DailyStats.cases).label('total_cases'),
-            func.sum(DailyStats.deaths).label('total_deaths')
-        ).first()
+        total_cases = sum(int(row.cases or 0) for row in totals)
+        total_deaths = sum(int(row.deaths or 0) for row in totals)
+        total_epidemics = len({row.id_epidemic for row in totals})
 
-        # Compter les épidémies
-        total_epidemics = self.db.query(func.count(distinct(DailyStats.id_epidemic))).scalar()
-        
         # Calculer le taux de mortalité
-        total_cases = int(latest_stats.total_cases or 0)
-        total_deaths = int(latest_stats.total_deaths or 0)
         mortality_rate = (total_deaths / total_cases * 100) if total_cases > 0 else 0
 
         return {
@@ -47,122 +102,71 @@ class StatsService:
             "mortality_rate": float(mortality_rate)
         }
 
-    def _get_type_distribution(self) -> List[Dict[str, Any]]:
+    def _sum_by(self, totals: List[Any], attribute: str, groups: Dict[int, Any]) -> Dict[Any, List[int]]:
         """
-        Calcule la distribution par type d'épidémie
+        Somme [cas, décès] par groupe ; `groups` associe l'identifiant `attribute` de chaque ligne
+        à son groupe (les identifiants absents, comme dans une jointure interne, sont ignorés).
         """
-        results = self.db.query(
-            Epidemic.type,
-            func.sum(DailyStats.cases).label('cases'),
-            func.sum(DailyStats.deaths).label('deaths')
-        ).join(
-            DailyStats,
-            DailyStats.id_epidemic == Epidemic.id
-        ).group_by(Epidemic.type).all()
+        sums: Dict[Any, List[int]] = {}
+        for row in totals:
+            identifier = getattr(row, attribute)
+            if identifier not in groups:
+                continue
+            current = sums.setdefault(groups[identifier], [0, 0])
+            current[0] += int(row.cases or 0)
+            current[1] += int(row.deaths or 0)
+        return sums
 
+    def _get_type_distribution(self, totals: List[Any], epidemics: Dict[int, Any]) -> List[Dict[str, Any]]:
+        """
+        Calcule la distribution par type d'épidémie
+        """
+        sums = self._sum_by(totals, "id_epidemic", {epidemic_id: row.type for epidemic_id, row in epidemics.items()})
         return [
             {
-                "type": result.type or "Non spécifié",
-                "cases": int(result.cases or 0),
-                "deaths": int(result.deaths or 0)
+                "type": epidemic_type or "Non spécifié",
+                "cases": cases,
+                "deaths": deaths
             }
-            for result in results
+            for epidemic_type, (cases, deaths) in sums.items()
         ]
 
-    def _get_geographic_distribution(self) -> List[Dict[str, Any]]:
+    def _get_geographic_distribution(self, latest: List[Any], countries: Dict[int, str]) -> List[Dict[str, Any]]:
         """
-        Calcule la distribution géographique des cas
+        Calcule la distribution géographique des cas (10 pays les plus touchés), à partir
+        des dernières valeurs cumulées par localisation
         """
-        results = self.db.query(
-            Localisation.country,
-            func.sum(DailyStats.cases).label('cases'),
-            func.sum(DailyStats.deaths).label('deaths')
-        ).join(
-            DailyStats,
-            DailyStats.id_loc == Localisation.id
-        ).group_by(
-            Localisation.country
-        ).order_by(
-            desc('cases')
-        ).limit(10).all()
-
+        sums = self._sum_by(latest, "id_loc", countries)
+        ranked = sorted(sums.items(), key=lambda item: item[1][0], reverse=True)[:10]
         return [
             {
-                "country": result.country,
-                "cases": int(result.cases or 0),
-                "deaths": int(result.deaths or 0)
+                "country": country,
+                "cases": cases,
+                "deaths": deaths
             }
-            for result in results
+            for country, (cases, deaths) in ranked
         ]
 
-    def _get_daily_evolution(self) -> List[Dict[str, Any]]:
-        """
-        Récupère l'évolution quotidienne des cas sur les 30 derniers jours
-        """
-        # Récupérer toutes les dates disponibles
-        dates = self.db.query(
-            DailyStats.date
-        ).distinct().order_by(DailyStats.date.asc()).all()
-        
-        if not dates:
-            return []
-
-        results = self.db.query(
-            DailyStats.date,
-            func.sum(DailyStats.new_cases).label('new_cases'),
-            func.sum(DailyStats.new_deaths).label('new_deaths'),
-            func.sum(DailyStats.active).label('active_cases')
-        ).group_by(
-            DailyStats.date
-        ).order_by(
-            DailyStats.date.asc()
-        ).all()
-
-        return [
-            {
-                "date": result.date.isoformat(),
-                "new_cases": int(result.new_cases or 0),
-                "new_deaths": int(result.new_deaths or 0),
-                "active_cases": int(result.active_cases or 0)
-            }
-            for result in results
-        ]
+    def _get_daily_evolution(self, db: Optional[Session] = None, days: int = 30) -> List[Dict[str, Any]]:
+        """
+        Récupère l'évolution quotidienne des cas sur les 30 derniers jours de données (table daily_rollup)
+        """
+        return daily_rollup.get_daily_evolution(db or self.db, days=days)
 
-    def _get_top_active_epidemics(self) -> List[Dict[str, Any]]:
+    def _get_top_active_epidemics(self, totals: List[Any], epidemics: Dict[int, Any]) -> List[Dict[str, Any]]:
         """
         Récupère les épidémies les plus importantes
         """
-        # Sous-requête pour obtenir les totaux par épidémie
-        epidemic_stats = self.db.query(
-            DailyStats.id_epidemic,
-            func.sum(DailyStats.cases).label('total_cases'),
-            func.sum(DailyStats.deaths).label('total_deaths')
-        ).group_by(
-            DailyStats.id_epidemic
-        ).subquery()
-
-        results = self.db.query(
-            Epidemic.id,
-            Epidemic.name,
-            Epidemic.type,
-            Epidemic.country,
-            epidemic_stats.c.total_cases,
-            epidemic_stats.c.total_deaths
-        ).join(
-            epidemic_stats,
-            epidemic_stats.c.id_epidemic == Epidemic.id
-        ).order_by(
-            desc(epidemic_stats.c.total_cases)
-        ).limit(5).all()
-
+        sums = self._sum_by(totals, "id_epidemic", {epidemic_id: epidemic_id for epidemic_id in epidemics})
+        ranked = sorted(sums.items(), key=lambda item: item[1][0], reverse=True)[:5]
         return [
             {
-                "id": result.id,
-                "name": result.name,
-                "type": result.type or "Non spécifié",
-                "country": result.country,
-                "total_cases": int(result.total_cases or 0),
-                "total_deaths": int(result.total_deaths or 0)
+                "id": epidemic_id,
+                "name": epidemics[epidemic_id].name,
+                "type": epidemics[epidemic_id].type or "Non spécifié",
+                "country": epidemics[epidemic_id].country,
+                "total_cases": cases,
+                "total_deaths": deaths
             }
-            for result in results
-        ] 
\ No newline at end of file
+            for epidemic_id, (cases, deaths) in ranked
+        ]
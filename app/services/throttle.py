@@ -0,0 +1,103 @@
+"""
+Contre-pression de l'ETL sur l'API.
+
+Entre deux lots d'écriture, l'ETL consulte la latence récente des requêtes API (p95)
+et le temps d'attente du pool de connexions. Au-dessus de la cible, la taille des lots
+est divisée par deux et une pause (doublée à chaque dépassement) est insérée ; sous la
+cible, les lots regrossissent progressivement, et reviennent au maximum dès que l'API est inactive.
+
+Les mesures sont celles du processus courant : l'ETL lancé depuis un worker uvicorn
+réagit à la charge de ce worker et au pool qu'il partage avec lui.
+"""
+import time
+import logging
+from typing import Callable, Dict, Any, Optional
+
+from app.core import metrics
+from app.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MIN_PAUSE_SECONDS = 0.05
+
+class AdaptiveThrottle:
+    """
+    Ajuste la taille des lots et la pause entre lots selon la charge observée.
+    """
+
+    def __init__(
+        self,
+        api_latency: metrics.RollingWindow = metrics.api_latency,
+        pool_wait: metrics.RollingWindow = metrics.pool_wait,
+        latency_target_ms: Optional[float] = None,
+        pool_wait_target_ms: Optional[float] = None,
+        min_batch: Optional[int] = None,
+        max_batch: Optional[int] = None,
+        max_pause: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.api_latency = api_latency
+        self.pool_wait = pool_wait
+        self.latency_target_ms = latency_target_ms or settings.ETL_THROTTLE_LATENCY_TARGET_MS
+        self.pool_wait_target_ms = pool_wait_target_ms or settings.ETL_THROTTLE_POOL_WAIT_TARGET_MS
+        self.min_batch = min_batch or settings.ETL_BATCH_SIZE_MIN
+        self.max_batch = max_batch or settings.ETL_BATCH_SIZE_MAX
+        self.max_pause = settings.ETL_THROTTLE_MAX_PAUSE_SECONDS if max_pause is None else max_pause
+        self.enabled = settings.ETL_THROTTLE_ENABLED if enabled is None else enabled
+        self._sleep = sleep
+        self.batch_size = self.max_batch
+        self.pause = 0.0
+        self.throttled_batches = 0
+
+    def pressure(self) -> Optional[str]:
+        """Retourne la raison du ralentissement, ou None si l'API et le pool sont sous leur cible."""
+        latency = self.api_latency.percentile(95)
+        if latency is not None and latency > self.latency_target_ms:
+            return f"latence API p95 {latency:.0f} ms > {self.latency_target_ms:.0f} ms"
+        wait = self.pool_wait.percentile(95)
+        if wait is not None and wait > self.pool_wait_target_ms:
+            return f"attente pool p95 {wait:.0f} ms > {self.pool_wait_target_ms:.0f} ms"
+        return None
+
+    def after_batch(self) -> float:
+        """
+        À appeler après chaque lot écrit : met à jour la taille du prochain lot et
+        observe la pause éventuelle. Retourne la pause appliquée (en secondes).
+        """
+        if not self.enabled:
+            return 0.0
+
+        reason = self.pressure()
+        if reason:
+            if self.pause == 0.0:
+                logger.info(f"ETL ralenti: {reason}")
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+            self.pause = min(self.max_pause, max(self.pause * 2, MIN_PAUSE_SECONDS))
+            self.throttled_batches += 1
+        elif self.api_latency.count() == 0:
+            # API inactive : pleine vitesse
+            self.batch_size = self.max_batch
+            self.pause = 0.0
+        else:
+            self.batch_size = min(self.max_batch, self.batch_size + max(self.min_batch, self.batch_size // 4))
+            self.pause = self.pause / 2 if self.pause / 2 >= MIN_PAUSE_SECONDS else 0.0
+
+        if self.pause:
+            self._sleep(self.pause)
+        return self.pause
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "batch_size": self.batch_size,
+            "pause_seconds": self.pause,
+            "throttled_batches": self.throttled_batches,
+            "latency_target_ms": self.latency_target_ms,
+            "pool_wait_target_ms": self.pool_wait_target_ms,
+            "api_latency": self.api_latency.snapshot(),
+            "pool_wait": self.pool_wait.snapshot()
+        }
+
+
+etl_throttle = AdaptiveThrottle()
@@ -0,0 +1,176 @@
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.dialects import supports_window_functions
+from app.db.models.base import DailyStats
+from app.db.models.rollup import DailyRollup, GLOBAL_ROLLUP
+from app.services.analytics_cube import analytics_cube
+
+logger = logging.getLogger(__name__)
+
+# Flux : sommés sur la période ; cumuls : valeur du dernier jour de la période
+FLOW_METRICS = ("new_cases", "new_deaths", "new_recovered")
+STOCK_METRICS = ("cases", "deaths", "recovered", "active")
+METRICS = FLOW_METRICS + STOCK_METRICS
+BUCKETS = ("day", "week", "month")
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Moyenne glissante sur `window` périodes (fenêtre partielle en début de série),
+    identique à AVG(...) OVER (ROWS BETWEEN window - 1 PRECEDING AND CURRENT ROW).
+    """
+    cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=float)))
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (cumulative[ends] - cumulative[starts]) / (ends - starts)
+
+def bucket_starts(dates: np.ndarray, bucket: str) -> np.ndarray:
+    """Premier jour de la période de chaque date (datetime64[D], semaines commençant le lundi)."""
+    if bucket == "week":
+        # Le 1er janvier 1970 était un jeudi
+        return dates - ((dates.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    if bucket == "month":
+        return dates.astype("datetime64[M]").astype("datetime64[D]")
+    return dates
+
+class TimeSeriesService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.bind = db.get_bind()
+
+    def _bucket(self, column, bucket: str):
+        """Premier jour de la période contenant `column` (semaines commençant le lundi)."""
+        if bucket == "day":
+            return column
+        if self.bind.dialect.name == "sqlite":
+            if bucket == "week":
+                return func.date(column, "-6 days", "weekday 1")
+            return func.strftime("%Y-%m-01", column)
+        if bucket == "week":
+            return func.subdate(column, func.weekday(column))
+        return func.date_format(column, "%Y-%m-01")
+
+    def _series_from_cube(self, cube, metrics, epidemic_id, location_ids, bucket, rolling, date_from, date_to) -> Dict[str, Any]:
+        """Même calcul que la requête SQL, par réductions NumPy sur le cube analytique."""
+        dates, daily = cube.daily(metrics, epidemic_id, location_ids)
+        window = np.ones(dates.shape, dtype=bool)
+        if date_from is not None:
+            window &= dates >= np.datetime64(date_from)
+        if date_to is not None:
+            window &= dates <= np.datetime64(date_to)
+        keys = bucket_starts(dates[window], bucket)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+        ends = np.r_[starts[1:], len(keys)] - 1
+        series = {}
+        for metric in metrics:
+            values = daily[metric][window]
+            if not len(starts):
+                series[metric] = []
+            elif metric in FLOW_METRICS:
+                series[metric] = np.add.reduceat(values, starts).tolist()
+            else:
+                series[metric] = values[ends].tolist()
+        if rolling:
+            for metric in metrics:
+                averages = rolling_mean(np.array(series[metric], dtype=float), rolling)
+                series[f"{metric}_rolling"] = np.round(averages, 2).tolist()
+        return {"periods": [str(key) for key in keys[starts]], "series": series}
+
+    def get_series(
+        self,
+        epidemic_id: Optional[int] = None,
+        location_ids: Sequence[int] = (),
+        metrics: Sequence[str] = ("new_cases",),
+        bucket: str = "day",
+        rolling: Optional[int] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Série temporelle agrégée en base par période (jour, semaine, mois).
+
+        Sans filtre de localisation, la série est lue dans daily_rollup (par épidémie ou
+        globale) ; sinon dans daily_stats pour les localisations demandées. La moyenne
+        glissante (`rolling` périodes) est calculée par une fonction de fenêtrage quand
+        la base la supporte, avec NumPy sinon. Avec le cube analytique, tout le calcul
+        est fait en mémoire par des réductions NumPy.
+        """
+        metrics = list(dict.fromkeys(metrics))
+        unknown = [metric for metric in metrics if metric not in METRICS]
+        if unknown or not metrics:
+            raise ValueError(f"Métriques inconnues: {', '.join(unknown) or 'aucune'} (valeurs possibles: {', '.join(METRICS)})")
+        if bucket not in BUCKETS:
+            raise ValueError(f"Période inconnue: {bucket}")
+        response = {
+            "epidemic_id": epidemic_id,
+            "location_ids": list(location_ids),
+            "bucket": bucket,
+            "rolling": rolling
+        }
+
+        cube = analytics_cube.get(self.db)
+        if cube is not None:
+            return {**response, **self._series_from_cube(cube, metrics, epidemic_id, location_ids, bucket, rolling, date_from, date_to)}
+
+        if location_ids:
+            table, conditions = DailyStats, [DailyStats.id_loc.in_(list(location_ids))]
+            if epidemic_id is not None:
+                conditions.append(DailyStats.id_epidemic == epidemic_id)
+        else:
+            table = DailyRollup
+            conditions = [DailyRollup.id_epidemic == (GLOBAL_ROLLUP if epidemic_id is None else epidemic_id)]
+        if date_from is not None:
+            conditions.append(table.date >= date_from)
+        if date_to is not None:
+            conditions.append(table.date <= date_to)
+
+        bucket_column = self._bucket(table.date, bucket)
+        daily = select(
+            table.date.label("day"),
+            bucket_column.label("bucket"),
+            *(func.sum(getattr(table, metric)).label(metric) for metric in metrics)
+        ).where(*conditions).group_by(table.date, bucket_column).cte("daily")
+
+        periods = select(
+            daily.c.bucket,
+            func.max(daily.c.day).label("last_day"),
+            *(func.sum(daily.c[metric]).label(metric) for metric in metrics if metric in FLOW_METRICS)
+        ).group_by(daily.c.bucket).cte("periods")
+
+        values = {
+            metric: periods.c[metric] if metric in FLOW_METRICS else daily.c[metric]
+            for metric in metrics
+        }
+        in_database = bool(rolling) and supports_window_functions(self.bind)
+        columns = [periods.c.bucket, *(values[metric].label(metric) for metric in metrics)]
+        if in_database:
+            columns += [
+                func.avg(values[metric]).over(order_by=periods.c.bucket, rows=(-(rolling - 1), 0)).label(f"{metric}_rolling")
+                for metric in metrics
+            ]
+        stmt = select(*columns).select_from(
+            periods.join(daily, daily.c.day == periods.c.last_day)
+        ).order_by(periods.c.bucket)
+        rows = self.db.execute(stmt).all()
+
+        series: Dict[str, List[Any]] = {}
+        for index, metric in enumerate(metrics, start=1):
+            series[metric] = [int(row[index] or 0) for row in rows]
+        if rolling:
+            for index, metric in enumerate(metrics, start=1 + len(metrics)):
+                if in_database:
+                    averages = np.array([float(row[index] or 0) for row in rows])
+                else:
+                    averages = rolling_mean(np.array(series[metric], dtype=float), rolling)
+                series[f"{metric}_rolling"] = np.round(averages, 2).tolist()
+
+        return {
+            **response,
+            "periods": [row[0].isoformat() if hasattr(row[0], "isoformat") else str(row[0]) for row in rows],
+            "series": series
+        }
@@ -0,0 +1,179 @@
+"""
+Ingestion en continu des dépôts CSV partenaires.
+
+Les fichiers sont déposés dans `WATCH_FOLDER_PATH/<dataset>/` où `<dataset>` est l'un des
+formats déjà gérés par `clean_dataset` (mpox, covid19, corona). Le dossier est scruté
+toutes les `WATCH_FOLDER_POLL_SECONDS` secondes ; chaque nouveau fichier (ou fichier dont
+le contenu a changé) passe par le chemin de nettoyage/chargement habituel, puis est déplacé
+dans `processed/` (ou `failed/` en cas d'erreur). Seules les statistiques globales des
+épidémies concernées sont recalculées.
+"""
+import os
+import time
+import shutil
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config.settings import settings
+from app.db.session import IngestSessionLocal
+from app.db.locks import advisory_lock
+from app.db.models.base import Epidemic
+from app.services import ingestion_history
+from app.services.analytics_cube import publish_data_version
+from app.services.data_extraction import (
+    KAGGLE_DATASETS,
+    file_fingerprint,
+    file_has_changed,
+    record_file_loaded,
+    get_or_create_data_source,
+    load_csv_file,
+    calculate_overall_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+PROCESSED_DIR = "processed"
+FAILED_DIR = "failed"
+
+class FolderWatcher:
+    """
+    Scrute un dossier de dépôt et charge les fichiers CSV qui y arrivent.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        session_factory: Callable[[], Session] = IngestSessionLocal,
+        poll_seconds: Optional[float] = None,
+        settle_seconds: Optional[float] = None
+    ):
+        self.root = os.path.abspath(root or settings.WATCH_FOLDER_PATH)
+        self.session_factory = session_factory
+        self.poll_seconds = settings.WATCH_FOLDER_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self.settle_seconds = settings.WATCH_FOLDER_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def pending_files(self) -> List[Tuple[str, str]]:
+        """
+        Liste les fichiers (dataset, chemin) prêts à être chargés. Un fichier modifié
+        depuis moins de `settle_seconds` est considéré en cours d'écriture et attend le passage suivant.
+        """
+        now = time.time()
+        pending = []
+        for dataset in KAGGLE_DATASETS:
+            folder = os.path.join(self.root, dataset)
+            if not os.path.isdir(folder):
+                continue
+            for entry in sorted(os.scandir(folder), key=lambda e: e.name):
+                if not entry.is_file() or not entry.name.lower().endswith(".csv"):
+                    continue
+                if now - entry.stat().st_mtime < self.settle_seconds:
+                    continue
+                pending.append((dataset, entry.path))
+        return pending
+
+    def _move_aside(self, path: str, dataset: str, target: str) -> str:
+        folder = os.path.join(self.root, target, dataset)
+        os.makedirs(folder, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        destination = os.path.join(folder, f"{stamp}_{os.path.basename(path)}")
+        shutil.move(path, destination)
+        return destination
+
+    def process_file(self, db: Session, dataset: str, path: str) -> Dict[str, Any]:
+        file_key = os.path.join("watch", dataset, os.path.basename(path))
+        fingerprint = file_fingerprint(path)
+        if not file_has_changed(db, dataset, file_key, fingerprint):
+            self._move_aside(path, dataset, PROCESSED_DIR)
+            return {"dataset": dataset, "file": os.path.basename(path), "status": "unchanged"}
+
+        try:
+            data_source = get_or_create_data_source(
+                db, f"{dataset}_depot", self.root, url=f"file://{self.root}"
+            )
+            rows = load_csv_file(db, dataset, data_source.id, path)
+            record_file_loaded(db, dataset, file_key, fingerprint, rows)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Échec du chargement de {path}: {e}")
+            self._move_aside(path, dataset, FAILED_DIR)
+            return {"dataset": dataset, "file": os.path.basename(path), "status": "error", "error": str(e)}
+
+        self._move_aside(path, dataset, PROCESSED_DIR)
+        return {"dataset": dataset, "file": os.path.basename(path), "rows": rows, "status": "success"}
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """
+        Charge les fichiers en attente. Retourne le résultat par fichier.
+        """
+        files = self.pending_files()
+        if not files:
+            return []
+
+        db = self.session_factory()
+        try:
+            # Même verrou que l'ETL complet : pas de chargements concurrents sur daily_stats
+            with advisory_lock(bind=db.get_bind()) as acquired:
+                if not acquired:
+                    logger.info("Chargement ETL en cours, dépôts reportés au prochain passage")
+                    return []
+
+                with ingestion_history.ingestion_run(db.get_bind(), "watch-folder") as run_id:
+                    results = []
+                    for dataset, path in files:
+                        with ingestion_history.record_file(
+                            db.get_bind(), run_id, dataset, os.path.basename(path)
+                        ) as record:
+                            result = self.process_file(db, dataset, path)
+                            if result["status"] == "error":
+                                record.fail(result["error"])
+                        results.append(result)
+                loaded = {result["dataset"] for result in results if result["status"] == "success"}
+                if loaded:
+                    epidemic_ids = [
+                        epidemic_id for (epidemic_id,) in
+                        db.query(Epidemic.id).filter(Epidemic.name.in_(loaded)).all()
+                    ]
+                    calculate_overall_stats(db, epidemic_ids=epidemic_ids)
+                    publish_data_version(db)
+                logger.info(f"{len(results)} fichier(s) déposé(s) traité(s)")
+                return results
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stopped.wait(self.poll_seconds):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Erreur du dossier surveillé {self.root}: {e}")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        os.makedirs(self.root, exist_ok=True)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="watch-folder", daemon=True)
+        self._thread.start()
+        logger.info(f"Surveillance du dossier {self.root} (toutes les {self.poll_seconds}s)")
+
+    def stop(self):
+        self._stopped.set()
+
+
+watcher = FolderWatcher()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    watcher.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        watcher.stop()
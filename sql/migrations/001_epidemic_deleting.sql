@@ -0,0 +1,3 @@
+-- Suppression en arrière-plan des épidémies : drapeau de suppression en cours
+-- (la table epidemic_deletion est créée au démarrage de l'application)
+ALTER TABLE epidemic ADD COLUMN deleting TINYINT(1) NOT NULL DEFAULT 0;
@@ -0,0 +1,3 @@
+-- Recherche plein texte des épidémies (GET /epidemics?search=...)
+-- (créé automatiquement au démarrage de l'application si absent)
+ALTER TABLE epidemic ADD FULLTEXT INDEX ft_epidemic_search (name, type, country);
@@ -0,0 +1,16 @@
+-- Index des requêtes du tableau de bord et de la liste des épidémies
+-- (créés automatiquement au démarrage de l'application s'ils sont absents)
+
+-- Totaux par (épidémie, localisation) et taux moyens lus dans l'index seul
+ALTER TABLE daily_stats ADD INDEX idx_daily_totals (id_epidemic, id_loc, cases, deaths, new_cases);
+
+ALTER TABLE localisation ADD INDEX idx_localisation_country (country);
+
+-- Les lectures filtrent toujours sur deleting (épidémies en cours de suppression masquées)
+ALTER TABLE epidemic
+    ADD INDEX idx_epidemic_name (deleting, name),
+    ADD INDEX idx_epidemic_cases (deleting, total_cases),
+    ADD INDEX idx_epidemic_deaths (deleting, total_deaths),
+    ADD INDEX idx_epidemic_start_date (deleting, start_date),
+    ADD INDEX idx_epidemic_type (deleting, type, total_cases, total_deaths),
+    ADD INDEX idx_epidemic_country (deleting, country, total_cases, total_deaths);
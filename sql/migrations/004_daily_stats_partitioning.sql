@@ -0,0 +1,27 @@
+-- Partitionnement RANGE de daily_stats par date (DAILY_STATS_PARTITIONING=year)
+-- Une table créée par l'application avec ce paramètre est partitionnée directement ;
+-- ce script convertit une table existante (copie complète : à lancer hors charge).
+-- Adapter la liste des partitions à DAILY_STATS_PARTITION_START et à l'année courante,
+-- la maintenance de l'application crée ensuite les périodes suivantes en découpant pmax.
+
+-- MySQL n'accepte pas de clé étrangère sur une table partitionnée
+ALTER TABLE daily_stats
+    DROP FOREIGN KEY fk_daily_stats_epidemic,
+    DROP FOREIGN KEY fk_daily_stats_source,
+    DROP FOREIGN KEY fk_daily_stats_loc;
+
+-- Toute clé unique doit contenir la colonne de partitionnement
+ALTER TABLE daily_stats DROP PRIMARY KEY, ADD PRIMARY KEY (id, date);
+
+ALTER TABLE daily_stats PARTITION BY RANGE COLUMNS(date) (
+    PARTITION p_before VALUES LESS THAN ('2019-01-01'),
+    PARTITION p2019 VALUES LESS THAN ('2020-01-01'),
+    PARTITION p2020 VALUES LESS THAN ('2021-01-01'),
+    PARTITION p2021 VALUES LESS THAN ('2022-01-01'),
+    PARTITION p2022 VALUES LESS THAN ('2023-01-01'),
+    PARTITION p2023 VALUES LESS THAN ('2024-01-01'),
+    PARTITION p2024 VALUES LESS THAN ('2025-01-01'),
+    PARTITION p2025 VALUES LESS THAN ('2026-01-01'),
+    PARTITION p2026 VALUES LESS THAN ('2027-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
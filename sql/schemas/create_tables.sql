@@ -13,7 +13,8 @@ CREATE TABLE Localisation (
     id INT PRIMARY KEY AUTO_INCREMENT,
     country VARCHAR(100) NOT NULL,
     region VARCHAR(150),
-    iso_code VARCHAR(10) UNIQUE
+    iso_code VARCHAR(10) UNIQUE,
+    INDEX idx_localisation_country (country)
 );
 
 -- Création de la table Data_source
@@ -45,7 +46,8 @@ CREATE TABLE Daily_stats (
     UNIQUE KEY idx_unique_daily (id_epidemic, id_loc, date),
     INDEX idx_daily_epidemic (id_epidemic),
     INDEX idx_daily_loc (id_loc),
-    INDEX idx_daily_date (date)
+    INDEX idx_daily_date (date),
+    INDEX idx_daily_totals (id_epidemic, id_loc, cases, deaths, new_cases)
 );
 
 -- Création de la table Overall_stats
@@ -11,7 +11,8 @@ from sqlalchemy.pool import StaticPool
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from app.main import app
-from app.db.session import get_db
+from app.core.cache import response_cache, dimension_cache
+from app.db.session import get_db, get_query_db, get_read_db
 from app.db.models.base import Base
 
 # Utiliser SQLite en mémoire par défaut, mais permettre l'override via les variables d'environnement
@@ -35,6 +36,15 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_
 # Créer les tables une seule fois au niveau du module
 Base.metadata.create_all(bind=test_engine)
 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    # Chaque module de test a sa propre base : le cache ne doit pas survivre d'un test à l'autre
+    response_cache.clear()
+    dimension_cache.clear()
+    yield
+    response_cache.clear()
+    dimension_cache.clear()
+
 @pytest.fixture(scope="function")
 def db_session():
     connection = test_engine.connect()
@@ -60,6 +70,8 @@ def override_get_db(db_session):
 def client(override_get_db):
     # Override la dépendance get_db
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_query_db] = override_get_db
     
     # Override l'engine de l'application pour utiliser la base de test
     from app.db import session
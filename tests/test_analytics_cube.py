@@ -0,0 +1,142 @@
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.endpoints.dashboard import compute_overview
+from app.core.cache import response_cache
+from app.db.models.base import Base, Epidemic, DailyStats, Localisation, DataSource
+from app.services import daily_rollup, latest_stats
+from app.services.analytics_cube import AnalyticsCube, CubeEngine, CubeTooLarge, analytics_cube, publish_data_version
+from app.services.analytics_snapshot import map_snapshot
+from app.services.stats_service import StatsService
+from app.services.time_series import TimeSeriesService
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture(scope="module")
+def ids():
+    db = TestingSessionLocal()
+    covid = Epidemic(name="covid", type="Viral", country="Monde")
+    mpox = Epidemic(name="mpox", type="Viral", country="Monde")
+    locations = [Localisation(country=country) for country in ("France", "Italie", "Espagne")]
+    source = DataSource(source_type="test", url="file://test")
+    db.add_all([covid, mpox, source, *locations])
+    db.commit()
+    start = date(2020, 2, 20)
+    rows = []
+    for e, epidemic in enumerate((covid, mpox)):
+        for position, location in enumerate(locations):
+            # Séries de longueurs différentes : jours sans ligne pour certaines localisations
+            for day in range(e * 5, 40 - position * 3):
+                rows.append(DailyStats(
+                    id_epidemic=epidemic.id, id_loc=location.id, id_source=source.id,
+                    date=start + timedelta(days=day),
+                    cases=(position + 1) * day * 10, deaths=(e + 1) * day, active=day + position,
+                    new_cases=(position + 1) * 10, new_deaths=e + 1, recovered=None
+                ))
+    db.add_all(rows)
+    db.commit()
+    daily_rollup.rebuild(db)
+    latest_stats.rebuild(db)
+    result = {"covid": covid.id, "locations": [location.id for location in locations]}
+    db.close()
+    return result
+
+
+@pytest.fixture
+def db():
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def cube_enabled(monkeypatch):
+    analytics_cube.clear()
+    monkeypatch.setattr(analytics_cube, "enabled", True)
+    yield analytics_cube
+    analytics_cube.clear()
+
+
+def test_dashboard_and_overview_match_sql(db, ids, cube_enabled):
+    cube_enabled.enabled = False
+    from_sql = (StatsService(db).get_dashboard_stats(), compute_overview(db))
+    cube_enabled.enabled = True
+    from_cube = (StatsService(db).get_dashboard_stats(), compute_overview(db))
+
+    assert cube_enabled.builds == 1
+    assert from_cube[0] == from_sql[0]
+    assert from_cube[1]["averageTransmissionRate"] == pytest.approx(from_sql[1]["averageTransmissionRate"])
+    assert from_cube[1]["averageMortalityRate"] == pytest.approx(from_sql[1]["averageMortalityRate"])
+
+
+@pytest.mark.parametrize("params", [
+    {"metrics": ["new_cases", "cases", "active"], "bucket": "week", "rolling": 3},
+    {"metrics": ["new_deaths", "deaths"], "bucket": "month"},
+    {"metrics": ["new_cases"], "bucket": "day", "date_from": date(2020, 3, 1), "date_to": date(2020, 3, 10)},
+    {"metrics": ["cases", "new_cases"], "bucket": "week", "location_ids": "subset"},
+])
+def test_time_series_match_sql(db, ids, cube_enabled, params):
+    params = dict(params, epidemic_id=ids["covid"])
+    if params.get("location_ids") == "subset":
+        params["location_ids"] = ids["locations"][1:]
+    cube_enabled.enabled = False
+    from_sql = TimeSeriesService(db).get_series(**params)
+    cube_enabled.enabled = True
+    assert TimeSeriesService(db).get_series(**params) == from_sql
+
+
+def test_cube_is_rebuilt_when_data_version_changes(db, ids, cube_enabled):
+    first = cube_enabled.get(db)
+    assert cube_enabled.get(db) is first
+
+    response_cache.invalidate(db)
+    second = cube_enabled.get(db)
+    assert second is not first
+    assert second.version == response_cache.current_version(db)
+
+
+def test_oversized_cube_falls_back_to_sql(db, ids):
+    with pytest.raises(CubeTooLarge):
+        AnalyticsCube.load(db, version=1, max_cells=10)
+    cube_engine = CubeEngine(enabled=True, max_cells=10)
+    assert cube_engine.get(db) is None
+    assert "limite" in cube_engine.stats()["last_error"]
+
+
+def test_snapshot_is_shared_through_read_only_mappings(db, ids, tmp_path):
+    writer = CubeEngine(enabled=True, snapshots=True, snapshot_dir=str(tmp_path))
+    reader = CubeEngine(enabled=True, snapshots=True, snapshot_dir=str(tmp_path))
+    in_memory = AnalyticsCube.load(db, response_cache.current_version(db))
+
+    written = writer.get(db)
+    # Le second worker projette l'instantané écrit par le premier
+    mapped = reader.get(db)
+    assert reader.stats()["source"] == "snapshot"
+    assert isinstance(mapped.values["cases"], np.memmap) and not mapped.values["cases"].flags.writeable
+    assert mapped.totals() == written.totals() == in_memory.totals()
+    assert mapped.daily_evolution() == in_memory.daily_evolution()
+
+
+def test_publish_writes_snapshot_for_new_version(db, ids, tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics_cube, "snapshots", True)
+    monkeypatch.setattr(analytics_cube, "snapshot_dir", str(tmp_path))
+    versions = [publish_data_version(db, warm=False) for _ in range(3)]
+
+    # Les anciennes versions sont supprimées (ANALYTICS_SNAPSHOT_KEEP = 2)
+    assert sorted(os.listdir(tmp_path)) == [f"v{version}" for version in versions[1:]]
+    mapped = map_snapshot(versions[-1], str(tmp_path))
+    assert mapped["meta"]["epidemic_ids"] == sorted(mapped["meta"]["epidemic_ids"])
+    assert map_snapshot(versions[0], str(tmp_path)) is None
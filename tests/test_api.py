@@ -6,7 +6,7 @@ import pytest
 from datetime import date
 
 from app.main import app
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.db.models.base import Base
 
 # Configuration de la base de données de test
@@ -32,6 +32,7 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 client = TestClient(app)
 
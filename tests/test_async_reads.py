@@ -0,0 +1,175 @@
+import asyncio
+import threading
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.main import app
+from app.db import session as db_session
+from app.db.session import async_database_url, get_db, get_read_db, run_read, run_read_in_threadpool
+from app.db.models.base import Base, DailyStats, DataSource, Epidemic, Localisation
+from app.services import daily_rollup
+from app.services.analytics_cube import CubeEngine
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Base SQLite sur fichier, partagée par un moteur synchrone et un moteur aiosqlite."""
+    path = tmp_path / "reads.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SyncSession()
+    covid = Epidemic(name="covid", type="Viral", country="Chine", total_cases=30, total_deaths=3)
+    france = Localisation(country="France")
+    source = DataSource(source_type="test", url="file://test")
+    db.add_all([covid, france, source])
+    db.commit()
+    db.add_all([
+        DailyStats(id_epidemic=covid.id, id_loc=france.id, id_source=source.id,
+                   date=date(2020, 3, day), cases=day * 10, deaths=day, new_cases=10)
+        for day in range(1, 4)
+    ])
+    db.commit()
+    daily_rollup.rebuild(db)
+    db.close()
+
+    async_engine = create_async_engine(async_database_url(f"sqlite:///{path}"), poolclass=NullPool)
+    AsyncTestingSession = async_sessionmaker(async_engine, expire_on_commit=False)
+    yield SyncSession, AsyncTestingSession
+    engine.dispose()
+
+
+@pytest.fixture
+def clients(database):
+    SyncSession, AsyncTestingSession = database
+
+    def override_get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_read_db():
+        async with AsyncTestingSession() as db:
+            assert isinstance(db, AsyncSession)
+            db.info["sync_session_factory"] = SyncSession
+            yield db
+
+    def client_for(read_override):
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = read_override
+        return TestClient(app)
+
+    previous = dict(app.dependency_overrides)
+    try:
+        yield client_for(override_get_read_db), lambda: client_for(override_get_db)
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+
+
+READ_ENDPOINTS = [
+    "/api/v1/epidemics",
+    "/api/v1/epidemics/filters",
+    "/api/v1/epidemics/stats/dashboard",
+    "/api/v1/locations/",
+    "/api/v1/data-sources/",
+    "/api/v1/stats/dashboard",
+    "/api/v1/dashboard/overview",
+    "/api/v1/dashboard/trends",
+]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_async_session_serves_the_same_data(clients):
+    async_client, sync_client = clients
+    async_responses = {path: async_client.get(path) for path in READ_ENDPOINTS}
+    sync_client = sync_client()
+    for path, response in async_responses.items():
+        assert response.status_code == 200, path
+        assert response.json() == sync_client.get(path).json(), path
+
+
+def test_detail_endpoints_on_async_session(clients):
+    async_client, _ = clients
+    epidemic = async_client.get("/api/v1/epidemics").json()["items"][0]
+    assert async_client.get(f"/api/v1/epidemics/{epidemic['id']}").json()["name"] == "covid"
+    assert async_client.get("/api/v1/epidemics/999").status_code == 404
+    location = async_client.get("/api/v1/locations/").json()[0]
+    assert async_client.get(f"/api/v1/locations/{location['id']}").json()["country"] == "France"
+    assert async_client.get("/api/v1/locations/999").status_code == 404
+    series = async_client.get("/api/v1/stats/timeseries", params={"epidemic_id": epidemic["id"]})
+    assert series.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_run_read_uses_run_sync_without_thread(database, monkeypatch):
+    _, AsyncTestingSession = database
+
+    def no_thread(*args, **kwargs):
+        raise AssertionError("pool de threads utilisé")
+
+    monkeypatch.setattr(db_session, "run_in_threadpool", no_thread)
+    async with AsyncTestingSession() as db:
+        names = await run_read(db, lambda session: [epidemic.name for epidemic in session.query(Epidemic)])
+    assert names == ["covid"]
+
+
+@pytest.mark.anyio
+async def test_run_read_in_threadpool_uses_a_sync_session_off_the_loop(database):
+    SyncSession, AsyncTestingSession = database
+    loop_thread = threading.current_thread()
+
+    def read(session):
+        assert threading.current_thread() is not loop_thread
+        assert not session.get_bind().dialect.is_async
+        return [epidemic.name for epidemic in session.query(Epidemic)]
+
+    async with AsyncTestingSession() as db:
+        db.info["sync_session_factory"] = SyncSession
+        assert await run_read_in_threadpool(db, read) == ["covid"]
+
+
+def test_concurrent_cube_reads_on_the_loop_do_not_deadlock(database):
+    _, AsyncTestingSession = database
+    cube_engine = CubeEngine(enabled=True, snapshots=False)
+
+    async def read_cube():
+        async with AsyncTestingSession() as db:
+            return await run_read(db, cube_engine.get)
+
+    async def concurrent_reads():
+        return await asyncio.gather(*(read_cube() for _ in range(4)))
+
+    results = []
+    # Boucle dans un thread à part : un interblocage la rendrait sourde à tout délai
+    worker = threading.Thread(target=lambda: results.append(asyncio.run(concurrent_reads())), daemon=True)
+    worker.start()
+    worker.join(10)
+    assert not worker.is_alive()
+    # Lectures concurrentes d'une construction en cours servies par la base (None)
+    cubes = [cube for cube in results[0] if cube is not None]
+    assert cubes and cube_engine.builds == 1
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("mysql://user:secret@db:3306/analyseit", "mysql+aiomysql://user:secret@db:3306/analyseit"),
+    ("mysql+pymysql://user@db/analyseit", "mysql+aiomysql://user@db/analyseit"),
+    ("sqlite:///./analyseit.db", "sqlite+aiosqlite:///./analyseit.db"),
+    ("sqlite://", None),
+    ("sqlite:///:memory:", None),
+    ("postgresql://user@db/analyseit", None),
+])
+def test_async_database_url(url, expected):
+    assert async_database_url(url) == expected
@@ -0,0 +1,85 @@
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.models.base import Base, Epidemic, DataSource, Localisation
+from app.db.models.rollup import DailyRollup, GLOBAL_ROLLUP
+from app.db.repositories.localisation_repository import delete_localisation
+from app.services import daily_rollup
+from app.services.data_extraction import process_generic_data
+from app.services.stats_service import StatsService
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["location", "date", "cases", "deaths", "new_cases", "new_deaths", "active"])
+
+
+def rollup(db, epidemic_id):
+    return {
+        row.date.isoformat(): (row.cases, row.new_cases, row.locations)
+        for row in db.query(DailyRollup).filter(DailyRollup.id_epidemic == epidemic_id)
+    }
+
+
+def test_etl_keeps_rollup_in_sync_for_touched_dates():
+    db = TestingSessionLocal()
+    source = DataSource(source_type="test", url="file://test")
+    db.add(source)
+    db.commit()
+
+    process_generic_data(db, frame([
+        ("France", "2020-03-01", 10, 1, 10, 1, 9),
+        ("Italie", "2020-03-01", 20, 2, 20, 2, 18),
+        ("France", "2020-03-02", 15, 1, 5, 0, 14),
+    ]), source.id, "rollup-a")
+    process_generic_data(db, frame([
+        ("France", "2020-03-02", 100, 5, 100, 5, 95),
+    ]), source.id, "rollup-b")
+    epidemic_a = db.query(Epidemic).filter(Epidemic.name == "rollup-a").one()
+
+    assert rollup(db, epidemic_a.id) == {"2020-03-01": (30, 30, 2), "2020-03-02": (15, 5, 1)}
+    assert rollup(db, GLOBAL_ROLLUP) == {"2020-03-01": (30, 30, 2), "2020-03-02": (115, 105, 2)}
+
+    # Rechargement d'une seule date : seule cette date est recalculée
+    process_generic_data(db, frame([("France", "2020-03-02", 40, 1, 25, 0, 39)]), source.id, "rollup-a")
+    assert rollup(db, GLOBAL_ROLLUP)["2020-03-02"] == (140, 125, 2)
+
+    # La fenêtre se termine à la dernière date chargée, pas à aujourd'hui
+    evolution = StatsService(db)._get_daily_evolution(days=1)
+    assert evolution == [{"date": "2020-03-02", "new_cases": 125, "new_deaths": 5, "active_cases": 134}]
+
+    daily_rollup.remove_epidemic(db, epidemic_a.id)
+    db.commit()
+    assert rollup(db, GLOBAL_ROLLUP) == {"2020-03-02": (100, 100, 1)}
+
+    daily_rollup.rebuild(db)
+    assert rollup(db, GLOBAL_ROLLUP) == {"2020-03-01": (30, 30, 2), "2020-03-02": (140, 125, 2)}
+    db.close()
+
+
+def test_location_delete_refreshes_rollup():
+    db = TestingSessionLocal()
+    source = DataSource(source_type="test", url="file://test")
+    db.add(source)
+    db.commit()
+    process_generic_data(db, frame([
+        ("Espagne", "2021-06-01", 100, 1, 100, 1, 99),
+        ("Portugal", "2021-06-01", 100, 1, 100, 1, 99),
+    ]), source.id, "rollup-location")
+    epidemic = db.query(Epidemic).filter(Epidemic.name == "rollup-location").one()
+    assert rollup(db, epidemic.id) == {"2021-06-01": (200, 200, 2)}
+
+    portugal = db.query(Localisation).filter(Localisation.country == "Portugal").one()
+    assert delete_localisation(db, portugal.id)
+    assert rollup(db, epidemic.id) == {"2021-06-01": (100, 100, 1)}
+    assert rollup(db, GLOBAL_ROLLUP)["2021-06-01"] == (100, 100, 1)
+    db.close()
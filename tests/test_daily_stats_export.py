@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.core.config.settings import settings
+from app.db.session import get_db, get_query_db, get_read_db
+from app.db.models.base import Base, Epidemic, DailyStats, Localisation, DataSource
+from app.services.daily_stats_export import EXPORT_FIELDS, stream_daily_stats
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module")
+def ids():
+    db = TestingSessionLocal()
+    covid, mpox = Epidemic(name="covid"), Epidemic(name="mpox")
+    france, italie = Localisation(country="France"), Localisation(country="Italie")
+    source = DataSource(source_type="test", url="file://test")
+    db.add_all([covid, mpox, france, italie, source])
+    db.commit()
+    start = date(2020, 3, 1)
+    db.add_all([
+        DailyStats(
+            id_epidemic=epidemic.id, id_loc=location.id, id_source=source.id,
+            date=start + timedelta(days=day), cases=day * 10, deaths=day
+        )
+        for epidemic in (covid, mpox)
+        for location in (france, italie)
+        for day in range(10)
+    ])
+    db.commit()
+    result = {"covid": covid.id, "mpox": mpox.id, "france": france.id, "source": source.id}
+    db.close()
+    return result
+
+
+@pytest.fixture(scope="module")
+def client(ids):
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_query_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def test_json_filters(client, ids):
+    response = client.get("/api/v1/daily-stats", params={
+        "epidemic_id": ids["covid"],
+        "location_id": ids["france"],
+        "date_from": "2020-03-03",
+        "date_to": "2020-03-05"
+    })
+    assert response.status_code == 200
+    rows = response.json()
+    assert [row["date"] for row in rows] == ["2020-03-03", "2020-03-04", "2020-03-05"]
+    assert {row["id_epidemic"] for row in rows} == {ids["covid"]}
+
+
+def test_json_is_bounded(client, ids, monkeypatch):
+    monkeypatch.setattr(settings, "DAILY_STATS_JSON_MAX_ROWS", 10)
+    # 40 lignes sans filtre : refus plutôt que chargement de toute la table
+    assert client.get("/api/v1/daily-stats").status_code == 400
+    assert client.get("/api/v1/daily-stats", params={"limit": 11}).status_code == 400
+    assert len(client.get("/api/v1/daily-stats", params={"limit": 10}).json()) == 10
+    filtered = client.get("/api/v1/daily-stats", params={"epidemic_id": ids["covid"], "location_id": ids["france"]})
+    assert len(filtered.json()) == 10
+    assert client.get("/api/v1/daily-stats", params={"format": "ndjson"}).text.count("\n") == 40
+
+
+def test_ndjson_stream(client, ids):
+    response = client.get("/api/v1/daily-stats", params={"format": "ndjson", "epidemic_id": ids["mpox"]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 20
+    assert set(rows[0]) == set(EXPORT_FIELDS)
+    assert {row["id_epidemic"] for row in rows} == {ids["mpox"]}
+
+
+def test_csv_stream_with_limit(client, ids):
+    response = client.get("/api/v1/daily-stats", params={"format": "csv", "source_id": ids["source"], "limit": 7})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 7
+    assert rows[0]["date"] == "2020-03-01"
+
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/api/v1/daily-stats", params={"format": "xml"}).status_code == 422
+
+
+def test_stream_reads_rows_in_batches(ids):
+    chunks = list(stream_daily_stats(engine, "ndjson", batch_size=6))
+    # 40 lignes lues par lots de 6 : un morceau par lot
+    assert [chunk.count("\n") for chunk in chunks] == [6, 6, 6, 6, 6, 6, 4]
+
+
+def test_arrow_export(client, ids):
+    pa = pytest.importorskip("pyarrow")
+    response = client.get("/api/v1/daily-stats/export", params={"epidemic_id": ids["covid"], "date_to": "2020-03-02"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 4
+    assert set(table.column("epidemic_name").to_pylist()) == {"covid"}
+    assert set(table.column("country").to_pylist()) == {"France", "Italie"}
+    assert table.schema.field("date").type == pa.date32()
+
+
+def test_parquet_export(client, ids):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    response = client.get("/api/v1/daily-stats/export", params={"format": "parquet", "location_id": ids["france"]})
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 20
+    assert sum(table.column("cases").to_pylist()) == 2 * sum(day * 10 for day in range(10))
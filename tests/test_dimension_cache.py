@@ -0,0 +1,118 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.api.dependencies import get_db_session
+from app.core.cache import dimension_cache, response_cache
+from app.db.session import get_db, get_read_db
+from app.db.models.base import Base, DataSource, Epidemic, Localisation
+from app.services.analytics_cube import publish_data_version
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client():
+    session = TestingSessionLocal()
+    session.add_all([
+        Epidemic(name="covid", type="Viral", country="Chine"),
+        Epidemic(name="choléra", type="Bactérien", country="Haïti"),
+        Localisation(country="France", iso_code="FRA"),
+        DataSource(source_type="csv", reference="jhu", url="file://jhu.csv"),
+    ])
+    session.commit()
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_db_session] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+        for model in (Epidemic, Localisation, DataSource):
+            session.execute(delete(model))
+        session.commit()
+        session.close()
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_dimensions_are_served_from_memory(client, statements):
+    for path in ("/api/v1/epidemics/filters", "/api/v1/data-sources", "/api/v1/locations/"):
+        first = client.get(path).json()
+        statements.clear()
+        assert client.get(path).json() == first
+        assert statements == []
+
+    assert client.get("/api/v1/epidemics/filters").json() == {"countries": ["Chine", "Haïti"], "types": ["Bactérien", "Viral"]}
+    assert client.get("/api/v1/data-sources").json()[0]["reference"] == "jhu"
+    assert [location["country"] for location in client.get("/api/v1/locations/").json()] == ["France"]
+
+
+def test_write_endpoints_invalidate_dimensions(client):
+    db = TestingSessionLocal()
+    data_version = response_cache.current_version(db)
+    assert len(client.get("/api/v1/locations/").json()) == 1
+    created = client.post("/api/v1/locations/", json={"country": "Italie"}).json()
+    assert [location["country"] for location in client.get("/api/v1/locations/").json()] == ["France", "Italie"]
+
+    client.put(f"/api/v1/locations/{created['id']}", json={"country": "Espagne"})
+    assert client.get("/api/v1/locations/").json()[1]["country"] == "Espagne"
+
+    client.delete(f"/api/v1/locations/{created['id']}")
+    assert len(client.get("/api/v1/locations/").json()) == 1
+    # Création, modification et suppression invalident aussi les réponses agrégées
+    assert response_cache.current_version(db) == data_version + 3
+    db.close()
+
+    assert "Brésil" not in client.get("/api/v1/epidemics/filters").json()["countries"]
+    response = client.post("/api/v1/epidemics", json={
+        "name": "zika", "type": "Viral", "start_date": "2015-05-01",
+        "country": "Brésil", "description": "", "source": "test"
+    })
+    assert response.status_code == 201
+    assert "Brésil" in client.get("/api/v1/epidemics/filters").json()["countries"]
+
+
+def test_etl_publication_invalidates_dimensions(client):
+    assert len(client.get("/api/v1/data-sources").json()) == 1
+    db = TestingSessionLocal()
+    db.add(DataSource(source_type="api", reference="who", url="https://who.int"))
+    db.commit()
+    # Sans publication, la liste mise en cache est conservée
+    assert len(client.get("/api/v1/data-sources").json()) == 1
+
+    data_version = response_cache.current_version(db)
+    publish_data_version(db, warm=False)
+    assert len(client.get("/api/v1/data-sources").json()) == 2
+    assert response_cache.current_version(db) == data_version + 1
+    assert dimension_cache.stats()["version"] == dimension_cache.current_version(db)
+    db.close()
@@ -0,0 +1,111 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config.settings import settings
+from app.main import app
+from app.db import session as db_session
+from app.db.session import get_db, get_read_db
+from app.db.models.base import Base, Epidemic, DailyStats, Localisation, DataSource
+from app.services import epidemic_deletion
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client():
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def create_epidemic_with_stats(rows: int) -> int:
+    db = TestingSessionLocal()
+    epidemic = Epidemic(name=f"deletion-{rows}", type="Viral")
+    location = Localisation(country=f"Pays {rows}")
+    source = DataSource(source_type="test", url="file://test")
+    db.add_all([epidemic, location, source])
+    db.commit()
+    db.add_all([
+        DailyStats(
+            id_epidemic=epidemic.id, id_source=source.id, id_loc=location.id,
+            date=date(2024, 1, 1).replace(day=day + 1), cases=10
+        )
+        for day in range(rows)
+    ])
+    db.commit()
+    epidemic_id = epidemic.id
+    db.close()
+    return epidemic_id
+
+
+def test_small_epidemic_is_deleted_synchronously(client):
+    epidemic_id = create_epidemic_with_stats(3)
+
+    response = client.delete(f"/api/v1/epidemics/{epidemic_id}")
+    assert response.status_code == 204
+    assert client.get(f"/api/v1/epidemics/{epidemic_id}").status_code == 404
+
+    deletion = client.get(f"/api/v1/epidemics/{epidemic_id}/deletion").json()
+    assert deletion["status"] == "done"
+    assert deletion["deleted_rows"] == 3
+
+
+def test_large_epidemic_is_deleted_in_background(client, monkeypatch):
+    monkeypatch.setattr(settings, "EPIDEMIC_DELETE_SYNC_MAX_ROWS", 2)
+    monkeypatch.setattr(settings, "EPIDEMIC_DELETE_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "EPIDEMIC_DELETE_PAUSE_SECONDS", 0)
+    # La suppression d'arrière-plan passe par le pool d'ingestion, pas par celui de l'API
+    monkeypatch.setattr(db_session, "ingest_engine", engine)
+    epidemic_id = create_epidemic_with_stats(5)
+
+    response = client.delete(f"/api/v1/epidemics/{epidemic_id}")
+    assert response.status_code == 202
+    assert response.json()["total_rows"] == 5
+
+    # La tâche d'arrière-plan s'exécute avant le retour du client de test
+    deletion = client.get(f"/api/v1/epidemics/{epidemic_id}/deletion").json()
+    assert deletion["status"] == "done"
+    assert deletion["progress_pct"] == 100.0
+    db = TestingSessionLocal()
+    assert db.query(DailyStats).filter(DailyStats.id_epidemic == epidemic_id).count() == 0
+    assert db.query(Epidemic).execution_options(include_deleting=True).filter(Epidemic.id == epidemic_id).count() == 0
+    db.close()
+
+
+def test_marked_epidemic_is_hidden_before_its_rows_are_removed():
+    epidemic_id = create_epidemic_with_stats(4)
+    db = TestingSessionLocal()
+    job = epidemic_deletion.mark_for_deletion(db, db.get(Epidemic, epidemic_id))
+    db.expunge_all()
+
+    assert db.query(Epidemic).filter(Epidemic.id == epidemic_id).first() is None
+    assert db.query(func.count(DailyStats.id)).filter(DailyStats.id_epidemic == epidemic_id).scalar() == 0
+    hidden = db.query(func.count(DailyStats.id)).filter(DailyStats.id_epidemic == epidemic_id)
+    assert hidden.execution_options(include_deleting=True).scalar() == 4
+
+    assert epidemic_deletion.run_deletion(engine, job.id, chunk_size=3, pause=0) == "done"
+    status = epidemic_deletion.get_deletion_status(db, epidemic_id)
+    assert status["deleted_rows"] == 4
+    db.close()
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.models.base import Base, Epidemic, DailyStats, Localisation, DataSource, OverallStats
+from app.db.repositories import epidemic_repository
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seed():
+    db = TestingSessionLocal()
+    locations = [Localisation(country=f"Pays {i}") for i in range(3)]
+    source = DataSource(source_type="test", url="file://test")
+    epidemics = [Epidemic(name=f"epidemic-{i}") for i in range(6)]
+    db.add_all([source, *locations, *epidemics])
+    db.commit()
+    for i, epidemic in enumerate(epidemics):
+        db.add(OverallStats(id_epidemic=epidemic.id, total_cases=i * 100, total_deaths=i))
+        for location in locations[:1 + i % 3]:
+            db.add_all([
+                DailyStats(
+                    id_epidemic=epidemic.id, id_loc=location.id, id_source=source.id,
+                    date=date(2020, 1, 1) + timedelta(days=day), cases=day
+                )
+                for day in range(20)
+            ])
+    db.commit()
+    db.close()
+
+
+def count_queries(function):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = function()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+@pytest.mark.parametrize("limit", [1, 6])
+def test_detailed_data_uses_a_fixed_number_of_queries(limit):
+    db = TestingSessionLocal()
+    result, queries = count_queries(lambda: epidemic_repository.get_detailed_epidemic_data(db, limit=limit))
+    db.close()
+
+    # Épidémies, statistiques globales, statistiques récentes, leurs localisations, localisations affectées
+    assert queries == 5
+    assert len(result) == limit
+
+
+def test_detailed_data_content():
+    db = TestingSessionLocal()
+    result = epidemic_repository.get_detailed_epidemic_data(db, skip=2, limit=1)[0]
+    db.close()
+
+    assert result["name"] == "epidemic-2"
+    assert result["overall_stats"]["total_cases"] == 200
+    assert len(result["affected_locations"]) == 3
+    # 3 localisations x 20 jours : les 30 plus récentes, par date décroissante
+    assert len(result["daily_stats"]) == 30
+    assert result["daily_stats"][0]["date"] == "2020-01-20"
+    assert result["daily_stats"][-1]["date"] == "2020-01-11"
+    assert {stat["location"]["country"] for stat in result["daily_stats"]} == {"Pays 0", "Pays 1", "Pays 2"}
+
+
+def test_window_fallback_returns_same_rows(monkeypatch):
+    db = TestingSessionLocal()
+    expected = epidemic_repository.get_detailed_epidemic_data(db)
+    monkeypatch.setattr(epidemic_repository, "supports_window_functions", lambda bind: False)
+    assert epidemic_repository.get_detailed_epidemic_data(db) == expected
+    db.close()
+
+
+def test_lazy_loading_relationships_raises():
+    db = TestingSessionLocal()
+    stat = db.query(DailyStats).first()
+    with pytest.raises(InvalidRequestError):
+        stat.location
+    db.close()
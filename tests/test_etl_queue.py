@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.models.base import Base
+from app.db.models.etl import EtlBatch, EtlTask
+from app.db.models.ingestion import IngestionRun
+from app.services import etl_queue
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+class FakeFileWorker(etl_queue.EtlWorker):
+    """Worker qui simule le chargement d'un fichier sans passer par Kaggle."""
+
+    def process_task(self, db, task):
+        return 10
+
+
+@pytest.fixture
+def db():
+    session = TestingSessionLocal()
+    yield session
+    session.query(EtlTask).delete()
+    session.query(EtlBatch).delete()
+    session.commit()
+    session.close()
+
+
+@pytest.fixture
+def finalize_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(etl_queue, "calculate_overall_stats", lambda db: calls.append(1))
+    return calls
+
+
+def test_workers_claim_distinct_tasks(db):
+    batch = etl_queue.create_batch(db, {"mpox": ["a.csv", "b.csv"]})
+
+    first = etl_queue.claim_task(db, "worker-1", batch.id)
+    second = etl_queue.claim_task(db, "worker-2", batch.id)
+
+    assert first.id != second.id
+    assert etl_queue.claim_task(db, "worker-3", batch.id) is None
+
+
+def test_expired_lease_is_reclaimed(db):
+    batch = etl_queue.create_batch(db, {"mpox": ["a.csv"]})
+    task = etl_queue.claim_task(db, "worker-1", batch.id)
+
+    task.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+    reclaimed = etl_queue.claim_task(db, "worker-2", batch.id)
+    assert reclaimed.id == task.id
+    assert reclaimed.lease_owner == "worker-2"
+    assert reclaimed.attempts == 2
+    # L'ancien propriétaire ne peut plus valider la tâche
+    assert etl_queue.complete_task(db, task.id, "worker-1", rows=5) is False
+
+
+def test_overall_stats_computed_once_after_last_task(db, finalize_calls):
+    batch = etl_queue.create_batch(db, {"mpox": ["a.csv", "b.csv"], "corona": ["c.csv"]})
+
+    FakeFileWorker(TestingSessionLocal, worker_id="worker-1", batch_id=batch.id).run_once(db)
+    assert finalize_calls == []
+
+    FakeFileWorker(TestingSessionLocal, worker_id="worker-2", batch_id=batch.id).run()
+    assert finalize_calls == [1]
+
+    status = etl_queue.get_batch_status(db, batch.id)
+    assert status["status"] == "done"
+    assert status["tasks"]["done"] == 3
+
+
+def test_batch_with_failed_tasks_is_recorded_as_error(db, finalize_calls):
+    class FailingFileWorker(etl_queue.EtlWorker):
+        def process_task(self, db, task):
+            if task.file_path == "b.csv":
+                raise ValueError("fichier illisible")
+            return 10
+
+    batch = etl_queue.create_batch(db, {"mpox": ["a.csv", "b.csv"]})
+    FailingFileWorker(TestingSessionLocal, worker_id="worker-1", batch_id=batch.id).run()
+
+    status = etl_queue.get_batch_status(db, batch.id)
+    assert status["status"] == "error"
+    assert status["tasks"]["error"] == 1
+    run = db.get(IngestionRun, batch.id_run, populate_existing=True)
+    assert run.status == "error"
+    assert run.error == "1 fichier(s) en erreur: b.csv: fichier illisible"
@@ -0,0 +1,74 @@
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.endpoints.dashboard import compute_overview
+from app.db.models.base import Base, Epidemic, DataSource, Localisation
+from app.db.models.rollup import LatestStats
+from app.db.repositories.localisation_repository import delete_localisation
+from app.services import epidemic_deletion, latest_stats
+from app.services.data_extraction import process_generic_data
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["location", "date", "cases", "deaths", "new_cases", "new_deaths", "active"])
+
+
+def latest(db):
+    countries = dict(db.query(Localisation.id, Localisation.country).all())
+    names = dict(db.query(Epidemic.id, Epidemic.name).all())
+    return {
+        (names[row.id_epidemic], countries[row.id_loc]): (row.date.isoformat(), row.cases, row.deaths)
+        for row in db.query(LatestStats)
+    }
+
+
+def test_etl_keeps_latest_values_per_epidemic_and_location():
+    db = TestingSessionLocal()
+    source = DataSource(source_type="test", url="file://test")
+    db.add(source)
+    db.commit()
+
+    process_generic_data(db, frame([
+        ("France", "2020-03-01", 10, 1, 10, 1, 9),
+        ("Italie", "2020-03-01", 20, 2, 20, 2, 18),
+        ("France", "2020-03-02", 15, 1, 5, 0, 14),
+    ]), source.id, "latest-a")
+    process_generic_data(db, frame([("France", "2020-03-02", 100, 5, 100, 5, 95)]), source.id, "latest-b")
+    assert latest(db) == {
+        ("latest-a", "France"): ("2020-03-02", 15, 1),
+        ("latest-a", "Italie"): ("2020-03-01", 20, 2),
+        ("latest-b", "France"): ("2020-03-02", 100, 5),
+    }
+
+    # Chargement incrémental : seules les localisations chargées sont recalculées
+    process_generic_data(db, frame([("Italie", "2020-03-03", 26, 3, 6, 1, 22)]), source.id, "latest-a")
+    assert latest(db)[("latest-a", "Italie")] == ("2020-03-03", 26, 3)
+    assert latest(db)[("latest-a", "France")] == ("2020-03-02", 15, 1)
+
+    # Totaux actuels : somme des dernières valeurs, pas de toutes les dates
+    overview = compute_overview(db)
+    assert overview["latestStats"] == {"cases": 141, "deaths": 9, "recovered": 0, "date": "2020-03-03"}
+
+    epidemic_b = db.query(Epidemic).filter(Epidemic.name == "latest-b").one()
+    epidemic_deletion.mark_for_deletion(db, epidemic_b)
+    assert ("latest-b", "France") not in latest(db)
+
+    italie = db.query(Localisation).filter(Localisation.country == "Italie").one()
+    delete_localisation(db, italie.id)
+    assert latest(db) == {("latest-a", "France"): ("2020-03-02", 15, 1)}
+
+    db.query(LatestStats).delete()
+    db.commit()
+    latest_stats.rebuild(db)
+    assert latest(db) == {("latest-a", "France"): ("2020-03-02", 15, 1)}
+    db.close()
@@ -12,7 +12,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.db.session import get_db
+from app.db.session import get_db, get_query_db, get_read_db
 from app.db.models.base import Base
 
 # Configuration de la base de données de test
@@ -38,6 +38,8 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+app.dependency_overrides[get_query_db] = override_get_db
 
 client = TestClient(app)
 
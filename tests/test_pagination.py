@@ -0,0 +1,107 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.api.dependencies import get_db_session
+from app.db.session import get_db, get_read_db
+from app.db.models.base import Base, Epidemic, Localisation
+from app.db.pagination import encode_cursor
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module")
+def client():
+    db = TestingSessionLocal()
+    # Valeurs de tri en double et NULL pour vérifier le départage par id
+    db.add_all([
+        Epidemic(
+            name=f"epidemic-{i % 7}",
+            type="Viral",
+            country="France",
+            total_cases=None if i % 5 == 0 else (i % 4) * 100,
+            total_deaths=i % 3,
+            start_date=None if i % 6 == 0 else date(2020, 1 + i % 12, 1)
+        )
+        for i in range(23)
+    ])
+    db.add_all([Localisation(country=f"Pays {i}", iso_code=f"P{i:02d}") for i in range(7)])
+    db.commit()
+    db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_db_session] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+def walk_epidemics(client, **params):
+    ids, cursor = [], ""
+    while cursor is not None:
+        response = client.get("/api/v1/epidemics", params={**params, "limit": 4, "cursor": cursor})
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["items"]) <= 4
+        ids.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+    return ids
+
+
+@pytest.mark.parametrize("sort_by", ["name", "cases", "deaths", "date"])
+@pytest.mark.parametrize("sort_desc", [False, True])
+def test_cursor_pages_match_offset_order(client, sort_by, sort_desc):
+    params = {"sort_by": sort_by, "sort_desc": sort_desc}
+    expected = [
+        item["id"]
+        for item in client.get("/api/v1/epidemics", params={**params, "limit": 100}).json()["items"]
+    ]
+    assert len(expected) == 23
+    assert walk_epidemics(client, **params) == expected
+
+
+def test_cursor_applies_filters(client):
+    assert len(walk_epidemics(client, search="epidemic-3")) == 3
+    assert walk_epidemics(client, country="Italie") == []
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/v1/epidemics", params={"cursor": "not-a-cursor"}).status_code == 400
+    # Curseur émis pour un autre tri
+    cursor = encode_cursor("name", "epidemic-1", 1)
+    response = client.get("/api/v1/epidemics", params={"cursor": cursor, "sort_by": "cases"})
+    assert response.status_code == 400
+
+
+def test_locations_cursor_header(client):
+    ids, cursor = [], ""
+    while cursor is not None:
+        response = client.get("/api/v1/locations/", params={"limit": 3, "cursor": cursor})
+        assert response.status_code == 200
+        ids.extend(location["id"] for location in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+    assert ids == sorted(ids) and len(ids) == 7
+
+    offset_page = client.get("/api/v1/locations/", params={"skip": 3, "limit": 3}).json()
+    assert [location["id"] for location in offset_page] == ids[3:6]
@@ -0,0 +1,168 @@
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.api.dependencies import get_db_session
+from app.db import partitions
+from app.db.session import get_ingest_db
+from app.db.models.base import Base, DailyStats, DataSource, Epidemic, Localisation
+from app.db.models.rollup import DailyRollup
+from app.services import daily_rollup
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class MySQLConnection:
+    """Connexion factice : enregistre les instructions au lieu de les exécuter."""
+
+    class dialect:
+        name = "mysql"
+
+    def __init__(self):
+        self.statements = []
+
+    def exec_driver_sql(self, statement):
+        self.statements.append(statement)
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+
+@pytest.fixture
+def monthly(monkeypatch):
+    monkeypatch.setattr(partitions.settings, "DAILY_STATS_PARTITIONING", "month")
+    monkeypatch.setattr(partitions.settings, "DAILY_STATS_PARTITION_START", "2024-11-15")
+    monkeypatch.setattr(partitions.settings, "DAILY_STATS_PARTITIONS_AHEAD", 2)
+
+
+def test_partitioning_ddl_on_table_creation(monthly, monkeypatch):
+    monkeypatch.setattr(partitions, "date", type("FixedDate", (date,), {"today": classmethod(lambda cls: date(2025, 1, 20))}))
+    connection = MySQLConnection()
+    partitions._partition_daily_stats(DailyStats.__table__, connection)
+
+    *drop_keys, primary_key, partition_by = connection.statements
+    assert len(drop_keys) == 3 and all("DROP FOREIGN KEY" in statement for statement in drop_keys)
+    assert primary_key.endswith("ADD PRIMARY KEY (id, date)")
+    assert partition_by == (
+        "ALTER TABLE daily_stats PARTITION BY RANGE COLUMNS(date) ("
+        "PARTITION p_before VALUES LESS THAN ('2024-11-01'), "
+        "PARTITION p202411 VALUES LESS THAN ('2024-12-01'), "
+        "PARTITION p202412 VALUES LESS THAN ('2025-01-01'), "
+        "PARTITION p202501 VALUES LESS THAN ('2025-02-01'), "
+        "PARTITION p202502 VALUES LESS THAN ('2025-03-01'), "
+        "PARTITION p202503 VALUES LESS THAN ('2025-04-01'), "
+        "PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+    )
+
+
+def test_partitioning_is_disabled_by_default_and_outside_mysql(monkeypatch):
+    monkeypatch.setattr(partitions.settings, "DAILY_STATS_PARTITIONING", "")
+    connection = MySQLConnection()
+    partitions._partition_daily_stats(DailyStats.__table__, connection)
+    assert connection.statements == []
+    assert partitions.maintain_partitions(engine) == []
+    assert partitions.list_partitions(engine) == {}
+
+
+def test_maintenance_splits_catch_all_partition(monthly, monkeypatch):
+    existing = {
+        "p_before": date(2024, 11, 1), "p202411": date(2024, 12, 1),
+        "p202412": date(2025, 1, 1), "pmax": None
+    }
+    monkeypatch.setattr(partitions, "list_partitions", lambda bind: existing)
+    connection = MySQLConnection()
+
+    assert partitions.maintain_partitions(connection, today=date(2025, 1, 10)) == ["p202501", "p202502", "p202503"]
+    assert connection.statements == [
+        "ALTER TABLE daily_stats REORGANIZE PARTITION pmax INTO ("
+        "PARTITION p202501 VALUES LESS THAN ('2025-02-01'), "
+        "PARTITION p202502 VALUES LESS THAN ('2025-03-01'), "
+        "PARTITION p202503 VALUES LESS THAN ('2025-04-01'), "
+        "PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+    ]
+    assert partitions.maintain_partitions(connection, today=date(2024, 10, 10)) == []
+
+
+def test_period_is_split_into_whole_partitions_and_remaining_ranges():
+    yearly = {"p_before": date(2020, 1, 1), "p2020": date(2021, 1, 1), "p2021": date(2022, 1, 1), "pmax": None}
+    assert partitions.split_period(yearly, date(2020, 1, 1), date(2022, 1, 1)) == (["p2020", "p2021"], [])
+    assert partitions.split_period(yearly, date(2019, 6, 1), date(2021, 3, 1)) == (
+        ["p2020"], [(date(2019, 6, 1), date(2020, 1, 1)), (date(2021, 1, 1), date(2021, 3, 1))]
+    )
+    assert partitions.split_period({}, date(2020, 1, 1), date(2020, 2, 1)) == ([], [(date(2020, 1, 1), date(2020, 2, 1))])
+
+
+@pytest.fixture
+def stats():
+    db = TestingSessionLocal()
+    epidemic = Epidemic(name="covid")
+    locations = [Localisation(country="France"), Localisation(country="Italie")]
+    source = DataSource(source_type="test", url="file://test")
+    db.add_all([epidemic, source, *locations])
+    db.commit()
+    db.add_all([
+        DailyStats(id_epidemic=epidemic.id, id_loc=location.id, id_source=source.id, date=date(2020, month, 1), cases=month)
+        for location in locations for month in range(1, 7)
+    ])
+    db.commit()
+    daily_rollup.rebuild(db)
+    yield db, locations
+    for model in (DailyRollup, DailyStats, Localisation, DataSource, Epidemic):
+        db.query(model).delete()
+    db.commit()
+    db.close()
+
+
+def test_clear_period_endpoint(stats):
+    db, _ = stats
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_ingest_db] = override_get_db
+    try:
+        client = TestClient(app)
+        bad = client.delete("/api/v1/admin/daily-stats", params={"date_from": "2020-03-01", "date_to": "2020-03-01"})
+        assert bad.status_code == 400
+        response = client.delete("/api/v1/admin/daily-stats", params={"date_from": "2020-02-01", "date_to": "2020-04-01"})
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+
+    assert response.status_code == 200
+    assert response.json()["deleted_rows"] == 4
+    assert response.json()["truncated_partitions"] == []
+    months = sorted(day.month for day in db.execute(select(DailyRollup.date).distinct()).scalars())
+    assert months == [1, 4, 5, 6]
+
+
+def test_deleting_location_removes_its_stats(stats):
+    db, locations = stats
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db_session] = override_get_db
+    try:
+        assert TestClient(app).delete(f"/api/v1/locations/{locations[0].id}").status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+    # Sans s'appuyer sur la cascade de la base (absente quand daily_stats est partitionnée)
+    remaining = db.execute(select(DailyStats.id_loc, func.count()).group_by(DailyStats.id_loc)).all()
+    assert remaining == [(locations[1].id, 6)]
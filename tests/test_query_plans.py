@@ -0,0 +1,177 @@
+"""
+Plans d'exécution des requêtes les plus fréquentes (tableau de bord, liste des épidémies).
+
+Les requêtes réellement émises par le code sont capturées puis passées à EXPLAIN QUERY
+PLAN : un parcours complet de table, ou d'un index non couvrant sans LIMIT, fait échouer
+le test.
+"""
+import re
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import main
+from app.main import app
+from app.db.session import get_db, get_read_db
+from app.db.models.base import Base, DailyStats, DataSource, Epidemic, Localisation
+from app.db.repositories.epidemic_repository import get_filter_options
+from app.api.endpoints.dashboard import compute_overview, compute_trends
+from app.api.endpoints.epidemics import compute_dashboard_stats
+from app.services import daily_rollup, latest_stats
+from app.services.stats_service import StatsService
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+TABLES = set(Base.metadata.tables)
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?(?: USING (COVERING )?INDEX \w+)?$")
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seeded():
+    db = TestingSessionLocal()
+    epidemics = [
+        Epidemic(name=f"épidémie {i}", type=f"type {i % 3}", country=f"pays {i % 4}",
+                 start_date=date(2020, 1, 1) + timedelta(days=i), total_cases=i * 10, total_deaths=i)
+        for i in range(20)
+    ]
+    locations = [Localisation(country=f"pays {i}") for i in range(10)]
+    source = DataSource(source_type="test", url="file://test")
+    db.add_all([*epidemics, *locations, source])
+    db.commit()
+    db.add_all([
+        DailyStats(id_epidemic=epidemic.id, id_loc=location.id, id_source=source.id,
+                   date=date(2020, 1, 1) + timedelta(days=day), cases=day * 10, deaths=day, new_cases=10)
+        for epidemic in epidemics[:5] for location in locations for day in range(10)
+    ])
+    db.commit()
+    daily_rollup.rebuild(db)
+    latest_stats.rebuild(db)
+    db.close()
+
+
+@pytest.fixture
+def captured():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def plan(statement, parameters):
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+def full_scans(statements):
+    """Lignes de plan parcourant toute une table (ou tout un index non couvrant sans LIMIT)."""
+    found = []
+    for statement, parameters in statements:
+        for detail in plan(statement, parameters):
+            scan = FULL_SCAN.match(detail)
+            if not scan or scan.group(1) not in TABLES or scan.group(2):
+                continue
+            # Parcours d'un index dans l'ordre du tri, interrompu par LIMIT
+            if "USING INDEX" in detail and re.search(r"\bLIMIT\b", statement):
+                continue
+            found.append(f"{detail} <- {' '.join(statement.split())[:200]}")
+    return found
+
+
+def test_dashboard_queries_use_indexes(captured):
+    db = TestingSessionLocal()
+    try:
+        StatsService(db).get_dashboard_stats()
+        compute_overview(db)
+        compute_trends(db)
+        compute_dashboard_stats(db)
+        get_filter_options(db)
+    finally:
+        db.close()
+    assert len(captured) > 10
+    assert full_scans(captured) == []
+
+
+def test_dashboard_totals_are_read_from_covering_indexes(captured):
+    db = TestingSessionLocal()
+    try:
+        StatsService(db)._scan_totals(db)
+        compute_dashboard_stats(db)
+    finally:
+        db.close()
+    details = [detail for statement in captured for detail in plan(*statement)]
+    assert "SCAN daily_stats USING COVERING INDEX idx_daily_totals" in details
+    assert any("COVERING INDEX idx_epidemic_type" in detail for detail in details)
+    assert any("COVERING INDEX idx_epidemic_country" in detail for detail in details)
+
+
+def test_latest_values_are_read_from_covering_indexes(captured):
+    db = TestingSessionLocal()
+    try:
+        latest_stats.get_totals(db)
+        latest_stats.get_location_totals(db)
+    finally:
+        db.close()
+    details = [detail for statement in captured for detail in plan(*statement)]
+    assert "SCAN latest_stats USING COVERING INDEX idx_latest_stats_date" in details
+    assert "SCAN latest_stats USING COVERING INDEX idx_latest_stats_loc" in details
+
+
+@pytest.mark.parametrize("sort_by", ["name", "cases", "deaths", "date"])
+@pytest.mark.parametrize("sort_desc", [False, True])
+def test_epidemic_list_is_sorted_by_index(captured, sort_by, sort_desc):
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    try:
+        client = TestClient(app)
+        params = {"sort_by": sort_by, "sort_desc": sort_desc, "limit": 3}
+        assert client.get("/api/v1/epidemics", params=params).json()["total"] == 20
+        page = client.get("/api/v1/epidemics", params={**params, "cursor": ""}).json()
+        client.get("/api/v1/epidemics", params={**params, "cursor": page["next_cursor"]})
+        client.get("/api/v1/epidemics", params={**params, "type": "type 1", "country": "pays 1"})
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+    assert full_scans(captured) == []
+    # Sans filtre, la page est lue dans l'ordre de l'index (pas de tri temporaire)
+    unfiltered = [statement for statement in captured if "ORDER BY" in statement[0] and "type =" not in statement[0]]
+    assert unfiltered
+    assert not [detail for statement in unfiltered for detail in plan(*statement) if "TEMP B-TREE" in detail]
+
+
+def test_missing_indexes_are_created_on_existing_database(monkeypatch):
+    legacy = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=legacy)
+    with legacy.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX idx_daily_totals")
+        conn.exec_driver_sql("DROP INDEX idx_epidemic_cases")
+    monkeypatch.setattr(main, "engine", legacy)
+
+    inspector = inspect(legacy)
+    main.add_missing_indexes(inspector, set(inspector.get_table_names()))
+    indexes = {table: {index["name"] for index in inspect(legacy).get_indexes(table)} for table in ("daily_stats", "epidemic")}
+    assert "idx_daily_totals" in indexes["daily_stats"]
+    assert "idx_epidemic_cases" in indexes["epidemic"]
@@ -0,0 +1,155 @@
+import time
+from datetime import date
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.main import app
+from app.core.cache import dimension_cache, response_cache
+from app.db import replicas
+from app.db import session as db_session
+from app.db.session import async_database_url, create_replica_set
+from app.db.models.base import Base, DailyStats, DataSource, Epidemic, Localisation
+from app.db.versions import DATA_VERSION, DIMENSIONS_VERSION, bump_version
+from app.services.stats_service import StatsService
+
+
+def create_database(path, epidemic_name, cases):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionFactory()
+    epidemic = Epidemic(name=epidemic_name, type="Viral", country="France")
+    location = Localisation(country="France")
+    source = DataSource(source_type="test", url="file://test")
+    db.add_all([epidemic, location, source])
+    db.commit()
+    db.add(DailyStats(id_epidemic=epidemic.id, id_loc=location.id, id_source=source.id,
+                      date=date(2020, 3, 1), cases=cases, deaths=0, new_cases=cases))
+    db.commit()
+    db.close()
+    return engine, SessionFactory
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    """Base principale et réplique sur deux fichiers SQLite, au contenu distinct."""
+    primary, PrimarySession = create_database(tmp_path / "primary.db", "principale", 100)
+    replica, ReplicaSession = create_database(tmp_path / "replica.db", "réplique", 7)
+    primary_async = create_async_engine(async_database_url(f"sqlite:///{tmp_path / 'primary.db'}"), poolclass=NullPool)
+
+    replica_set = create_replica_set([f"sqlite:///{tmp_path / 'replica.db'}"])
+    monkeypatch.setattr(db_session, "SessionLocal", PrimarySession)
+    monkeypatch.setattr(db_session, "AsyncSessionLocal", async_sessionmaker(primary_async, expire_on_commit=False))
+    monkeypatch.setattr(db_session.replica_set, "replicas", replica_set.replicas)
+    # Sans les substitutions de sessions posées par d'autres modules de test
+    monkeypatch.setattr(app, "dependency_overrides", {})
+    yield PrimarySession, ReplicaSession, replica
+    for engine in (primary, replica, *(member.engine for member in replica_set.replicas)):
+        engine.dispose()
+
+
+def epidemic_names(client):
+    return sorted(item["name"] for item in client.get("/api/v1/epidemics").json()["items"])
+
+
+def test_reads_use_the_replica(databases):
+    _, ReplicaSession, _ = databases
+    client = TestClient(app)
+    assert epidemic_names(client) == ["réplique"]
+
+    db = ReplicaSession()
+    try:
+        expected = jsonable_encoder(StatsService(db).get_dashboard_stats())
+    finally:
+        db.close()
+    assert client.get("/api/v1/stats/dashboard").json() == expected
+    assert expected["global_stats"]["total_cases"] == 7
+
+
+def test_client_reads_its_own_writes_on_primary(databases):
+    writer, reader = TestClient(app), TestClient(app)
+    response = writer.post("/api/v1/epidemics", json={
+        "name": "nouvelle", "type": "Viral", "start_date": "2024-01-01",
+        "country": "France", "description": "", "source": "test"
+    })
+    assert response.status_code == 201
+    assert replicas.PRIMARY_COOKIE in response.cookies
+
+    # Le client qui a écrit lit sur la base principale, les autres sur la réplique
+    assert epidemic_names(writer) == ["nouvelle", "principale"]
+    assert epidemic_names(reader) == ["réplique"]
+
+
+def test_data_version_is_read_on_primary(databases, monkeypatch):
+    PrimarySession, ReplicaSession, _ = databases
+    # Réplique en retard d'une version sur la base principale
+    for factory, bumps in ((PrimarySession, 2), (ReplicaSession, 1)):
+        db = factory()
+        for _ in range(bumps):
+            bump_version(db, DATA_VERSION)
+            bump_version(db, DIMENSIONS_VERSION)
+        db.close()
+
+    warmed = []
+    for cache in (response_cache, dimension_cache):
+        monkeypatch.setattr(cache, "version_check_seconds", 0)
+        monkeypatch.setattr(cache, "_warm_in_background", lambda bind, version: warmed.append(version))
+    reader, writer = TestClient(app), TestClient(app)
+    writer.cookies.set(replicas.PRIMARY_COOKIE, str(time.time() + 60))
+
+    def total_cases(client):
+        # Agrégats (pool de threads) et dimensions (session asynchrone)
+        assert client.get("/api/v1/epidemics/filters").status_code == 200
+        return client.get("/api/v1/stats/dashboard").json()["global_stats"]["total_cases"]
+
+    # La réplique en retard ne remplit pas le cache de la version publiée
+    assert total_cases(reader) == 7
+    assert total_cases(writer) == 100
+    assert total_cases(reader) == 100
+    for _ in range(3):
+        total_cases(reader)
+        total_cases(writer)
+    assert response_cache.stats()["version"] == dimension_cache.stats()["version"] == 2
+    assert warmed == []
+
+
+def test_primary_pin_expires():
+    assert replicas.pinned_to_primary({replicas.PRIMARY_COOKIE: "1000"}, now=999)
+    assert not replicas.pinned_to_primary({replicas.PRIMARY_COOKIE: "1000"}, now=1001)
+    assert not replicas.pinned_to_primary({replicas.PRIMARY_COOKIE: "invalide"})
+    assert not replicas.pinned_to_primary({})
+
+
+def test_failing_replica_falls_back_to_primary(databases):
+    _, _, replica = databases
+    with replica.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE epidemic RENAME TO epidemic_indisponible")
+    client = TestClient(app)
+
+    # Lecture rejouée sur la base principale, réplique écartée
+    assert epidemic_names(client) == ["principale"]
+    state = client.get("/api/v1/admin/db-replicas").json()["replicas"][0]
+    assert state["healthy"] is False
+    assert "epidemic" in state["last_error"]
+    assert db_session.replica_set.pick() is None
+
+    # Réintégrée par la vérification de santé une fois joignable
+    with replica.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE epidemic_indisponible RENAME TO epidemic")
+    assert client.get("/api/v1/admin/db-replicas", params={"check": True}).json()["replicas"][0]["healthy"] is True
+    assert epidemic_names(client) == ["réplique"]
+
+
+def test_unreachable_replica_is_excluded_by_health_check(tmp_path):
+    replica_set = create_replica_set([f"sqlite:///{tmp_path / 'absent' / 'replica.db'}"])
+    try:
+        assert replica_set.check_health() == {"replica1": False}
+        assert replica_set.pick() is None
+    finally:
+        replica_set.replicas[0].engine.dispose()
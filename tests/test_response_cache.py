@@ -0,0 +1,81 @@
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.cache import ResponseCache
+from app.db.models.base import Base
+from app.db.versions import get_version
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def counting_loader(calls):
+    def loader(db, **params):
+        calls.append(params)
+        return {"params": params, "call": len(calls)}
+    return loader
+
+
+def test_cache_is_keyed_by_data_version():
+    db = TestingSessionLocal()
+    calls = []
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, version_check_seconds=60, warm_keys=0, enabled=True)
+    cache.register("overview", counting_loader(calls))
+
+    assert cache.get(db, "overview") == cache.get(db, "overview")
+    assert len(calls) == 1
+
+    version = cache.invalidate(db)
+    assert version == get_version(db)
+    cache.get(db, "overview")
+    assert len(calls) == 2
+    db.close()
+
+
+def test_cache_evicts_least_recently_used_and_expired_entries():
+    db = TestingSessionLocal()
+    calls = []
+    cache = ResponseCache(max_entries=2, ttl_seconds=0.2, version_check_seconds=60, warm_keys=0, enabled=True)
+    cache.register("trends", counting_loader(calls))
+
+    cache.get(db, "trends", days=7)
+    cache.get(db, "trends", days=30)
+    cache.get(db, "trends", days=7)   # days=7 devient la plus récente
+    cache.get(db, "trends", days=90)  # évince days=30
+    assert len(calls) == 3
+    cache.get(db, "trends", days=7)
+    assert len(calls) == 3
+    cache.get(db, "trends", days=30)
+    assert len(calls) == 4
+
+    time.sleep(0.25)
+    cache.get(db, "trends", days=30)
+    assert len(calls) == 5
+    db.close()
+
+
+def test_most_used_keys_are_warmed_after_invalidation():
+    db = TestingSessionLocal()
+    calls = []
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, version_check_seconds=60, warm_keys=1, enabled=True)
+    cache.register("dashboard", counting_loader(calls))
+    for _ in range(3):
+        cache.get(db, "dashboard", country="fr")
+    cache.get(db, "dashboard", country="us")
+    assert len(calls) == 2
+
+    cache.invalidate(db, warm=True)
+    assert calls[-1] == {"country": "fr"}
+    cache.get(db, "dashboard", country="fr")
+    assert len(calls) == 3  # déjà préchauffée
+    cache.get(db, "dashboard", country="us")
+    assert len(calls) == 4
+    db.close()
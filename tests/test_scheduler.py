@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.locks import advisory_lock
+from app.db.models.base import Base
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import RefreshScheduler, in_window
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def test_advisory_lock_is_exclusive():
+    with advisory_lock(bind=engine) as first:
+        assert first is True
+        with advisory_lock(bind=engine) as second:
+            assert second is False
+    with advisory_lock(bind=engine) as again:
+        assert again is True
+
+
+def test_window_wraps_around_midnight():
+    assert in_window(23, 22, 5)
+    assert in_window(2, 22, 5)
+    assert not in_window(12, 22, 5)
+    assert in_window(3, 1, 5)
+    assert not in_window(5, 1, 5)
+
+
+def test_tick_runs_once_per_interval(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        scheduler_module, "extract_and_load_datasets",
+        lambda db, incremental, trigger: calls.append(incremental) or []
+    )
+    refresh = RefreshScheduler(TestingSessionLocal, interval_minutes=60, window_start=1, window_end=5)
+
+    assert refresh.tick(datetime(2024, 1, 1, 12, 0)) is False  # hors fenêtre
+    assert refresh.tick(datetime(2024, 1, 1, 2, 0)) is True
+    assert refresh.tick(datetime(2024, 1, 1, 2, 30)) is False  # pas encore dû
+    assert refresh.tick(datetime(2024, 1, 1, 3, 0)) is True
+    assert calls == [True, True]
+
+
+def test_tick_skipped_while_lock_is_held(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "extract_and_load_datasets", lambda db, incremental, trigger: [])
+    refresh = RefreshScheduler(TestingSessionLocal, interval_minutes=1, window_start=0, window_end=0)
+
+    with advisory_lock(bind=engine):
+        assert refresh.tick(datetime(2030, 1, 1, 2, 0)) is False
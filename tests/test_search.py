@@ -0,0 +1,119 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, inspect, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.db.session import get_db, get_read_db
+from app.db.models.base import Base, Epidemic
+from app.db import search
+from app.db.search import FTS_TABLE, ensure_search_index, search_epidemics
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def db():
+    session = TestingSessionLocal()
+    session.add_all([
+        Epidemic(name="Coronavirus 2019", type="Viral", country="Chine"),
+        Epidemic(name="Choléra", type="Bactérien", country="Haïti"),
+        Epidemic(name="Grippe espagnole", type="Viral", country="Espagne"),
+        Epidemic(name="Variole du singe", type="Viral", country="Congo"),
+    ])
+    session.commit()
+    yield session
+    session.execute(delete(Epidemic))
+    session.commit()
+    session.close()
+
+
+def names(db, term):
+    query, relevance = search_epidemics(db.query(Epidemic), term, db.get_bind())
+    return [epidemic.name for epidemic in query.order_by(relevance, Epidemic.id)]
+
+
+def test_prefix_and_all_words(db):
+    assert names(db, "cor") == ["Coronavirus 2019"]
+    assert names(db, "vir") == ["Coronavirus 2019", "Grippe espagnole", "Variole du singe"]
+    assert names(db, "viral esp") == ["Grippe espagnole"]
+    # Accents ignorés
+    assert names(db, "cholera") == ["Choléra"]
+    assert names(db, "inconnue") == []
+
+
+def test_index_follows_updates_and_deletes(db):
+    grippe = db.query(Epidemic).filter(Epidemic.name == "Grippe espagnole").one()
+    grippe.name = "Influenza 1918"
+    db.commit()
+    assert names(db, "grippe") == []
+    assert names(db, "influ") == ["Influenza 1918"]
+
+    db.execute(delete(Epidemic).where(Epidemic.type == "Viral"))
+    db.commit()
+    assert names(db, "viral") == []
+    assert names(db, "cho") == ["Choléra"]
+
+
+def test_relevance_ordering(db):
+    db.add(Epidemic(name="Espagne Espagne", type="Viral", country="Espagne"))
+    db.commit()
+    assert names(db, "espagne")[0] == "Espagne Espagne"
+
+
+def test_search_terms_are_not_parsed_as_fts_syntax(db):
+    assert names(db, 'corona" * (') == ["Coronavirus 2019"]
+    assert names(db, "  ") == names(db, "")
+
+
+def test_existing_database_is_indexed_on_startup(db):
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE {FTS_TABLE}"))
+    search._fts_engines.clear()
+    ensure_search_index(engine)
+    assert FTS_TABLE in inspect(engine).get_table_names()
+    assert names(db, "congo") == ["Variole du singe"]
+
+
+def test_mysql_uses_fulltext_boolean_mode():
+    class MySQLBind:
+        dialect = mysql.dialect()
+
+    query, relevance = search_epidemics(TestingSessionLocal().query(Epidemic), "grippe es", MySQLBind())
+    sql = str(query.statement.compile(dialect=mysql.dialect()))
+    assert "MATCH (epidemic.name, epidemic.type, epidemic.country) AGAINST" in sql
+    assert "IN BOOLEAN MODE" in sql
+    # « es » est plus court que le mot minimal indexé : recherche par préfixe
+    assert "LIKE" in sql.upper()
+    assert relevance is not None
+
+
+def test_epidemics_endpoint_search_by_relevance(db):
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    try:
+        response = TestClient(app).get("/api/v1/epidemics", params={"search": "viral", "sort_by": "relevance"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] == 3
+        assert {item["name"] for item in body["items"]} == {"Coronavirus 2019", "Grippe espagnole", "Variole du singe"}
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
@@ -0,0 +1,89 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from app.core.config.settings import settings
+from app.main import app
+from app.db import pool_metrics
+from app.db import session as db_session
+from app.db.session import TimedIngestQueuePool, TimedQueuePool, _engine_options
+from app.services.etl_queue import EtlWorker
+from app.services.scheduler import RefreshScheduler
+from app.services.watch_folder import FolderWatcher
+
+
+def test_workload_pools_use_their_own_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", "mysql+pymysql://user:pwd@db:3306/analyseit")
+    monkeypatch.setattr(settings, "DB_INGEST_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "DB_INGEST_ISOLATION_LEVEL", "REPEATABLE READ")
+
+    api = _engine_options("api")
+    ingest = _engine_options("ingest")
+    assert api["poolclass"] is TimedQueuePool
+    assert api["pool_size"] == settings.DB_API_POOL_SIZE
+    assert ingest["poolclass"] is not TimedQueuePool
+    assert ingest["pool_size"] == 2
+    assert ingest["pool_timeout"] == settings.DB_INGEST_POOL_TIMEOUT
+    assert ingest["isolation_level"] == "REPEATABLE READ"
+    assert (api["pool_logging_name"], ingest["pool_logging_name"]) == ("api", "ingest")
+    assert api["pool_recycle"] == settings.DB_POOL_RECYCLE_SECONDS
+
+
+def test_etl_paths_default_to_ingest_pool():
+    assert db_session.engines["api"] is not db_session.engines["ingest"]
+    assert db_session.IngestSessionLocal.kw["bind"] is db_session.ingest_engine
+    assert EtlWorker().session_factory is db_session.IngestSessionLocal
+    assert RefreshScheduler().session_factory is db_session.IngestSessionLocal
+    assert FolderWatcher(root="unused").session_factory is db_session.IngestSessionLocal
+
+
+@pytest.fixture
+def small_pool(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedIngestQueuePool,
+        pool_size=2, max_overflow=1, pool_timeout=0.2, pool_logging_name="test_pool"
+    )
+    yield engine, pool_metrics.instrument(engine, "test_pool")
+    engine.dispose()
+
+
+def test_pool_events_and_checkout_wait_are_measured(small_pool):
+    engine, measures = small_pool
+    connections = [engine.connect() for _ in range(3)]
+    state = pool_metrics.snapshot()["test_pool"]
+    assert (state["size"], state["checked_out"], state["overflow"]) == (2, 3, 1)
+    assert state["checkouts"] == 3 and state["connects"] == 3
+
+    # Pool épuisé : l'attente jusqu'au délai est mesurée
+    with pytest.raises(PoolTimeout):
+        engine.connect()
+    connections[0].invalidate()
+    for connection in connections:
+        connection.close()
+
+    state = pool_metrics.snapshot()["test_pool"]
+    assert state["checked_out"] == 0
+    assert state["invalidations"] == 1
+    wait = state["checkout_wait"]
+    assert wait["count"] == 4
+    assert wait["max_ms"] >= 200
+    assert wait["buckets"]["le_100ms"] == 3 and wait["buckets"]["le_inf"] == 4
+    assert state["recent_checkout_wait"]["count"] == 4
+
+
+def test_prewarm_opens_up_to_pool_size(small_pool):
+    engine, measures = small_pool
+    assert pool_metrics.prewarm(engine, 5) == 2
+    assert engine.pool.checkedin() == 2
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    # Connexion déjà ouverte : pas de nouvelle connexion
+    assert measures.connects == 2
+
+
+def test_admin_pool_metrics_endpoint():
+    response = TestClient(app).get("/api/v1/admin/db-pools")
+    assert response.status_code == 200
+    assert {"api", "ingest"} <= set(response.json())
+    assert set(response.json()["api"]["checkout_wait"]) == {"count", "sum_ms", "max_ms", "buckets"}
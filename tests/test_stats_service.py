@@ -0,0 +1,74 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models.base import Base, Epidemic, DailyStats, Localisation, DataSource
+from app.services import daily_rollup, latest_stats
+from app.services.stats_service import StatsService
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # Base fichier : le pool fournit une connexion par thread, comme MySQL
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def seed(db):
+    covid = Epidemic(name="covid", type="Viral", country="Monde")
+    mpox = Epidemic(name="mpox", type=None, country="Monde")
+    france, italie = Localisation(country="France"), Localisation(country="Italie")
+    source = DataSource(source_type="test", url="file://test")
+    db.add_all([covid, mpox, france, italie, source])
+    db.commit()
+    rows = [
+        (covid, france, date(2020, 3, 1), 100, 10),
+        (covid, france, date(2020, 3, 2), 150, 12),
+        (covid, italie, date(2020, 3, 2), 300, 30),
+        (mpox, france, date(2020, 3, 2), 5, 0),
+    ]
+    db.add_all([
+        DailyStats(
+            id_epidemic=epidemic.id, id_loc=location.id, id_source=source.id,
+            date=day, cases=cases, deaths=deaths, new_cases=cases, active=cases
+        )
+        for epidemic, location, day, cases, deaths in rows
+    ])
+    db.commit()
+    daily_rollup.rebuild(db)
+    latest_stats.rebuild(db)
+    return covid, mpox
+
+
+def test_dashboard_is_derived_from_a_single_scan(session_factory):
+    db = session_factory()
+    covid, mpox = seed(db)
+
+    daily_stats_scans = []
+    engine = db.get_bind()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_scans(conn, cursor, statement, parameters, context, executemany):
+        if "FROM daily_stats" in statement:
+            daily_stats_scans.append(statement)
+
+    stats = StatsService(db).get_dashboard_stats()
+    event.remove(engine, "before_cursor_execute", count_scans)
+
+    assert len(daily_stats_scans) == 1
+    assert stats["global_stats"]["total_cases"] == 555
+    assert stats["global_stats"]["total_deaths"] == 52
+    assert stats["global_stats"]["total_epidemics"] == 2
+    assert {row["type"]: row["cases"] for row in stats["type_distribution"]} == {"Viral": 550, "Non spécifié": 5}
+    # Dernières valeurs cumulées (latest_stats), et non la somme de toutes les dates
+    assert stats["geographic_distribution"] == [
+        {"country": "Italie", "cases": 300, "deaths": 30},
+        {"country": "France", "cases": 155, "deaths": 12},
+    ]
+    assert [row["id"] for row in stats["top_active_epidemics"]] == [covid.id, mpox.id]
+    assert [row["date"] for row in stats["daily_evolution"]] == ["2020-03-01", "2020-03-02"]
+    db.close()
@@ -0,0 +1,163 @@
+import time
+from datetime import date
+
+import anyio
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.api.endpoints import admin
+from app.core import metrics
+from app.core.metrics import RollingWindow
+from app.db import session as db_session
+from app.db.models.base import Base, DailyStats, Epidemic, Localisation, DataSource
+from app.services.data_extraction import insert_or_update_stats
+from app.services.throttle import AdaptiveThrottle
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def make_throttle(api_latency, pool_wait, pauses):
+    return AdaptiveThrottle(
+        api_latency=api_latency,
+        pool_wait=pool_wait,
+        latency_target_ms=200,
+        pool_wait_target_ms=20,
+        min_batch=10,
+        max_batch=80,
+        max_pause=1,
+        enabled=True,
+        sleep=pauses.append
+    )
+
+
+def test_throttle_backs_off_when_api_is_slow_and_recovers_when_idle():
+    api_latency, pool_wait, pauses = RollingWindow(), RollingWindow(), []
+    throttle = make_throttle(api_latency, pool_wait, pauses)
+
+    for _ in range(20):
+        api_latency.add(500)
+    throttle.after_batch()
+    throttle.after_batch()
+    assert throttle.batch_size == 20
+    assert pauses == [0.05, 0.1]
+
+    for _ in range(5):
+        throttle.after_batch()
+    assert throttle.batch_size == 10
+    assert throttle.pause == 1
+
+    # API inactive : retour immédiat à pleine vitesse
+    api_latency._samples.clear()
+    assert throttle.after_batch() == 0.0
+    assert throttle.batch_size == 80
+
+
+def test_throttle_recovers_gradually_under_normal_load():
+    api_latency, pool_wait, pauses = RollingWindow(), RollingWindow(), []
+    throttle = make_throttle(api_latency, pool_wait, pauses)
+    pool_wait.add(100)
+    throttle.after_batch()
+    assert throttle.batch_size == 40
+
+    pool_wait._samples.clear()
+    api_latency.add(50)
+    throttle.after_batch()
+    assert 40 < throttle.batch_size < 80
+    assert throttle.pause == 0.0
+
+
+def test_insert_or_update_stats_writes_in_batches():
+    db = TestingSessionLocal()
+    epidemic = Epidemic(name="throttle")
+    location = Localisation(country="Testland")
+    source = DataSource(source_type="test", url="file://test")
+    db.add_all([epidemic, location, source])
+    db.commit()
+
+    stats = [
+        {
+            "id_epidemic": epidemic.id, "id_source": source.id, "id_loc": location.id,
+            "date": date(2024, 1, day), "cases": day
+        }
+        for day in range(1, 26)
+    ]
+    # Doublon dans le même lot : la dernière valeur l'emporte
+    stats.append(dict(stats[0], cases=100))
+
+    calls = []
+
+    class CountingThrottle:
+        batch_size = 10
+
+        def after_batch(self):
+            calls.append(self.batch_size)
+            return 0.0
+
+    assert insert_or_update_stats(db, stats, throttle=CountingThrottle()) == 26
+    assert len(calls) == 3
+    assert db.query(DailyStats).filter(DailyStats.id_epidemic == epidemic.id).count() == 25
+
+    stats[1]["cases"] = 42
+    insert_or_update_stats(db, stats[:5], throttle=CountingThrottle())
+    day_two = db.query(DailyStats).filter(
+        DailyStats.id_epidemic == epidemic.id, DailyStats.date == date(2024, 1, 2)
+    ).one()
+    assert day_two.cases == 42
+    db.close()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_etl_endpoint_is_throttled_by_concurrent_api_requests(monkeypatch):
+    pauses = []
+    throttle = make_throttle(metrics.api_latency, RollingWindow(), pauses)
+    # Toute requête API dépasse la cible
+    throttle.latency_target_ms = 0.0
+    metrics.api_latency._samples.clear()
+
+    def extract_and_load_datasets(db, **kwargs):
+        # Lots écrits jusqu'à ce que la contre-pression ralentisse le chargement
+        deadline = time.monotonic() + 5
+        while not throttle.throttled_batches and time.monotonic() < deadline:
+            throttle.after_batch()
+            time.sleep(0.01)
+        return {"throttled_batches": throttle.throttled_batches}
+
+    monkeypatch.setattr(admin, "extract_and_load_datasets", extract_and_load_datasets)
+    monkeypatch.setattr(admin, "IngestSessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(db_session, "ingest_engine", engine)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        etl_done = anyio.Event()
+        result = {}
+
+        async def run_etl():
+            result["response"] = await client.get("/api/v1/admin/extract-data")
+            etl_done.set()
+
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(run_etl)
+            # Requêtes servies pendant le chargement, sur la même boucle d'événements
+            while not etl_done.is_set():
+                assert (await client.get("/api/v1/openapi.json")).status_code == 200
+                await anyio.sleep(0.01)
+
+    response = result["response"]
+    assert response.status_code == 200
+    assert response.json()["details"] == {"throttled_batches": 1}
+    assert pauses
@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.db.session import get_db, get_read_db
+from app.db.models.base import Base, Epidemic, DailyStats, Localisation, DataSource
+from app.services import daily_rollup, time_series
+from app.services.time_series import TimeSeriesService, rolling_mean
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+# Lundi 2 mars 2020, 21 jours : trois semaines complètes
+START = date(2020, 3, 2)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module")
+def ids():
+    db = TestingSessionLocal()
+    covid = Epidemic(name="covid")
+    france, italie = Localisation(country="France"), Localisation(country="Italie")
+    source = DataSource(source_type="test", url="file://test")
+    db.add_all([covid, france, italie, source])
+    db.commit()
+    for factor, location in ((1, france), (2, italie)):
+        db.add_all([
+            DailyStats(
+                id_epidemic=covid.id, id_loc=location.id, id_source=source.id,
+                date=START + timedelta(days=day),
+                new_cases=factor * (day + 1), cases=factor * sum(range(1, day + 2)), deaths=factor * day
+            )
+            for day in range(21)
+        ])
+    db.commit()
+    daily_rollup.rebuild(db)
+    result = {"covid": covid.id, "france": france.id, "italie": italie.id}
+    db.close()
+    return result
+
+
+@pytest.fixture
+def db():
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+
+
+def test_weekly_buckets_sum_flows_and_keep_last_cumulative(db, ids):
+    result = TimeSeriesService(db).get_series(
+        epidemic_id=ids["covid"], location_ids=[ids["france"]], metrics=["new_cases", "cases"], bucket="week"
+    )
+    assert result["periods"] == ["2020-03-02", "2020-03-09", "2020-03-16"]
+    assert result["series"]["new_cases"] == [sum(range(1, 8)), sum(range(8, 15)), sum(range(15, 22))]
+    assert result["series"]["cases"] == [sum(range(1, 8)), sum(range(1, 15)), sum(range(1, 22))]
+
+
+def test_rollup_and_location_paths_agree(db, ids):
+    service = TimeSeriesService(db)
+    from_rollup = service.get_series(epidemic_id=ids["covid"], metrics=["new_cases", "deaths"], bucket="month")
+    from_stats = service.get_series(
+        epidemic_id=ids["covid"], location_ids=[ids["france"], ids["italie"]], metrics=["new_cases", "deaths"], bucket="month"
+    )
+    assert from_rollup["series"] == from_stats["series"]
+    assert from_rollup["periods"] == ["2020-03-01"]
+    assert from_rollup["series"]["deaths"] == [3 * 20]
+
+
+def test_rolling_window_matches_numpy_fallback(db, ids, monkeypatch):
+    params = {"epidemic_id": ids["covid"], "metrics": ["new_cases"], "rolling": 7, "date_to": date(2020, 3, 12)}
+    in_database = TimeSeriesService(db).get_series(**params)
+    monkeypatch.setattr(time_series, "supports_window_functions", lambda bind: False)
+    with_numpy = TimeSeriesService(db).get_series(**params)
+
+    assert len(in_database["periods"]) == 11
+    assert in_database["series"] == with_numpy["series"]
+    assert in_database["series"]["new_cases_rolling"][:2] == [3.0, 4.5]
+
+
+def test_rolling_mean_partial_windows():
+    assert rolling_mean(np.array([2, 4, 6, 8]), 2).tolist() == [2.0, 3.0, 5.0, 7.0]
+
+
+def test_timeseries_endpoint(ids):
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    try:
+        client = TestClient(app)
+        response = client.get("/api/v1/stats/timeseries", params={
+            "epidemic_id": ids["covid"], "bucket": "week", "metrics": ["new_cases", "new_deaths"]
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["periods"]) == 3
+        assert set(body["series"]) == {"new_cases", "new_deaths"}
+
+        assert client.get("/api/v1/stats/timeseries", params={"metrics": "unknown"}).status_code == 400
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
@@ -0,0 +1,70 @@
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.models.base import Base, DailyStats, Epidemic, OverallStats
+from app.db.models.ingestion import IngestionRun, IngestionFile
+from app.services.ingestion_history import get_throughput_trends
+from app.services.watch_folder import FolderWatcher
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+CSV_CONTENT = """Date,Country/Region,Confirmed,Deaths,Recovered,Active
+2020-03-01,France,100,2,10,88
+2020-03-02,France,150,3,20,127
+2020-03-01,Italy,200,5,15,180
+"""
+
+
+def drop_file(root, name="daily.csv", content=CSV_CONTENT):
+    folder = root / "corona"
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / name).write_text(content)
+
+
+def test_new_file_is_loaded_and_moved_aside(tmp_path):
+    drop_file(tmp_path)
+    watcher = FolderWatcher(str(tmp_path), TestingSessionLocal, settle_seconds=0)
+
+    results = watcher.poll()
+
+    assert [r["status"] for r in results] == ["success"]
+    assert not (tmp_path / "corona" / "daily.csv").exists()
+    assert len(os.listdir(tmp_path / "processed" / "corona")) == 1
+
+    db = TestingSessionLocal()
+    epidemic = db.query(Epidemic).filter_by(name="corona").one()
+    assert db.query(DailyStats).filter_by(id_epidemic=epidemic.id).count() == 3
+    assert db.query(OverallStats).filter_by(id_epidemic=epidemic.id).one().total_cases == 450
+    db.close()
+
+    # Un second dépôt identique est ignoré
+    drop_file(tmp_path)
+    assert [r["status"] for r in watcher.poll()] == ["unchanged"]
+    assert watcher.poll() == []
+
+
+def test_poll_is_recorded_in_ingestion_history(tmp_path):
+    drop_file(tmp_path, name="history.csv", content=CSV_CONTENT.replace("France", "Spain"))
+    FolderWatcher(str(tmp_path), TestingSessionLocal, settle_seconds=0).poll()
+
+    db = TestingSessionLocal()
+    run = db.query(IngestionRun).order_by(IngestionRun.id.desc()).first()
+    assert run.trigger == "watch-folder"
+    assert run.status == "success"
+    assert run.rows_loaded == 3
+    file = db.query(IngestionFile).filter_by(id_run=run.id).one()
+    assert file.file_name == "history.csv"
+    assert file.rows_read == 3 and file.rows_rejected == 0
+
+    trends = get_throughput_trends(db, dataset="corona", file_name="history.csv")
+    assert trends["files"][0]["points"][-1]["rows_per_second"] > 0
+    db.close()